@@ -1,44 +1,41 @@
 # apps/engine-py/adapters/espn/sync.py
 from __future__ import annotations
-from typing import Dict, Any
+from typing import Dict, Any, List
 from .client import ESPNClient
-from services import store
+from db.session import db_enabled, session_scope
+from jobs.tasks import request_league_snapshot
+from services import mock_data
+from services.store import Store
 
 __all__ = ["full_sync", "delta_sync"]
 
 def _write_league_to_store(c: ESPNClient) -> Dict[str, Any]:
     """
-    Idempotently writes league snapshot into the canonical in-memory store.
-    Returns basic counts for diagnostics.
+    Idempotently writes league snapshot into the database (when DB_URL is set)
+    and the in-memory store. Returns basic counts for diagnostics.
     """
-    # clear and re-fill for now (MVP). later: make this incremental.
-    if hasattr(store, "reset"):
-        store.reset()
-    else:
-        store.PLAYERS.clear()
-        store.TEAMS.clear()
-        store.ROSTERS.clear()
-
-    # Teams
+    # rebuild and swap in for now (MVP). later: make this incremental.
+    teams: Dict[str, Dict[str, Any]] = {}
     for t in c.league.teams:
         tid = f"espn-{t.team_id}"
-        store.TEAMS[tid] = {
+        teams[tid] = {
             "id": tid,
             "name": t.team_name,
             "manager": getattr(t, "owners", getattr(t, "owner", None)),
         }
 
     # Rosters (normalized)
-    store.ROSTERS.clear()
+    rosters: Dict[str, List[Dict[str, str]]] = {}
     for row in c.rosters():
-        store.ROSTERS.setdefault(row["team_id"], []).append(
+        rosters.setdefault(row["team_id"], []).append(
             {"player_id": row["player_id"], "slot": row["slot"]}
         )
 
     # Players meta
+    players: Dict[str, Dict[str, Any]] = {}
     meta = c.player_meta_from_rosters()
     for pid, pdata in meta.items():
-        store.PLAYERS[pid] = {
+        players[pid] = {
             "id": pid,
             "name": pdata.get("name", pid),
             "pos": pdata.get("pos", "WR"),
@@ -46,19 +43,30 @@ def _write_league_to_store(c: ESPNClient) -> Dict[str, Any]:
             "bye_week": pdata.get("bye_week"),
         }
 
-    # Settings
-    store.SETTINGS.update(c.league_settings())
+    # Settings (merged over current) -- also bumps the data version
+    settings = {**mock_data.SETTINGS, **c.league_settings()}
+    persisted = None
+    if db_enabled():
+        week = int(getattr(c.league, "current_week", None) or 1)
+        with session_scope() as s:
+            persisted = Store(s).sync_league(c.league_id, c.year, week, settings, teams, rosters, players)
+    mock_data.load_league(teams, rosters, settings, players=players, league=f"espn-{c.league_id}-{c.year}")
+    # local snapshot so a restart is warm without waiting on ESPN; written by a
+    # job so a snapshot failure never fails the sync
+    snapshot_job = request_league_snapshot()
 
     return {
-        "teams": len(store.TEAMS),
-        "rosters": sum(len(v) for v in store.ROSTERS.values()),
-        "players": len(store.PLAYERS),
+        "teams": len(mock_data.TEAMS),
+        "rosters": sum(len(v) for v in mock_data.ROSTERS.values()),
+        "players": len(mock_data.PLAYERS),
         "settings": True,
+        "persisted": persisted,
+        "snapshot_job": snapshot_job,
     }
 
 def full_sync() -> Dict[str, Any]:
     """
-    Full refresh from ESPN into services.store.
+    Full refresh from ESPN into services.mock_data.
     """
     c = ESPNClient()
     return _write_league_to_store(c)
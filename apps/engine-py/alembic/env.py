@@ -31,6 +31,13 @@ if db_url:
 # ... etc.
 
 
+def include_name(name, type_, parent_names) -> bool:
+    """Leave the per-season valuation partitions (valuations_<season>, valuations_default) out of autogenerate."""
+    if type_ == "table":
+        return not (name or "").startswith("valuations_")
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -47,6 +54,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -70,7 +78,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_name=include_name
         )
 
         with context.begin_transaction():
@@ -0,0 +1,41 @@
+"""team week builds
+
+Revision ID: 3c9e4a7d2f15
+Revises: e5a71c3d9f06
+Create Date: 2026-10-17 21:12:40.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9e4a7d2f15"
+down_revision: Union[str, Sequence[str], None] = "e5a71c3d9f06"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # One row per materialized (league, season, source, week), recording the
+    # league sync it was built from. No existing build can be vouched for, so
+    # the table starts empty and routes join in Python until the next
+    # valuation job.
+    op.create_table(
+        "team_week_builds",
+        sa.Column("league_id", sa.Integer(), nullable=False),
+        sa.Column("season", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("week", sa.Integer(), nullable=False),
+        sa.Column("synced_at", sa.DateTime(), nullable=False),
+        sa.Column("built_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("league_id", "season", "source", "week"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("team_week_builds")
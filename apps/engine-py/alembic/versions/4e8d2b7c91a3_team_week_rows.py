@@ -0,0 +1,47 @@
+"""team week rows
+
+Revision ID: 4e8d2b7c91a3
+Revises: 0b741b05a9ef
+Create Date: 2026-10-17 10:12:40.218311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4e8d2b7c91a3"
+down_revision: Union[str, Sequence[str], None] = "0b741b05a9ef"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # (team_id, week, source) leads the primary key, so a team-week read is one index range scan
+    op.create_table(
+        "team_week_rows",
+        sa.Column("team_id", sa.String(), nullable=False),
+        sa.Column("week", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("player_id", sa.String(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("slot", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("pos", sa.String(), nullable=True),
+        sa.Column("nfl_team", sa.String(), nullable=True),
+        sa.Column("bye_week", sa.Integer(), nullable=True),
+        sa.Column("projected_points", sa.Float(), nullable=True),
+        sa.Column("vorp", sa.Float(), nullable=True),
+        sa.Column("rank_pos", sa.Integer(), nullable=True),
+        sa.Column("rank_overall", sa.Integer(), nullable=True),
+        sa.Column("inputs_hash", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("team_id", "week", "source", "player_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("team_week_rows")
@@ -0,0 +1,130 @@
+"""valuations by season
+
+Revision ID: 7f3a9c2e5b18
+Revises: 4e8d2b7c91a3
+Create Date: 2026-10-17 14:03:52.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op, context
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7f3a9c2e5b18"
+down_revision: Union[str, Sequence[str], None] = "4e8d2b7c91a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # --- Valuations: add league/season scope, rebuild LIST-partitioned by season ---
+    # A partitioned table's primary key must include the partition key, so the
+    # surrogate id goes and the natural key becomes the primary key.
+    op.rename_table("valuations", "valuations_legacy")
+    op.execute("ALTER TABLE valuations_legacy RENAME CONSTRAINT valuations_pkey TO valuations_legacy_pkey")
+    op.drop_constraint("uq_val_player_week_source", "valuations_legacy", type_="unique")
+    op.drop_index("ix_val_week", table_name="valuations_legacy")
+
+    op.create_table(
+        "valuations",
+        sa.Column("league_id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("season", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("week", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("player_id", sa.String(), nullable=False),
+        sa.Column("projected_points", sa.Float(), nullable=False),
+        sa.Column("vorp", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["player_id"], ["players.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("league_id", "season", "week", "source", "player_id", name="valuations_pkey"),
+        postgresql_partition_by="LIST (season)",
+    )
+
+    # Existing rows predate the scope. Backfill from CLI args (preferred), e.g.
+    # poetry run alembic -x league_id=432155457 -x year=2025 upgrade head
+    # else the newest leagues row, else league 0 in the current year.
+    xargs = context.get_x_argument(as_dictionary=True)
+    li = xargs.get("league_id")
+    yr = xargs.get("year")
+    newest = "(SELECT {} FROM leagues ORDER BY year DESC, created_at DESC LIMIT 1)"
+    op.execute(
+        "CREATE TEMP TABLE valuations_scope AS SELECT "
+        f"COALESCE({int(li) if li else 'NULL'}, {newest.format('id')}, 0)::integer AS league_id, "
+        f"COALESCE({int(yr) if yr else 'NULL'}, {newest.format('year')}, "
+        "extract(year FROM now())::integer)::integer AS season"
+    )
+
+    # One partition per season up front (Store.write_valuations adds later ones);
+    # rows for a season without its own partition go to the default.
+    op.execute("""
+        DO $$
+        DECLARE y integer;
+        BEGIN
+            FOR y IN SELECT season FROM valuations_scope LOOP
+                EXECUTE format('CREATE TABLE valuations_%s PARTITION OF valuations FOR VALUES IN (%s)', y, y);
+            END LOOP;
+        END $$
+    """)
+    op.execute("CREATE TABLE valuations_default PARTITION OF valuations DEFAULT")
+
+    op.execute("""
+        INSERT INTO valuations (league_id, season, week, source, player_id, projected_points, vorp)
+        SELECT s.league_id, s.season, v.week, v.source, v.player_id, v.projected_points, v.vorp
+        FROM valuations_legacy v CROSS JOIN valuations_scope s
+    """)
+    op.execute("DROP TABLE valuations_scope")
+    op.drop_table("valuations_legacy")
+    op.execute("DROP SEQUENCE IF EXISTS valuations_id_seq")
+
+    # Covering indexes, created on the parent so every partition gets them:
+    # week reads (season, week, source) and per-player history (player_id, season)
+    # are answered from the index alone.
+    op.create_index(
+        "ix_val_season_week_source", "valuations", ["season", "week", "source", "league_id"],
+        unique=False, postgresql_include=["player_id", "projected_points", "vorp"],
+    )
+    op.create_index(
+        "ix_val_player_season", "valuations", ["player_id", "season"],
+        unique=False, postgresql_include=["league_id", "week", "source", "projected_points", "vorp"],
+    )
+    # Planner statistics for the new partitions; autovacuum keeps the visibility
+    # map current, which index-only scans rely on
+    op.execute("ANALYZE valuations")
+
+
+def downgrade() -> None:
+    """Best-effort downgrade: back to one unpartitioned table keyed by (player_id, week, source)."""
+    op.rename_table("valuations", "valuations_partitioned")
+    op.execute("ALTER TABLE valuations_partitioned RENAME CONSTRAINT valuations_pkey TO valuations_partitioned_pkey")
+    op.drop_index("ix_val_season_week_source", table_name="valuations_partitioned")
+    op.drop_index("ix_val_player_season", table_name="valuations_partitioned")
+
+    op.execute("CREATE SEQUENCE IF NOT EXISTS valuations_id_seq")
+    op.create_table(
+        "valuations",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),  # ids from valuations_id_seq, as before
+        sa.Column("player_id", sa.String(), nullable=False),
+        sa.Column("week", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("projected_points", sa.Float(), nullable=False),
+        sa.Column("vorp", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["player_id"], ["players.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id", name="valuations_pkey"),
+        sa.UniqueConstraint("player_id", "week", "source", name="uq_val_player_week_source"),
+    )
+    op.execute("ALTER SEQUENCE valuations_id_seq OWNED BY valuations.id")
+    op.create_index("ix_val_week", "valuations", ["week"], unique=False)
+
+    # keep the newest season's row for each (player_id, week, source)
+    op.execute("""
+        INSERT INTO valuations (id, player_id, week, source, projected_points, vorp)
+        SELECT nextval('valuations_id_seq'), player_id, week, source, projected_points, vorp
+        FROM (
+            SELECT DISTINCT ON (player_id, week, source) player_id, week, source, projected_points, vorp
+            FROM valuations_partitioned
+            ORDER BY player_id, week, source, season DESC, league_id
+        ) newest
+    """)
+    op.drop_table("valuations_partitioned")  # drops its partitions too
@@ -0,0 +1,33 @@
+"""league synced_at
+
+Revision ID: b2d6f0a83c47
+Revises: 7f3a9c2e5b18
+Create Date: 2026-10-17 16:41:09.318254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b2d6f0a83c47"
+down_revision: Union[str, Sequence[str], None] = "7f3a9c2e5b18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # last sync/ingest time; startup compares the league snapshot against it.
+    # Existing leagues were last synced no earlier than they were created.
+    op.add_column("leagues", sa.Column("synced_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE leagues SET synced_at = created_at")
+    with op.batch_alter_table("leagues") as batch_op:
+        batch_op.alter_column("synced_at", existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("leagues", "synced_at")
@@ -0,0 +1,61 @@
+"""team week league scope
+
+Revision ID: e5a71c3d9f06
+Revises: b2d6f0a83c47
+Create Date: 2026-10-17 18:05:52.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a71c3d9f06"
+down_revision: Union[str, Sequence[str], None] = "b2d6f0a83c47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _create(scoped: bool) -> None:
+    scope = [
+        sa.Column("league_id", sa.Integer(), nullable=False),
+        sa.Column("season", sa.Integer(), nullable=False),
+    ] if scoped else []
+    op.create_table(
+        "team_week_rows",
+        *scope,
+        sa.Column("team_id", sa.String(), nullable=False),
+        sa.Column("week", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("player_id", sa.String(), nullable=False),
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("slot", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("pos", sa.String(), nullable=True),
+        sa.Column("nfl_team", sa.String(), nullable=True),
+        sa.Column("bye_week", sa.Integer(), nullable=True),
+        sa.Column("projected_points", sa.Float(), nullable=True),
+        sa.Column("vorp", sa.Float(), nullable=True),
+        sa.Column("rank_pos", sa.Integer(), nullable=True),
+        sa.Column("rank_overall", sa.Integer(), nullable=True),
+        sa.Column("inputs_hash", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint(*(c.name for c in scope), "team_id", "week", "source", "player_id"),
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Team-week rows are derived data with no league on them to backfill from;
+    # the table is recreated empty and the next valuation job rebuilds it.
+    # (league_id, season, team_id, week, source) leads the key, so a team-week
+    # read is still one index range scan.
+    op.drop_table("team_week_rows")
+    _create(scoped=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("team_week_rows")
+    _create(scoped=False)
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import Integer, String, Float, ForeignKey, UniqueConstraint, Index, JSON, DateTime
+from sqlalchemy import DDL, Integer, String, Float, ForeignKey, UniqueConstraint, Index, JSON, DateTime, event
 
 class Base(DeclarativeBase):
     pass
@@ -14,6 +14,7 @@ class League(Base):
     year: Mapped[int] = mapped_column(Integer, primary_key=True)
     settings: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    synced_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)  # last sync/ingest (UTC)
 
 class Team(Base):
     __tablename__ = "teams"
@@ -48,18 +49,35 @@ class RosterSpot(Base):
     )
 
 class Valuation(Base):
+    """Weekly valuation history; on PostgreSQL the table is LIST-partitioned by season."""
     __tablename__ = "valuations"
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    player_id: Mapped[str] = mapped_column(ForeignKey("players.id", ondelete="CASCADE"))
-    week: Mapped[int] = mapped_column(Integer)
-    source: Mapped[str] = mapped_column(String, default="mock")
+    league_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)  # 0 = local league
+    season: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    week: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    source: Mapped[str] = mapped_column(String, primary_key=True, default="mock")
+    player_id: Mapped[str] = mapped_column(ForeignKey("players.id", ondelete="CASCADE"), primary_key=True)
     projected_points: Mapped[float] = mapped_column(Float)
     vorp: Mapped[float] = mapped_column(Float)
     __table_args__ = (
-        UniqueConstraint("player_id", "week", "source", name="uq_val_player_week_source"),
-        Index("ix_val_week", "week"),
+        # covering: week reads (Store.valuations_for_week) and per-player history are index-only scans
+        Index(
+            "ix_val_season_week_source", "season", "week", "source", "league_id",
+            postgresql_include=["player_id", "projected_points", "vorp"],
+        ),
+        Index(
+            "ix_val_player_season", "player_id", "season",
+            postgresql_include=["league_id", "week", "source", "projected_points", "vorp"],
+        ),
+        {"postgresql_partition_by": "LIST (season)"},
     )
 
+# Seasons get their own partition from Store.write_valuations; the default
+# partition (also created by the migration) takes anything else.
+event.listen(
+    Valuation.__table__, "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS valuations_default PARTITION OF valuations DEFAULT").execute_if(dialect="postgresql"),
+)
+
 class Transaction(Base):
     __tablename__ = "transactions"
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -68,3 +86,34 @@ class Transaction(Base):
     ts: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     type: Mapped[str] = mapped_column(String)  # add, drop, trade, move
     payload: Mapped[dict] = mapped_column(JSON)  # raw snapshot for delta debugging
+
+class TeamWeekRow(Base):
+    """Roster slot joined with player fields and that week's valuation (materialized by the valuation job)."""
+    __tablename__ = "team_week_rows"
+    league_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)  # 0 = local league
+    season: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    team_id: Mapped[str] = mapped_column(String, primary_key=True)
+    week: Mapped[int] = mapped_column(Integer, primary_key=True)
+    source: Mapped[str] = mapped_column(String, primary_key=True)
+    player_id: Mapped[str] = mapped_column(String, primary_key=True)
+    seq: Mapped[int] = mapped_column(Integer)  # roster order
+    slot: Mapped[str] = mapped_column(String)
+    name: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    pos: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    nfl_team: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    bye_week: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    projected_points: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    vorp: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    rank_pos: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    rank_overall: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    inputs_hash: Mapped[str] = mapped_column(String)  # same on every row of a (league, season, team, week, source)
+
+class TeamWeekBuild(Base):
+    """League sync a team-week materialization was built from; its rows are current while the league's synced_at matches."""
+    __tablename__ = "team_week_builds"
+    league_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    season: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    source: Mapped[str] = mapped_column(String, primary_key=True)
+    week: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    synced_at: Mapped[datetime] = mapped_column(DateTime)  # League.synced_at read before the rosters
+    built_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -1,7 +1,7 @@
 from apscheduler.schedulers.background import BackgroundScheduler
 from adapters.espn.sync import delta_sync
 from jobs.queue import enqueue
-from jobs.tasks import compute_valuations_task
+from jobs.tasks import compute_valuations_task, request_trade_market
 
 sched: BackgroundScheduler | None = None
 
@@ -15,4 +15,6 @@ def start():
     # every 15 min: recompute valuations for week 1 (replace with current week logic)
     sched.add_job(lambda: enqueue(compute_valuations_task, kwargs={"week": 1, "source": "mock"}),
                   "interval", minutes=15, id="valuations")
+    # every 15 min: refresh the trade market rows for rosters that changed since the last build
+    sched.add_job(lambda: request_trade_market(1, "mock"), "interval", minutes=15, id="trade-market")
     sched.start()
@@ -1,21 +1,356 @@
-from typing import Dict, Any
+import logging
+import os
+import time
+from threading import Lock
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from db.session import db_enabled, session_scope
+from jobs.queue import enqueue
+from services import analytics, mock_data, store_cache
+from services.projections.base import source_version, weekly_points_many
 from services.projections.registry import get_source
-from services.mock_data import PLAYERS, SETTINGS
-from services.valuation import compute_vorp_for_week
+from services.simulation import simulate_season
+from services.store import Store, valuation_rows
+from services.team_week import build_team_weeks
+from services.league_snapshot import SnapshotError, read_manifest, read_snapshot, write_snapshot
+from services.mock_data import PLAYERS, ROSTERS, SETTINGS, TEAMS
+from services.trade_market import TradeMarket
+from services.valuation import compute_rest_of_season, compute_season_valuations
+from services.valuation_cache import ValuationCache
+from services.valuation_engine import RestOfSeason, SeasonValuations
+from services.valuation_incremental import IncrementalValuations, apply_updates
 
-# simple in-memory valuation cache by week
-_VALUATIONS_CACHE: Dict[int, Dict[str, Any]] = {}
+log = logging.getLogger(__name__)
 
-def compute_valuations_task(week: int | None, source: str | None):
-    w = week or 1
-    src = get_source(source or "mock")
+# shared valuation cache for jobs and read routes, keyed by
+# (league, source, week, data version); week=None holds the season matrix
+_VALUATIONS_CACHE = ValuationCache(max_entries=64)
+
+def _key(source: str, week: int | str | None) -> tuple:
+    # versioned by the league data and by the source's own projections
+    src = get_source(source)
+    return (mock_data.league_id(), source, week, (mock_data.data_version(), source_version(src) if src else 0))
+
+def _key_at(season_key: tuple, week: int | str) -> tuple:
+    """`_key(source, week)` at the version `season_key` (a `_key(source, None)`) was taken under."""
+    league, source, _, version = season_key
+    return (league, source, week, version)
+
+def valuation_key(week: int | str, source: str = "mock") -> tuple:
+    """Key naming the valuations `week_valuations` (int week) or `ros_valuations` ("ros:<week>") return,
+    for memos derived from them (e.g. lineup values)."""
+    return _key(source, week)
+
+def _compute_season(source: str) -> SeasonValuations:
+    src = get_source(source)
     if not src:
         raise ValueError(f"unknown source '{source}'")
-    projections = src.weekly_points(PLAYERS, week=w)
-    vals = compute_vorp_for_week(PLAYERS, projections, SETTINGS, w)
-    _VALUATIONS_CACHE[w] = vals
+    return compute_season_valuations(PLAYERS, src, SETTINGS)
+
+def season_valuations(source: str = "mock") -> SeasonValuations:
+    """Season matrix for `source` at the current data version (from the startup snapshot if it holds it)."""
+    key = _key(source, None)
+    return _VALUATIONS_CACHE.get_or_compute(key, lambda: _snapshot_season(key) or _compute_season(source))
+
+def week_valuations(week: int, source: str = "mock") -> Dict[str, Any]:
+    """One week's slice of the season matrix in `compute_vorp_for_week` shape."""
+    return _VALUATIONS_CACHE.get_or_compute(
+        _key(source, week), lambda: season_valuations(source).week(week).to_dicts(week)
+    )
+
+def rest_of_season(source: str = "mock") -> RestOfSeason:
+    """Bye-aware ROS prefix sums over the cached season matrix."""
+    return _VALUATIONS_CACHE.get_or_compute(
+        _key(source, "ros"), lambda: compute_rest_of_season(PLAYERS, season_valuations(source))
+    )
+
+def ros_valuations(from_week: int, source: str = "mock") -> Dict[str, Any]:
+    """Rest-of-season valuations from `from_week` through week 17."""
+    return _VALUATIONS_CACHE.get_or_compute(
+        _key(source, f"ros:{from_week}"), lambda: rest_of_season(source).to_dicts(from_week)
+    )
+
+# (league, source, week) -> (cache version, live valuations) for weeks patched by a reload
+_LIVE_WEEKS: Dict[tuple, tuple] = {}
+_RELOAD_LOCK = Lock()
+# a week with more changed players than this fraction is revalued, not patched
+INCREMENTAL_MAX_FRACTION = float(os.getenv("INCREMENTAL_MAX_FRACTION") or 0.05)
+
+def _live_week(source: str, version: Any, season: SeasonValuations, week: int) -> IncrementalValuations:
+    lkey = (mock_data.league_id(), source, week)
+    held = _LIVE_WEEKS.get(lkey)
+    if held is None or held[0] != version:
+        held = _LIVE_WEEKS[lkey] = (version, IncrementalValuations.from_week(season.week(week), SETTINGS, week))
+    return held[1]
+
+def reload_source(source: str) -> Dict[str, Any]:
+    """
+    Re-map a reloadable source if its data changed and carry the change into
+    the cached season matrix. Weeks where few players moved are patched through
+    `IncrementalValuations`: only the players whose VORP or ranks changed are
+    rewritten in the cached week and the database, and reported back. Weeks
+    with wider changes are left to be revalued on next read.
+    """
+    src = get_source(source)
+    with _RELOAD_LOCK:
+        if not src.changed():
+            return {"id": source, "reloaded": False, "version": source_version(src)}
+        old_key = _key(source, None)
+        season = _VALUATIONS_CACHE.get(old_key)
+        src.reload()
+        result: Dict[str, Any] = {"id": source, "reloaded": True, "version": source_version(src)}
+        if season is None:
+            return result  # nothing cached from the old data
+
+        new_points = weekly_points_many(src, PLAYERS, season.weeks)
+        limit = max(1, int(len(season.player_ids) * INCREMENTAL_MAX_FRACTION))
+        updates: Dict[int, Dict[str, float]] = {}
+        for wi, week in enumerate(season.weeks):
+            cols = np.flatnonzero(new_points[wi] != season.points[wi])
+            if len(cols) > limit:
+                result["revalue"] = True
+                if db_enabled():
+                    # the materialized team-weeks hold the old valuations
+                    with session_scope() as s:
+                        Store(s).drop_team_week_builds(source)
+                    store_cache.invalidate()
+                return result  # the new key misses; the next read revalues the season
+            if len(cols):
+                updates[week] = {season.player_ids[i]: float(new_points[wi, i]) for i in cols.tolist()}
+
+        new_key = _key(source, None)
+        live = {w: _live_week(source, old_key[3], season, w) for w in updates}
+        patched, changed = apply_updates(season, live, updates)
+        for w, inc in live.items():
+            _LIVE_WEEKS[(mock_data.league_id(), source, w)] = (new_key[3], inc)
+        # read before the new version's first put drops the old entries
+        weeks = {w: _VALUATIONS_CACHE.get(_key_at(old_key, w)) for w in season.weeks}
+        _VALUATIONS_CACHE.put(new_key, patched)
+        for week, cached in weeks.items():
+            if cached is not None:
+                _VALUATIONS_CACHE.put(_key_at(new_key, week), {**cached, **changed.get(week, {})})
+        if db_enabled() and any(changed.values()):
+            league_id, year = mock_data.league_scope()
+            col = {pid: i for i, pid in enumerate(patched.player_ids)}
+            rows = [
+                (league_id, year, week, source, pid,
+                 float(patched.points[wi, col[pid]]), float(patched.vorp[wi, col[pid]]))
+                for wi, week in enumerate(patched.weeks) for pid in changed.get(week, ())
+            ]
+            weeks = sorted(w for w, vals in changed.items() if vals)
+            scope = mock_data.league_scope()
+            with session_scope() as s:
+                store = Store(s)
+                store.write_valuations(rows)
+                synced_at = store.league_synced_at()
+                store.refresh_team_weeks(
+                    source, weeks,
+                    build_team_weeks(PLAYERS, store.rosters_by_week(weeks), patched, weeks, source, *scope),
+                    synced_at=synced_at,
+                )
+            store_cache.invalidate()
+        result["changed"] = {week: sorted(vals) for week, vals in changed.items()}
+        return result
+
+def compute_valuations_task(week: int | None, source: str | None):
+    w = week or 1
+    src = source or "mock"
+    season = _compute_season(src)
+    _VALUATIONS_CACHE.put(_key(src, None), season)
+    _VALUATIONS_CACHE.put(_key(src, w), season.week(w).to_dicts(w))
     # result_ref can be used to indicate what changed
-    return {"kind": "valuations", "week": w, "count": len(vals)}
+    result = {"kind": "valuations", "week": w, "weeks": len(season.weeks), "count": len(season.player_ids)}
+    if db_enabled():
+        # the whole season streams in one transaction; team-week rows from this
+        # week on are rebuilt from the stored rosters and rewritten only where
+        # a team's inputs changed
+        weeks = [wk for wk in season.weeks if wk >= w]
+        scope = mock_data.league_scope()
+        with session_scope() as s:
+            store = Store(s)
+            result["persisted"] = store.write_valuations(valuation_rows(season, src, *scope))
+            synced_at = store.league_synced_at()  # before the rosters: a sync in between reads as stale
+            result["team_weeks"] = store.refresh_team_weeks(
+                src, weeks, build_team_weeks(PLAYERS, store.rosters_by_week(weeks), season, weeks, src, *scope),
+                synced_at=synced_at,
+            )
+        store_cache.invalidate()
+    if analytics.enabled():
+        # best-effort: valuations are already cached and committed, so a failure
+        # here (e.g. another process holding the DuckDB lock) doesn't fail the job
+        try:
+            league_id, year = mock_data.league_scope()
+            result["analytics"] = analytics.ANALYTICS.load_season(year, src, season, PLAYERS, league_id)
+        except Exception as e:
+            log.warning("analytics load failed: %s", e)
+            result["analytics"] = {"error": str(e)}
+    return result
+
+def compute_analytics_task(season: int | None = None, league_id: int | None = None):
+    """Backfill the analytics store for `season` from persisted valuations and transactions."""
+    if not analytics.enabled():
+        raise RuntimeError("analytics store disabled (install duckdb and set ANALYTICS_DB)")
+    if not db_enabled():
+        raise RuntimeError("DB_URL is not set")
+    yr = season or analytics.season_of(mock_data.league_id())
+    with session_scope() as s:
+        loaded = analytics.ANALYTICS.load_from_store(s, yr, league_id)
+    return {"kind": "analytics", "season": yr, **loaded}
+
+def compute_simulation_task(
+    source: str | None = None,
+    weeks: list[int] | None = None,
+    player_ids: list[str] | None = None,
+    n_samples: int = 10_000,
+    seed: int = 0,
+    processes: int | None = None,
+):
+    """Monte Carlo outcome distributions around the season valuations; per-player, per-week summaries."""
+    src = source or "mock"
+    season = season_valuations(src)
+    pids = list(player_ids) if player_ids else list(season.player_ids)
+    unknown = sorted(set(pids) - set(season.player_ids))
+    if unknown:
+        raise ValueError(f"unknown player ids: {unknown[:10]}")
+    t0 = time.perf_counter()
+    result = simulate_season(season, n_samples=n_samples, seed=seed, weeks=weeks, processes=processes)
+    ms = (time.perf_counter() - t0) * 1000.0
+    return {
+        "kind": "simulation", "source": src, "seed": seed, "n_samples": n_samples,
+        "weeks": result.weeks, "simulate_ms": round(ms, 1),
+        "items": [result.player(pid, w) for pid in pids for w in result.weeks],
+    }
+
+# league snapshot written after each sync and loaded at startup ("" disables)
+LEAGUE_SNAPSHOT_DIR = os.getenv("LEAGUE_SNAPSHOT_DIR", ".snapshots/league")
+_SNAPSHOT_LOCK = Lock()  # one writer at a time: writes share the temp directory name
+# season key -> startup snapshot whose matrices are mapped (and hash-checked) on first read
+_SNAPSHOT_SEASONS: Dict[tuple, Any] = {}
+
+def _snapshot_season(key: tuple) -> SeasonValuations | None:
+    snap = _SNAPSHOT_SEASONS.pop(key, None)
+    if snap is None:
+        return None
+    try:
+        return snap.season()
+    except SnapshotError as e:
+        log.warning("league snapshot matrices not used: %s", e)
+        return None
+
+def save_league_snapshot(source: str = "mock") -> Dict[str, Any] | None:
+    """Snapshot the in-memory league and its season valuations; returns the manifest."""
+    if not LEAGUE_SNAPSHOT_DIR:
+        return None
+    with _SNAPSHOT_LOCK:
+        try:
+            return write_snapshot(
+                LEAGUE_SNAPSHOT_DIR, league=mock_data.league_id(), source=source,
+                players=PLAYERS, teams=TEAMS, rosters=ROSTERS, settings=SETTINGS,
+                season=season_valuations(source),
+            )
+        except Exception as e:
+            log.warning("league snapshot not written: %s", e)
+            raise
+
+def request_league_snapshot(source: str = "mock") -> str | None:
+    """
+    Queue a snapshot write after a sync or ingest, so a failed or slow write
+    never fails the sync itself. Returns the job id, or None if snapshots are off.
+    """
+    if not LEAGUE_SNAPSHOT_DIR:
+        return None
+    return enqueue(save_league_snapshot, args=(source,))
+
+def load_league_snapshot(newest: tuple | None = None) -> Dict[str, Any] | None:
+    """
+    Replace the in-memory league with the snapshot on disk; its season matrix
+    is memory-mapped when valuations are first read at this data version.
+    Returns the manifest plus load time, or None if there is no valid snapshot.
 
-def get_cached_valuations(week: int) -> Dict[str, Any] | None:
-    return _VALUATIONS_CACHE.get(week)
+    `newest` is the database's (league id, last sync epoch seconds); a
+    snapshot of another league or older than that sync is stale and skipped.
+    """
+    if not LEAGUE_SNAPSHOT_DIR:
+        return None
+    t0 = time.perf_counter()
+    manifest = read_manifest(LEAGUE_SNAPSHOT_DIR)
+    if manifest is None:
+        return None
+    if newest is not None and (manifest["league"] != newest[0] or manifest["created_at"] < newest[1]):
+        log.info("league snapshot %s (%s) is older than the database's %s; not loaded",
+                 manifest["sha256"][:12], manifest["league"], newest[0])
+        return None
+    snap = read_snapshot(LEAGUE_SNAPSHOT_DIR)
+    if snap is None:
+        return None
+    try:
+        teams, rosters, settings, players = snap.teams, snap.rosters(), snap.settings, snap.players()
+    except SnapshotError as e:
+        log.warning("league snapshot not loaded: %s", e)
+        return None
+    mock_data.load_league(teams, rosters, settings, players=players, league=snap.league)
+    _SNAPSHOT_SEASONS.clear()
+    _SNAPSHOT_SEASONS[_key(snap.source, None)] = snap
+    return {**snap.manifest, "load_ms": round((time.perf_counter() - t0) * 1000.0, 3)}
+
+def get_cached_valuations(week: int, source: str = "mock") -> Dict[str, Any] | None:
+    return _VALUATIONS_CACHE.get(_key(source, week))
+
+def valuation_cache_stats() -> Dict[str, int]:
+    return _VALUATIONS_CACHE.stats()
+
+# trade markets keyed by (league, source, week | "ros:<week>"); each one keeps
+# its previous build so refreshes only re-search pairs with changed rosters
+_TRADE_MARKETS: Dict[tuple, TradeMarket] = {}
+_MARKETS_PENDING: set = set()
+# market key -> data version of the last refresh queued for it
+_MARKETS_REQUESTED: Dict[tuple, int] = {}
+_MARKETS_LOCK = Lock()
+
+def _market_tag(week: int, mode: str) -> int | str:
+    return f"ros:{week}" if mode == "ros" else week
+
+def trade_market(week: int, source: str = "mock", mode: str = "week") -> Optional[TradeMarket]:
+    """The trade market if it was built at the current data version, else None."""
+    market = _TRADE_MARKETS.get((mock_data.league_id(), source, _market_tag(week, mode)))
+    if market is None or market.data_version != mock_data.data_version():
+        return None
+    return market
+
+def compute_trade_market_task(week: int | None, source: str | None, mode: str = "week"):
+    w = week or 1
+    src = source or "mock"
+    tag = _market_tag(w, mode)
+    key = (mock_data.league_id(), src, tag)
+    try:
+        version = mock_data.data_version()
+        valuations = ros_valuations(w, src) if mode == "ros" else week_valuations(w, src)
+        with _MARKETS_LOCK:
+            market = _TRADE_MARKETS.setdefault(key, TradeMarket())
+        stats = market.refresh(
+            PLAYERS, dict(ROSTERS), valuations, SETTINGS.get("roster_rules_json"),
+            data_version=version, valuation_key=valuation_key(tag, src),
+        )
+    finally:
+        with _MARKETS_LOCK:
+            _MARKETS_PENDING.discard(key)
+    return {"kind": "trade_market", "week": w, "mode": mode, **stats}
+
+def request_trade_market(week: int | None, source: str | None = None, mode: str = "week", force: bool = False) -> str | None:
+    """
+    Enqueue a market refresh unless one is queued or running for it, or (unless
+    `force`) one was already queued at the current data version: at most one
+    refresh per (league, source, week, version). Returns the job id.
+    """
+    w = week or 1
+    src = source or "mock"
+    key = (mock_data.league_id(), src, _market_tag(w, mode))
+    version = mock_data.data_version()
+    with _MARKETS_LOCK:
+        if key in _MARKETS_PENDING or (not force and _MARKETS_REQUESTED.get(key) == version):
+            return None
+        _MARKETS_PENDING.add(key)
+        _MARKETS_REQUESTED[key] = version
+    return enqueue(compute_trade_market_task, kwargs={"week": w, "source": src, "mode": mode})
@@ -1,3 +1,6 @@
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -11,12 +14,52 @@ import routes_ingest
 import routes_recommend
 import routes_sync_espn
 import routes_lineup
+import routes_analytics
 
 
 import config
+from db.session import db_enabled, dispose_async_engine, session_scope
+from jobs.tasks import load_league_snapshot
+from services import mock_data
+from services.store import Store
+
+log = logging.getLogger(__name__)
+
+def _load_league_from_db() -> None:
+    """Replace the in-memory league with the latest stored snapshot (valuation/recommendation routes compute over it)."""
+    try:
+        with session_scope() as s:
+            snap = Store(s).load_league()
+    except Exception as e:  # DB down or unmigrated -> keep mock data
+        log.warning("league not loaded from database: %s", e)
+        return
+    if snap:
+        mock_data.load_league(**snap)
+
+def _latest_sync_in_db() -> tuple | None:
+    """(league id, last sync epoch seconds) of the newest stored league, None if none or unreachable."""
+    try:
+        with session_scope() as s:
+            return Store(s).latest_sync()
+    except Exception as e:
+        log.warning("league sync time not read from database: %s", e)
+        return None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # last sync's snapshot first (memory-mapped, milliseconds) unless the
+    # database holds another league or a newer sync; the database otherwise
+    snapshot = load_league_snapshot(_latest_sync_in_db() if db_enabled() else None)
+    if snapshot is not None:
+        log.info("league %s loaded from snapshot %s in %.1f ms",
+                 snapshot["league"], snapshot["sha256"][:12], snapshot["load_ms"])
+    elif db_enabled():
+        _load_league_from_db()
+    yield
+    await dispose_async_engine()
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="FantasyManager Engine", version="1.0.0")
+    app = FastAPI(title="FantasyManager Engine", version="1.0.0", lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -37,6 +80,7 @@ def create_app() -> FastAPI:
     app.include_router(routes_recommend.router,  prefix=api)
     app.include_router(routes_sync_espn.router, prefix=api)
     app.include_router(routes_lineup.router, prefix=api)
+    app.include_router(routes_analytics.router, prefix=api)
 
 
 
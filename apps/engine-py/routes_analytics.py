@@ -0,0 +1,85 @@
+"""Multi-season analytics endpoints backed by the embedded DuckDB store."""
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+
+from services import analytics, mock_data
+
+router = APIRouter(tags=["analytics"])
+
+
+def _require_analytics() -> None:
+    """Raise 503 if duckdb is not installed or the analytics store is disabled."""
+    if not analytics.is_available():
+        raise HTTPException(
+            status_code=503,
+            detail="duckdb package not installed. Run: pip install duckdb",
+        )
+    if not analytics.enabled():
+        raise HTTPException(status_code=503, detail="Analytics store disabled (ANALYTICS_DB not set)")
+
+
+@router.get("/analytics/seasons")
+async def list_seasons() -> dict:
+    """Seasons and sources loaded into the analytics store, with week and row counts."""
+    _require_analytics()
+    return {"seasons": await run_in_threadpool(analytics.ANALYTICS.seasons)}
+
+
+@router.get("/analytics/trends")
+async def vorp_trends(
+    pos: Optional[str] = Query(None, description="Filter by position (QB, RB, WR, TE, K, DST)"),
+    seasons: int = Query(3, ge=1, le=20, description="Most recent seasons to include"),
+    source: str = Query("mock", description="Projection source"),
+    limit: int = Query(100, ge=1, le=1000, description="Players, best latest-season VORP first"),
+) -> dict:
+    """
+    Per-player VORP trend across seasons.
+
+    One row per player and season with average and total weekly VORP and the
+    change in average VORP from the previous season.
+    """
+    _require_analytics()
+    rows = await run_in_threadpool(analytics.ANALYTICS.vorp_trends, pos, seasons, source, limit)
+    return {"source": source, "trends": rows}
+
+
+@router.get("/analytics/scarcity")
+async def scarcity_curve(
+    season: Optional[int] = Query(None, description="Season (defaults to the current league's)"),
+    week: Optional[int] = Query(None, ge=1, le=18, description="One week instead of the season average"),
+    source: str = Query("mock", description="Projection source"),
+    depth: int = Query(40, ge=1, le=200, description="Deepest positional rank to return"),
+) -> dict:
+    """
+    Positional scarcity curves.
+
+    Average VORP and projected points at each positional rank, per position;
+    a steep curve means the position thins out quickly.
+    """
+    _require_analytics()
+    yr = season or analytics.season_of(mock_data.league_id())
+    rows = await run_in_threadpool(analytics.ANALYTICS.scarcity_curve, yr, source, week, depth)
+    curves: dict = {}
+    for r in rows:
+        curves.setdefault(r["pos"], []).append({"rank": r["rank"], "vorp": r["vorp"], "points": r["points"]})
+    return {"season": yr, "week": week, "source": source, "curves": curves}
+
+
+@router.get("/analytics/source-accuracy")
+async def source_accuracy(
+    season: Optional[int] = Query(None, description="Season (defaults to the current league's)"),
+    truth: str = Query("actual", description="Source holding actual points"),
+    pos: Optional[str] = Query(None, description="Filter by position"),
+) -> dict:
+    """
+    Projection source accuracy against actual results.
+
+    MAE, RMSE and bias (projected minus actual) per source over every
+    player-week that has a `truth` row, most accurate first.
+    """
+    _require_analytics()
+    yr = season or analytics.season_of(mock_data.league_id())
+    rows = await run_in_threadpool(analytics.ANALYTICS.source_accuracy, yr, truth, pos)
+    return {"season": yr, "truth": truth, "sources": rows}
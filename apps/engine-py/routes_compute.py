@@ -1,20 +1,26 @@
 """Compute endpoints for triggering background valuation jobs."""
-from typing import Optional
+import os
+from typing import List, Optional
 
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from jobs.queue import enqueue
-from jobs.tasks import compute_valuations_task
+from jobs.tasks import (
+    compute_analytics_task, compute_simulation_task, compute_valuations_task, request_trade_market,
+)
+from services import analytics
 from services.projections.registry import get_source
 
 router = APIRouter(tags=["compute"])
 
+SIMULATION_WORKERS = int(os.getenv("SIMULATION_WORKERS") or os.cpu_count() or 1)
+
 
 class ComputeValuationsRequest(BaseModel):
     """Request body for triggering valuation computation."""
 
-    week: Optional[int] = None
+    week: Optional[int] = Field(None, ge=1, le=18)
     source: Optional[str] = None
 
 
@@ -30,4 +36,86 @@ def compute_valuations(body: ComputeValuationsRequest) -> dict:
         raise HTTPException(status_code=400, detail=f"Unknown projection source: '{src}'")
 
     job_id = enqueue(compute_valuations_task, kwargs={"week": body.week, "source": src})
-    return {"job_id": job_id}
\ No newline at end of file
+    return {"job_id": job_id}
+
+
+class ComputeTradeMarketRequest(BaseModel):
+    """Request body for refreshing the trade market."""
+
+    week: Optional[int] = Field(None, ge=1, le=18)
+    source: Optional[str] = None
+    mode: str = Field("week", pattern="^(week|ros)$")
+
+
+@router.post("/compute/trade-market", status_code=202)
+def compute_trade_market(body: ComputeTradeMarketRequest) -> dict:
+    """
+    Trigger an async trade market refresh.
+
+    Only team pairs involving a roster that changed since the last build are
+    searched again. Returns a job_id that can be polled via GET /jobs/{job_id};
+    job_id is null when a refresh for the same market is already queued.
+    """
+    src = body.source or "mock"
+    if not get_source(src):
+        raise HTTPException(status_code=400, detail=f"Unknown projection source: '{src}'")
+
+    job_id = request_trade_market(body.week, src, body.mode, force=True)
+    return {"job_id": job_id}
+
+
+class ComputeAnalyticsRequest(BaseModel):
+    """Request body for backfilling the analytics store."""
+
+    season: Optional[int] = None
+    league_id: Optional[int] = None
+
+
+@router.post("/compute/analytics", status_code=202)
+def compute_analytics(body: ComputeAnalyticsRequest) -> dict:
+    """
+    Trigger an async analytics backfill.
+
+    Loads a season's persisted valuations and transactions from the database
+    into the DuckDB analytics store. Returns a job_id that can be polled via
+    GET /jobs/{job_id}.
+    """
+    if not analytics.enabled():
+        raise HTTPException(status_code=503, detail="Analytics store unavailable (install duckdb and set ANALYTICS_DB)")
+
+    job_id = enqueue(compute_analytics_task, kwargs={"season": body.season, "league_id": body.league_id})
+    return {"job_id": job_id}
+
+
+class ComputeSimulationRequest(BaseModel):
+    """Request body for a Monte Carlo projection simulation."""
+
+    source: Optional[str] = None
+    weeks: Optional[List[int]] = Field(None, min_length=1)
+    player_ids: Optional[List[str]] = None
+    samples: int = Field(10_000, ge=100, le=100_000)
+    seed: int = Field(0, ge=0)
+
+
+@router.post("/compute/simulation", status_code=202)
+def compute_simulation(body: ComputeSimulationRequest) -> dict:
+    """
+    Trigger an async Monte Carlo simulation of weekly outcomes.
+
+    Draws `samples` outcomes per player and week around the source's
+    projections and reports percentiles, boom/bust probabilities and VORP
+    distributions per player and week (default: every player, every week).
+    The same seed gives the same result. Returns a job_id that can be polled
+    via GET /jobs/{job_id}.
+    """
+    src = body.source or "mock"
+    if not get_source(src):
+        raise HTTPException(status_code=400, detail=f"Unknown projection source: '{src}'")
+    if body.weeks and not all(1 <= w <= 18 for w in body.weeks):
+        raise HTTPException(status_code=400, detail="weeks must be between 1 and 18")
+
+    job_id = enqueue(compute_simulation_task, kwargs={
+        "source": src, "weeks": body.weeks, "player_ids": body.player_ids,
+        "n_samples": body.samples, "seed": body.seed, "processes": SIMULATION_WORKERS,
+    })
+    return {"job_id": job_id}
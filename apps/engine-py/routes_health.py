@@ -1,10 +1,24 @@
 """Health check endpoints."""
 from fastapi import APIRouter
 
+from jobs.tasks import valuation_cache_stats
+from services import store_cache
+from services.lineup import LINEUP_VALUES
+
 router = APIRouter(tags=["health"])
 
 
 @router.get("/health")
 def health() -> dict:
     """Basic health check - returns ok if the service is running."""
-    return {"ok": True}
\ No newline at end of file
+    return {"ok": True}
+
+
+@router.get("/health/caches")
+def cache_stats() -> dict:
+    """Entry counts, hits, misses, expirations and evictions for the in-process caches."""
+    return {
+        "store_reads": store_cache.stats(),
+        "valuations": valuation_cache_stats(),
+        "lineup_values": LINEUP_VALUES.stats(),
+    }
@@ -1,9 +1,15 @@
 """League data ingestion endpoints."""
+import os
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
+from db.session import get_store
+from jobs.tasks import request_league_snapshot
+from services import mock_data
+from services.store import Store
+
 router = APIRouter(tags=["ingest"])
 
 
@@ -36,10 +42,13 @@ class LeagueIngestRequest(BaseModel):
     settings: Dict[str, Any] = Field(
         description="League settings: scoring_json, roster_rules_json, faab_budget, etc."
     )
+    week: int = Field(1, ge=1, le=18, description="NFL week the rosters are for")
+    league_id: Optional[int] = Field(None, ge=1, description="ESPN league id (default: ESPN_LEAGUE_ID)")
+    year: Optional[int] = Field(None, ge=1900, description="Season (default: ESPN_YEAR)")
 
 
 # -----------------------------------------------------------------------------
-# In-Memory Store (MVP - will be replaced with database)
+# Last Payload (debugging aid)
 # -----------------------------------------------------------------------------
 
 _LAST_INGEST: Dict[str, Any] = {}
@@ -56,15 +65,47 @@ def get_last_ingest() -> Dict[str, Any]:
 
 
 @router.post("/ingest/league", status_code=204)
-def ingest_league(body: LeagueIngestRequest) -> None:
+def ingest_league(body: LeagueIngestRequest, store: Optional[Store] = Depends(get_store)) -> None:
     """
     Ingest league data (teams, rosters, settings).
 
-    Currently stores in-memory for demo purposes.
-    TODO: Upsert to database via Store class.
+    The league is identified by `league_id`/`year` (else ESPN_LEAGUE_ID and
+    ESPN_YEAR) as "espn-<id>-<year>", the same scope syncs use. With a
+    database configured both are required and the league is bulk-upserted
+    through the Store (rostered players must be known players). The in-memory
+    teams, rosters and settings are then replaced, the league data version
+    bumped so cached valuations are recomputed, and a league snapshot rewrite
+    queued.
     """
+    league_id = body.league_id or int(os.getenv("ESPN_LEAGUE_ID") or 0)
+    year = body.year or int(os.getenv("ESPN_YEAR") or 0)
+    if store is not None and not (league_id and year):
+        raise HTTPException(
+            status_code=422,
+            detail="league_id and year are required to store a league (or set ESPN_LEAGUE_ID and ESPN_YEAR)",
+        )
+    league = f"espn-{league_id}-{year}" if league_id and year else "local"
+
+    committed = False
     try:
         _LAST_INGEST.clear()
         _LAST_INGEST.update(body.model_dump())
+
+        teams = {t.id: t.model_dump() for t in body.teams}
+        rosters: Dict[str, List[Dict[str, str]]] = {}
+        for r in body.rosters:
+            rosters.setdefault(r.team_id, []).append({"player_id": r.player_id, "slot": r.slot})
+        if store is not None:
+            rostered = {r.player_id for r in body.rosters}
+            store.sync_league(
+                league_id, year, body.week, body.settings, teams, rosters,
+                {pid: p for pid, p in mock_data.PLAYERS.items() if pid in rostered},
+            )
+            store.s.commit()
+            committed = True
+        mock_data.load_league(teams, rosters, body.settings, league=league)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Ingest failed: {e}")
\ No newline at end of file
+        if store is not None and not committed:
+            store.s.rollback()
+        raise HTTPException(status_code=400, detail=f"Ingest failed: {e}")
+    request_league_snapshot()
\ No newline at end of file
@@ -1,98 +1,55 @@
 """Lineup recommendation endpoints."""
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+import os
+import time
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from services.mock_data import PLAYERS, SETTINGS, roster, team
-from services.projections.registry import get_source
-from services.valuation import compute_vorp_for_week
+from db.session import get_store
+from jobs.tasks import week_valuations
+from services.lineup import recommend_lineup as optimize_lineup, recommend_lineups as optimize_lineups
+from services.mock_data import PLAYERS, SETTINGS, TEAMS, roster, team
+from services.store import Store, team_dict
+from services.team_week import roster_view as team_week_view
 
 router = APIRouter(tags=["recommend"])
 
-# Positions eligible for FLEX slot
-FLEX_POSITIONS = ("RB", "WR", "TE")
+# Worker processes for league-wide batches (only used for big leagues)
+LINEUP_WORKERS = int(os.getenv("LINEUP_WORKERS") or os.cpu_count() or 1)
 
 
-# -----------------------------------------------------------------------------
-# Lineup Optimization Logic
-# -----------------------------------------------------------------------------
-
-
-def _optimize_lineup(roster_items: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """
-    Select optimal starters from a roster based on VORP.
-
-    Uses a greedy algorithm: fills required positions first (QB, RB, WR, TE),
-    then selects best remaining FLEX-eligible player.
+def _team(store: Optional[Store], team_id: str) -> Optional[Dict[str, Any]]:
+    """Team details from the database when configured, else the in-memory league."""
+    if store is None:
+        return team(team_id)
+    row = store.get_team(team_id)
+    return team_dict(row) if row else None
 
-    Args:
-        roster_items: List of roster entries with player, slot, and valuation data
 
-    Returns:
-        Dict with starters, bench, and total_vorp
-    """
-    # Build pool of available players (exclude IR)
-    pool: List[Tuple[str, float, Dict[str, Any]]] = []
-    for item in roster_items:
-        if (item.get("slot") or "").upper() == "IR":
-            continue
-        pos = (item.get("player") or {}).get("pos")
-        vorp = (item.get("valuation") or {}).get("vorp")
-        score = float(vorp) if isinstance(vorp, (int, float)) else -999.0
-        pool.append((pos, score, item))
-
-    # Sort by VORP descending
-    pool.sort(key=lambda x: x[1], reverse=True)
-
-    used_ids: set[str] = set()
-    starters: List[Dict[str, Any]] = []
-
-    def take_players(position_filter, slot_label: str, count: int = 1) -> None:
-        """Take up to `count` players matching the filter."""
-        nonlocal pool
-        taken = 0
-        i = 0
-        while i < len(pool) and taken < count:
-            pos, _, item = pool[i]
-            player_id = (item.get("player") or {}).get("id")
-
-            if player_id not in used_ids and position_filter(pos):
-                starters.append({
-                    "slot": slot_label,
-                    "player": item["player"],
-                    "valuation": item.get("valuation"),
-                })
-                used_ids.add(player_id)
-                pool.pop(i)
-                taken += 1
-            else:
-                i += 1
-
-    # Fill required positions
-    take_players(lambda p: p == "QB", "QB", 1)
-    take_players(lambda p: p == "RB", "RB", 2)
-    take_players(lambda p: p == "WR", "WR", 2)
-    take_players(lambda p: p == "TE", "TE", 1)
-    take_players(lambda p: p in FLEX_POSITIONS, "FLEX", 1)
-
-    # Remaining players go to bench
-    bench = [
-        item for _, _, item in pool
-        if (item.get("player") or {}).get("id") not in used_ids
+def _roster(store: Optional[Store], team_id: str, week: int) -> List[Dict[str, str]]:
+    """The team's roster entries for the week (the stored week `roster_week` resolves to)."""
+    if store is None:
+        return roster(team_id)
+    return [
+        {"player_id": rs.player_id, "slot": rs.slot}
+        for rs in store.roster_for_week(team_id, store.roster_week(team_id, week))
     ]
 
-    total_vorp = sum(
-        float((s.get("valuation") or {}).get("vorp") or 0.0)
-        for s in starters
-    )
 
-    return {
-        "starters": starters,
-        "bench": bench,
-        "total_vorp": round(total_vorp, 2),
-    }
+def _roster_view(
+    slots: List[Dict[str, str]], players: Dict[str, Dict[str, Any]], valuations: Dict[str, Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Roster entries joined with player details and the week's valuations."""
+    return [
+        {
+            "player": players.get(slot["player_id"]),
+            "slot": slot["slot"],
+            "valuation": valuations.get(slot["player_id"]),
+        }
+        for slot in slots
+    ]
 
 
 # -----------------------------------------------------------------------------
@@ -104,39 +61,76 @@ def _optimize_lineup(roster_items: List[Dict[str, Any]]) -> Dict[str, Any]:
 def recommend_lineup(
     team_id: str = Query(..., description="Team ID to optimize lineup for"),
     week: Optional[int] = Query(None, ge=1, le=18, description="NFL week number"),
+    store: Optional[Store] = Depends(get_store),
 ) -> dict:
     """
     Get optimal lineup recommendation for a team.
 
-    Analyzes the team's roster and returns the highest-VORP starting lineup,
-    respecting positional constraints (1 QB, 2 RB, 2 WR, 1 TE, 1 FLEX).
+    Analyzes the team's roster and returns the highest-VORP starting lineup
+    for the league's roster rules (QB/RB/WR/TE/K/DST, FLEX, SUPERFLEX/OP, ...).
     """
     w = week or 1
 
     # Validate team exists
-    team_data = team(team_id)
+    team_data = _team(store, team_id)
     if not team_data:
         raise HTTPException(status_code=404, detail="Team not found")
 
-    # Compute valuations for the week
-    src = get_source("mock")
-    projections = src.weekly_points(PLAYERS, week=w)
-    valuations = compute_vorp_for_week(PLAYERS, projections, SETTINGS, w)
-
-    # Build roster view with valuations
-    roster_view = []
-    for slot in roster(team_id):
-        player_id = slot["player_id"]
-        player = PLAYERS.get(player_id)
-        valuation = valuations.get(player_id)
-        roster_view.append({
-            "player": player,
-            "slot": slot["slot"],
-            "valuation": valuation,
-        })
+    if store is not None and store.team_weeks_current(w):
+        # materialized by the valuation job from the latest sync
+        roster_items = team_week_view(store.team_week(team_id, w))
+    else:
+        # Slice valuations for the week from the season matrix
+        slots = _roster(store, team_id, w)
+        players = PLAYERS if store is None else store.players_by_id(s["player_id"] for s in slots)
+        roster_items = _roster_view(slots, players, week_valuations(w))
 
     # Optimize and return
-    result = _optimize_lineup(roster_view)
+    result = optimize_lineup(roster_items, SETTINGS.get("roster_rules_json"))
     result["team"] = team_data
     result["week"] = w
-    return result
\ No newline at end of file
+    return result
+
+
+@router.get("/recommend/lineups")
+def recommend_lineups(
+    week: Optional[int] = Query(None, ge=1, le=18, description="NFL week number"),
+    store: Optional[Store] = Depends(get_store),
+) -> dict:
+    """
+    Get optimal lineups for every team in the league.
+
+    Valuations are computed once for the week and shared by all teams (or read
+    with the rosters as one materialized range when the valuation job built it
+    from the latest sync); large leagues spread the solves over LINEUP_WORKERS
+    processes. Each team entry carries its own `elapsed_ms`, and `timings`
+    breaks down the whole request.
+    """
+    w = week or 1
+    t0 = time.perf_counter()
+
+    if store is not None and store.team_weeks_current(w):
+        views = {team_id: team_week_view(rows) for team_id, rows in store.team_weeks(w).items()}
+        t1 = time.perf_counter()
+    else:
+        valuations = week_valuations(w)
+        t1 = time.perf_counter()
+        if store is None:
+            rosters, players = {team_id: roster(team_id) for team_id in TEAMS}, PLAYERS
+        else:
+            rosters = store.rosters_by_week((w,))[w]
+            players = store.players_by_id(s["player_id"] for slots in rosters.values() for s in slots)
+        views = {team_id: _roster_view(slots, players, valuations) for team_id, slots in rosters.items()}
+    results = optimize_lineups(views, SETTINGS.get("roster_rules_json"), processes=LINEUP_WORKERS)
+    t2 = time.perf_counter()
+
+    teams = [{"team": _team(store, team_id), "week": w, **result} for team_id, result in results.items()]
+    return {
+        "week": w,
+        "teams": teams,
+        "timings": {
+            "valuations_ms": round((t1 - t0) * 1000.0, 3),
+            "optimize_ms": round((t2 - t1) * 1000.0, 3),
+            "total_ms": round((time.perf_counter() - t0) * 1000.0, 3),
+        },
+    }
@@ -1,15 +1,17 @@
 """Player listing endpoints."""
 from typing import Optional
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 
+from db.session import get_async_store
 from services.mock_data import list_players, paginate
+from services.store import AsyncStore
 
 router = APIRouter(tags=["players"])
 
 
 @router.get("/players")
-def get_players(
+async def get_players(
     pos: Optional[str] = Query(
         None,
         pattern="^(QB|RB|WR|TE|K|DST|FLX)$",
@@ -19,12 +21,22 @@ def get_players(
     week: Optional[int] = Query(None, ge=1, le=18, description="NFL week (unused currently)"),
     limit: int = Query(50, ge=1, le=200, description="Max results to return"),
     cursor: Optional[str] = Query(None, description="Pagination cursor"),
+    store: Optional[AsyncStore] = Depends(get_async_store),
 ) -> dict:
     """
     List players with optional filters.
 
     Supports filtering by position and NFL team, with cursor-based pagination.
     """
+    if store is not None:
+        try:
+            offset = int(cursor) if cursor is not None else 0
+        except ValueError:
+            offset = 0
+        page = await store.list_players(pos, team, limit=limit + 1, offset=offset)
+        next_cursor = str(offset + limit) if len(page) > limit else None
+        return {"items": page[:limit], "cursor": next_cursor}
+
     items = list_players(pos, team)
     page, next_cursor = paginate(items, limit, cursor)
     return {"items": page, "cursor": next_cursor}
\ No newline at end of file
@@ -1,24 +1,36 @@
 """Recommendation endpoints for free agents and trades."""
-from typing import List, Optional
+import os
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel, Field
 
+from db.session import get_store
+from jobs.tasks import (
+    request_trade_market,
+    ros_valuations,
+    trade_market,
+    valuation_key,
+    week_valuations,
+)
 from services.mock_data import (
     PLAYERS,
     SETTINGS,
     TEAMS,
-    free_agent_pool,
+    free_agents_by_pos,
     roster as get_roster,
     team as get_team,
 )
-from services.projections.registry import get_source
 from services.recommend_fa import recommend_free_agents
-from services.recommend_trade import simple_one_for_one_trades
-from services.valuation import compute_vorp_for_week
+from services.recommend_trade import search_league_trades
+from services.store import Store, team_dict
 
 router = APIRouter(tags=["recommend"])
 
+# Trade search: worker processes (one task per opponent) and default time budget
+TRADE_WORKERS = int(os.getenv("TRADE_WORKERS") or os.cpu_count() or 1)
+TRADE_BUDGET_MS = int(os.getenv("TRADE_BUDGET_MS") or 2000)
+
 
 # -----------------------------------------------------------------------------
 # Request/Response Models
@@ -35,10 +47,49 @@ class TradeRequest(BaseModel):
     )
     aggressiveness: str = Field(
         default="neutral",
-        description="Trade aggressiveness: conservative, neutral, or aggressive",
+        pattern="^(conservative|neutral|aggressive)$",
+        description="How much the opponent may lose: conservative (nothing), neutral (half your gain), aggressive (your full gain)",
+    )
+    mode: str = Field(
+        default="week",
+        pattern="^(week|ros)$",
+        description="Value players on the given week, or rest-of-season (week through 17)",
+    )
+    budget_ms: int = Field(
+        default=TRADE_BUDGET_MS,
+        ge=50,
+        le=30000,
+        description="Search time budget; when it runs out the best offers found so far are returned",
     )
 
 
+def _team(store: Optional[Store], team_id: str) -> Optional[Dict[str, Any]]:
+    """Team details from the database when configured, else the in-memory league."""
+    if store is None:
+        return get_team(team_id)
+    row = store.get_team(team_id)
+    return team_dict(row) if row else None
+
+
+def _league(store: Optional[Store], week: int) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[Dict[str, str]]]]:
+    """Players by id and every team's roster for the week, from the database when configured."""
+    if store is None:
+        return PLAYERS, {tid: get_roster(tid) for tid in TEAMS}
+    return store.all_players(), store.rosters_by_week((week,))[week]
+
+
+def _free_agents(store: Optional[Store], players: Dict[str, Dict[str, Any]], rosters: Dict[str, List[Dict[str, str]]]):
+    """Unrostered players by position: the ownership index, or the stored rosters' complement."""
+    if store is None:
+        return free_agents_by_pos()
+    owned = {r["player_id"] for entries in rosters.values() for r in entries}
+    by_pos: Dict[str, List[str]] = {}
+    for pid, p in players.items():
+        if pid not in owned:
+            by_pos.setdefault(p["pos"], []).append(pid)
+    return by_pos
+
+
 # -----------------------------------------------------------------------------
 # Routes
 # -----------------------------------------------------------------------------
@@ -50,6 +101,12 @@ def get_free_agent_recommendations(
     week: Optional[int] = Query(None, ge=1, le=18, description="NFL week number"),
     limit: int = Query(10, ge=1, le=50, description="Max suggestions to return"),
     cursor: Optional[str] = Query(None, description="Pagination cursor (unused)"),
+    mode: str = Query(
+        "week",
+        pattern="^(week|ros)$",
+        description="Rank on the given week, or rest-of-season value (week through 17)",
+    ),
+    store: Optional[Store] = Depends(get_store),
 ) -> dict:
     """
     Get ranked free agent pickup suggestions.
@@ -57,74 +114,88 @@ def get_free_agent_recommendations(
     Returns players not on any roster, ranked by how much they would
     improve your team's total VORP compared to your current weakest players.
     """
-    if not get_team(team_id):
+    if not _team(store, team_id):
         raise HTTPException(status_code=404, detail="Team not found")
 
     w = week or 1
+    players, rosters = _league(store, w)
 
-    # Compute projections and valuations
-    src = get_source("mock")
-    projections = src.weekly_points(PLAYERS, week=w)
+    # Cached valuations for the week; ROS uses prefix sums
+    valuations = ros_valuations(w) if mode == "ros" else week_valuations(w)
 
     # Get recommendations
     suggestions = recommend_free_agents(
-        players=PLAYERS,
-        current_roster=get_roster(team_id),
-        free_agents=free_agent_pool(team_id),
-        projections=projections,
+        players=players,
+        current_roster=rosters.get(team_id, []),
+        free_agents=_free_agents(store, players, rosters),
+        projections=None,
         settings=SETTINGS,
         week=w,
         top_n=limit,
+        valuations=valuations,
     )
 
     return {"items": suggestions, "cursor": None}
 
 
 @router.post("/recommend/trades")
-def get_trade_recommendations(body: TradeRequest) -> List[dict]:
+def get_trade_recommendations(
+    body: TradeRequest, response: Response, store: Optional[Store] = Depends(get_store),
+) -> List[dict]:
     """
     Get trade suggestions that improve your team.
 
-    Analyzes all opponents' rosters and suggests 1-for-1 trades where:
-    - You gain VORP (your team improves)
-    - The trade is roughly fair (opponent doesn't lose significantly)
+    Searches 1-for-1, 2-for-1, 1-for-2 and 2-for-2 packages against every
+    opponent, re-optimizing both lineups, and keeps trades where:
+    - You gain VORP (your starting lineup improves)
+    - The opponent's loss stays within the `aggressiveness` fairness threshold
+
+    Offers come from the precomputed trade market when it is current for the
+    league's data version. Otherwise opponents are searched live, in parallel
+    within `budget_ms`, and a market refresh is queued (once per data version).
+    If the budget runs out, or an opponent's search fails, the offers found so
+    far are returned. The `X-Trade-Search-*` headers say which: `Source`
+    (market/live), `Truncated`, `Opponents` (fully searched/total) and `Failed`.
 
     Results are sorted by your VORP gain (best trades first).
     """
-    if not get_team(body.team_id):
+    if not _team(store, body.team_id):
         raise HTTPException(status_code=404, detail="Team not found")
 
     w = body.week or 1
+    src = "mock"
+    players, rosters = _league(store, w)
+    opponents = {tid: r for tid, r in rosters.items() if tid != body.team_id}
+
+    market = trade_market(w, src, mode=body.mode)
+    if market is not None:
+        _search_headers(response, "market", len(opponents), len(opponents), 0)
+        return market.offers_for(body.team_id, body.aggressiveness, body.max_offers_per_opponent)
+
+    # Slice valuations for the week from the season matrix; ROS uses prefix sums
+    valuations = ros_valuations(w, src) if body.mode == "ros" else week_valuations(w, src)
+
+    # Search every opponent (best trades first)
+    offers, search = search_league_trades(
+        players=players,
+        your_roster=rosters.get(body.team_id, []),
+        opponents=opponents,
+        valuations=valuations,
+        roster_rules=SETTINGS.get("roster_rules_json"),
+        max_offers=body.max_offers_per_opponent,
+        aggressiveness=body.aggressiveness,
+        budget_s=body.budget_ms / 1000.0,
+        processes=TRADE_WORKERS,
+        valuation_key=valuation_key(f"ros:{w}" if body.mode == "ros" else w, src),
+    )
+    request_trade_market(w, src, mode=body.mode)
+
+    _search_headers(response, "live", search["searched"], search["opponents"], len(search["failed"]))
+    return offers
+
 
-    # Compute projections and valuations
-    src = get_source("mock")
-    projections = src.weekly_points(PLAYERS, week=w)
-    valuations = compute_vorp_for_week(PLAYERS, projections, SETTINGS, w)
-
-    # Get your roster
-    your_roster = get_roster(body.team_id)
-
-    # Generate trade offers against each opponent
-    all_offers: List[dict] = []
-    for opponent_id in TEAMS.keys():
-        if opponent_id == body.team_id:
-            continue
-
-        opponent_roster = get_roster(opponent_id)
-        offers = simple_one_for_one_trades(
-            players=PLAYERS,
-            your_roster=your_roster,
-            opp_roster=opponent_roster,
-            valuations=valuations,
-            max_offers=body.max_offers_per_opponent,
-        )
-
-        # Tag each offer with the opponent
-        for offer in offers:
-            offer["opponent_team_id"] = opponent_id
-        all_offers.extend(offers)
-
-    # Sort by your gain (best trades first)
-    all_offers.sort(key=lambda x: x.get("delta_you", 0.0), reverse=True)
-
-    return all_offers
\ No newline at end of file
+def _search_headers(response: Response, source: str, searched: int, opponents: int, failed: int) -> None:
+    response.headers["X-Trade-Search-Source"] = source
+    response.headers["X-Trade-Search-Truncated"] = "true" if searched < opponents else "false"
+    response.headers["X-Trade-Search-Opponents"] = f"{searched}/{opponents}"
+    response.headers["X-Trade-Search-Failed"] = str(failed)
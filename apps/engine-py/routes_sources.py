@@ -1,9 +1,10 @@
 """Projection source listing endpoints."""
 from typing import List
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 
-from services.projections.registry import list_sources
+from jobs.tasks import reload_source
+from services.projections.registry import get_source, list_sources
 
 router = APIRouter(tags=["projections"])
 
@@ -16,4 +17,34 @@ def get_projection_sources() -> List[dict]:
     Returns all registered projection providers that can be used
     for valuation calculations.
     """
-    return list_sources()
\ No newline at end of file
+    return list_sources()
+
+
+@router.post("/projections/sources/{source_id}/reload")
+def reload_projection_source(source_id: str) -> dict:
+    """
+    Re-read a file-backed projection source if its file changed.
+
+    A replaced file is re-mapped and the source's version bumped. Cached
+    valuations are patched incrementally when only a few players moved in a
+    week, and `changed` lists, per week, the players whose VORP or ranks
+    changed; otherwise (`revalue`) that source is revalued on next read.
+    Other sources' cached valuations are untouched.
+    """
+    src = get_source(source_id)
+    if src is None:
+        raise HTTPException(status_code=404, detail=f"Unknown source '{source_id}'")
+    if not hasattr(src, "reload"):
+        raise HTTPException(status_code=400, detail=f"Source '{source_id}' does not reload")
+    return reload_source(source_id)
+
+
+@router.get("/projections/consensus/timings")
+def get_consensus_timings() -> dict:
+    """
+    Per-source timing for the consensus blend.
+
+    Returns call counts, cache hits, errors, timeouts and last/total fetch time (ms)
+    for each sub-source the consensus source has queried.
+    """
+    return {"method": get_source("consensus").method, "sources": get_source("consensus").timings()}
@@ -1,19 +1,23 @@
 """Team roster and valuation endpoints."""
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
 
-from services.mock_data import PLAYERS, SETTINGS, roster, team
-from services.projections.registry import get_source
-from services.valuation import compute_vorp_for_week
+from db.session import get_async_store
+from jobs.tasks import get_cached_valuations, week_valuations
+from services.mock_data import PLAYERS, roster, team
+from services.store import AsyncStore, team_dict, week_valuation_dicts
+from services.team_week import roster_view as team_week_view
 
 router = APIRouter(tags=["teams"])
 
 
 @router.get("/teams/{team_id}")
-def get_team(
+async def get_team(
     team_id: str,
     week: Optional[int] = Query(None, ge=1, le=18, description="NFL week number"),
+    store: Optional[AsyncStore] = Depends(get_async_store),
 ) -> dict:
     """
     Get team details with full roster and valuations.
@@ -23,27 +27,50 @@ def get_team(
     """
     w = week or 1
 
-    # Validate team exists
-    team_data = team(team_id)
+    # Validate team exists; read team, roster and players from the database when configured
+    if store is not None:
+        row = await store.get_team(team_id)
+        team_data = team_dict(row) if row else None
+    else:
+        team_data = team(team_id)
     if not team_data:
         raise HTTPException(status_code=404, detail="Team not found")
 
-    # Compute valuations for the week
-    src = get_source("mock")
-    projections = src.weekly_points(PLAYERS, week=w)
-    valuations = compute_vorp_for_week(PLAYERS, projections, SETTINGS, w)
-
-    # Build roster view
-    roster_view = []
-    for slot in roster(team_id):
-        player_id = slot["player_id"]
-        player = PLAYERS.get(player_id)
-        valuation = valuations.get(player_id)
-        roster_view.append({
-            "player": player,
-            "slot": slot["slot"],
-            "valuation": valuation,
-        })
+    if store is not None and await store.team_weeks_current(w):
+        # materialized by the valuation job from the latest sync: one indexed range, no join
+        roster_view = team_week_view(await store.team_week(team_id, w))
+    else:
+        if store is not None:
+            roster_week = await store.roster_week(team_id, w)
+            slots = [
+                {"player_id": rs.player_id, "slot": rs.slot}
+                for rs in await store.roster_for_week(team_id, roster_week)
+            ]
+            players = await store.players_by_id(s["player_id"] for s in slots)
+        else:
+            slots, players = roster(team_id), PLAYERS
+
+        valuations = get_cached_valuations(w)
+        if valuations is None and store is not None:
+            # cold matrix (e.g. after a restart): read the week the valuation job persisted
+            stored = await store.valuations_for_week(w)
+            if stored:
+                valuations = week_valuation_dicts(stored, PLAYERS, w)
+        if valuations is None:
+            # Slice valuations for the week from the season matrix (CPU-bound on a cold cache)
+            valuations = await run_in_threadpool(week_valuations, w)
+
+        # Build roster view
+        roster_view = []
+        for slot in slots:
+            player_id = slot["player_id"]
+            player = players.get(player_id)
+            valuation = valuations.get(player_id)
+            roster_view.append({
+                "player": player,
+                "slot": slot["slot"],
+                "valuation": valuation,
+            })
 
     # Calculate total team VORP
     team_score = sum(
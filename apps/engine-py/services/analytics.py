@@ -0,0 +1,305 @@
+"""
+Embedded DuckDB analytics store (optional).
+
+Keeps valuations for every season in a local columnar DuckDB file so
+multi-season questions -- VORP trends, positional scarcity curves, projection
+source accuracy -- run as vectorized SQL instead of Python loops over dicts.
+
+It is fed two ways:
+
+- the valuation job appends the current season's matrix straight from its
+  NumPy arrays (registered with DuckDB, no per-row Python);
+- `load_from_store` backfills from persisted valuations and transactions.
+
+Actual results are expected as source "actual" for accuracy queries.
+The store is opt-in: the job skips it and the analytics routes answer 503
+unless duckdb is installed and ANALYTICS_DB names the file.
+"""
+
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .mock_data import league_scope
+
+# --- soft import so the engine runs without duckdb ---
+try:
+    import duckdb  # type: ignore
+    _DUCKDB_AVAILABLE = True
+except Exception:  # ImportError or anything else
+    duckdb = None  # type: ignore
+    _DUCKDB_AVAILABLE = False
+
+# DuckDB file the analytics tables live in; unset/"" leaves the store off.
+# DuckDB locks the file, so only one process may have it configured.
+ANALYTICS_DB = os.getenv("ANALYTICS_DB", "")
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS valuations (
+        season INTEGER, week INTEGER, source VARCHAR, player_id VARCHAR, pos VARCHAR,
+        projected_points DOUBLE, vorp DOUBLE, rank_pos INTEGER, rank_overall INTEGER
+    )
+    """,
+    # files from before league scoping: their rows keep a NULL league
+    "ALTER TABLE valuations ADD COLUMN IF NOT EXISTS league_id BIGINT",
+    "CREATE TABLE IF NOT EXISTS players (season INTEGER, id VARCHAR, name VARCHAR, pos VARCHAR, team VARCHAR)",
+    """
+    CREATE TABLE IF NOT EXISTS transactions (
+        league_id BIGINT, season INTEGER, ts TIMESTAMP, type VARCHAR, payload JSON
+    )
+    """,
+)
+
+
+_VALUATION_COLS = (
+    "season, week, source, player_id, pos, projected_points, vorp, rank_pos, rank_overall, league_id"
+)
+
+
+def is_available() -> bool:
+    return _DUCKDB_AVAILABLE
+
+
+def enabled() -> bool:
+    return _DUCKDB_AVAILABLE and bool(ANALYTICS_DB)
+
+
+def season_of(league: Optional[str] = None) -> int:
+    """Season for a league id like "espn-<id>-<year>", else ESPN_YEAR, else the current year."""
+    return league_scope(league or "")[1]
+
+
+class AnalyticsStore:
+    def __init__(self, path: str | os.PathLike = ANALYTICS_DB):
+        self.path = str(path)
+        self._con = None
+        self._lock = Lock()  # guards connect + writes; reads use their own cursors
+
+    def _connect(self):
+        if not _DUCKDB_AVAILABLE:
+            raise ImportError("duckdb is required for analytics (pip install duckdb)")
+        with self._lock:
+            if self._con is None:
+                if self.path != ":memory:":
+                    Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                con = duckdb.connect(self.path)
+                for ddl in _SCHEMA:
+                    con.execute(ddl)
+                self._con = con
+        return self._con
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        cur = self._connect().cursor()  # per-call cursor: safe across threads
+        try:
+            rel = cur.execute(sql, list(params))
+            cols = [d[0] for d in rel.description]
+            return [dict(zip(cols, row)) for row in rel.fetchall()]
+        finally:
+            cur.close()
+
+    # ----- feeding -----
+    def load_season(
+        self, season: int, source: str, season_vals: Any, players: Mapping[str, Mapping[str, Any]], league_id: int,
+    ) -> int:
+        """Replace the league's (season, source) with a `SeasonValuations` matrix; returns rows written."""
+        n_weeks, n = season_vals.points.shape
+        ids = np.asarray(season_vals.player_ids, dtype=object)
+        labels = np.asarray(season_vals.positions, dtype=object)
+        frame = {
+            "season": np.full(n_weeks * n, season, dtype=np.int32),
+            "week": np.repeat(np.asarray(season_vals.weeks, dtype=np.int32), n),
+            "source": np.full(n_weeks * n, source, dtype=object),
+            "player_id": np.tile(ids, n_weeks),
+            "pos": np.tile(labels[np.asarray(season_vals.pos_codes)], n_weeks),
+            "projected_points": np.asarray(season_vals.points, dtype=np.float64).ravel(),
+            "vorp": np.asarray(season_vals.vorp, dtype=np.float64).ravel(),
+            "rank_pos": np.asarray(season_vals.rank_pos, dtype=np.int32).ravel(),
+            "rank_overall": np.asarray(season_vals.rank_overall, dtype=np.int32).ravel(),
+            "league_id": np.full(n_weeks * n, league_id, dtype=np.int64),
+        }
+        people = {
+            "id": np.asarray(list(players), dtype=object),
+            "name": np.asarray([p.get("name") for p in players.values()], dtype=object),
+            "pos": np.asarray([p.get("pos") for p in players.values()], dtype=object),
+            "team": np.asarray([p.get("team") for p in players.values()], dtype=object),
+        }
+        con = self._connect()
+        with self._lock:
+            con.execute("BEGIN")
+            try:
+                con.execute(
+                    "DELETE FROM valuations WHERE season = ? AND source = ? AND league_id = ?", [season, source, league_id]
+                )
+                con.register("_vals", frame)
+                con.execute(f"INSERT INTO valuations ({_VALUATION_COLS}) SELECT {_VALUATION_COLS} FROM _vals")
+                con.unregister("_vals")
+                con.execute("DELETE FROM players WHERE season = ?", [season])
+                con.register("_players", people)
+                con.execute("INSERT INTO players SELECT ?, id, name, pos, team FROM _players", [season])
+                con.unregister("_players")
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+        return n_weeks * n
+
+    def load_from_store(self, session: Any, season: int, league_id: Optional[int] = None) -> Dict[str, int]:
+        """
+        Backfill `season` from the relational store: that season's persisted
+        valuations (ranks recomputed here) joined with player positions, plus
+        its transactions; both limited to `league_id` if given. Only what the
+        backfill reloads is replaced: valuations of the leagues and sources it
+        read, transactions of `league_id` (or the season).
+        """
+        from sqlalchemy import select
+        from db.models import Player, Transaction, Valuation
+
+        vq = (
+            select(Valuation.week, Valuation.source, Valuation.player_id, Player.pos,
+                   Valuation.projected_points, Valuation.vorp, Valuation.league_id)
+            .join(Player, Player.id == Valuation.player_id)
+            .where(Valuation.season == season)
+        )
+        if league_id is not None:
+            vq = vq.where(Valuation.league_id == league_id)
+        rows = session.execute(vq).all()
+        players = session.execute(select(Player.id, Player.name, Player.pos, Player.team)).all()
+        txq = select(Transaction.league_id, Transaction.ts, Transaction.type, Transaction.payload).where(
+            Transaction.year == season
+        )
+        if league_id is not None:
+            txq = txq.where(Transaction.league_id == league_id)
+        txs = session.execute(txq).all()
+
+        con = self._connect()
+        with self._lock:
+            con.execute("BEGIN")
+            try:
+                if rows:
+                    cols = list(zip(*rows))
+                    # the select's own scope: its season, league(s) and the sources it returned
+                    for lid, source in sorted(set(zip(cols[6], cols[1]))):
+                        con.execute(
+                            "DELETE FROM valuations WHERE season = ? AND league_id = ? AND source = ?",
+                            [season, lid, source],
+                        )
+                    con.register("_vals", {
+                        "week": np.asarray(cols[0], dtype=np.int32),
+                        "source": np.asarray(cols[1], dtype=object),
+                        "player_id": np.asarray(cols[2], dtype=object),
+                        "pos": np.asarray(cols[3], dtype=object),
+                        "projected_points": np.asarray(cols[4], dtype=np.float64),
+                        "vorp": np.asarray(cols[5], dtype=np.float64),
+                        "league_id": np.asarray(cols[6], dtype=np.int64),
+                    })
+                    con.execute(
+                        f"""
+                        INSERT INTO valuations ({_VALUATION_COLS})
+                        SELECT ?, week, source, player_id, pos, projected_points, vorp,
+                               row_number() OVER (PARTITION BY league_id, week, source, pos ORDER BY projected_points DESC),
+                               row_number() OVER (PARTITION BY league_id, week, source ORDER BY projected_points DESC),
+                               league_id
+                        FROM _vals
+                        """,
+                        [season],
+                    )
+                    con.unregister("_vals")
+                con.execute("DELETE FROM players WHERE season = ?", [season])
+                if players:
+                    con.executemany("INSERT INTO players VALUES (?, ?, ?, ?, ?)", [(season, *p) for p in players])
+                if league_id is None:
+                    con.execute("DELETE FROM transactions WHERE season = ?", [season])
+                else:
+                    con.execute("DELETE FROM transactions WHERE season = ? AND league_id = ?", [season, league_id])
+                if txs:
+                    con.executemany(
+                        "INSERT INTO transactions VALUES (?, ?, ?, ?, ?)",
+                        [(lid, season, ts, typ, json.dumps(payload)) for lid, ts, typ, payload in txs],
+                    )
+                con.execute("COMMIT")
+            except Exception:
+                con.execute("ROLLBACK")
+                raise
+        return {"valuations": len(rows), "players": len(players), "transactions": len(txs)}
+
+    # ----- queries -----
+    def vorp_trends(
+        self, pos: Optional[str] = None, seasons: int = 3, source: str = "mock", limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Per-player season average/total VORP over the last `seasons` seasons, best latest season first."""
+        return self._query(
+            """
+            WITH recent AS (
+                SELECT DISTINCT season FROM valuations WHERE source = $1
+                ORDER BY season DESC LIMIT $2
+            ),
+            per AS (
+                SELECT v.player_id, v.season, any_value(v.pos) AS pos,
+                       avg(v.vorp) AS avg_vorp, sum(v.vorp) AS total_vorp, count(*) AS weeks
+                FROM valuations v JOIN recent USING (season)
+                WHERE v.source = $1 AND ($3 IS NULL OR v.pos = $3)
+                GROUP BY v.player_id, v.season
+            ),
+            ranked AS (
+                SELECT player_id, max_by(avg_vorp, season) AS latest FROM per GROUP BY player_id
+                ORDER BY latest DESC LIMIT $4
+            )
+            SELECT per.player_id, p.name, per.pos, per.season,
+                   round(per.avg_vorp, 2) AS avg_vorp, round(per.total_vorp, 2) AS total_vorp, per.weeks,
+                   round(per.avg_vorp - lag(per.avg_vorp) OVER (PARTITION BY per.player_id ORDER BY per.season), 2)
+                       AS change
+            FROM per JOIN ranked USING (player_id)
+            LEFT JOIN players p ON p.id = per.player_id AND p.season = per.season
+            ORDER BY ranked.latest DESC, per.player_id, per.season
+            """,
+            [source, seasons, pos, limit],
+        )
+
+    def scarcity_curve(
+        self, season: int, source: str = "mock", week: Optional[int] = None, depth: int = 40,
+    ) -> List[Dict[str, Any]]:
+        """Average VORP at each positional rank (1..depth), per position, for a season or one week."""
+        return self._query(
+            """
+            SELECT pos, rank_pos AS rank, round(avg(vorp), 2) AS vorp, round(avg(projected_points), 2) AS points
+            FROM valuations
+            WHERE season = $1 AND source = $2 AND ($3 IS NULL OR week = $3) AND rank_pos <= $4
+            GROUP BY pos, rank_pos
+            ORDER BY pos, rank_pos
+            """,
+            [season, source, week, depth],
+        )
+
+    def source_accuracy(self, season: int, truth: str = "actual", pos: Optional[str] = None) -> List[Dict[str, Any]]:
+        """MAE, RMSE and bias of every source's projected points against the `truth` source."""
+        return self._query(
+            """
+            SELECT p.source, count(*) AS n,
+                   round(avg(abs(p.projected_points - t.projected_points)), 3) AS mae,
+                   round(sqrt(avg(power(p.projected_points - t.projected_points, 2))), 3) AS rmse,
+                   round(avg(p.projected_points - t.projected_points), 3) AS bias
+            FROM valuations p
+            JOIN valuations t
+              ON t.season = p.season AND t.week = p.week AND t.player_id = p.player_id AND t.source = $2
+             AND t.league_id IS NOT DISTINCT FROM p.league_id
+            WHERE p.season = $1 AND p.source <> $2 AND ($3 IS NULL OR p.pos = $3)
+            GROUP BY p.source
+            ORDER BY mae
+            """,
+            [season, truth, pos],
+        )
+
+    def seasons(self) -> List[Dict[str, Any]]:
+        return self._query(
+            "SELECT season, source, count(DISTINCT week) AS weeks, count(*) AS rows "
+            "FROM valuations GROUP BY season, source ORDER BY season DESC, source"
+        )
+
+
+ANALYTICS = AnalyticsStore()
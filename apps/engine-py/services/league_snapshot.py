@@ -0,0 +1,222 @@
+"""
+On-disk league snapshots for fast cold starts.
+
+A snapshot is a directory holding the whole league state after a sync, as
+fixed-width NumPy columns wherever the data is a table:
+
+- `player_*.npy` -- the player table, one column per field (id, name, pos,
+  team, bye week);
+- `roster_*.npy` -- every roster entry in roster order (team, player, slot);
+- one `.npy` file per season valuation matrix (points, VORP, ranks,
+  replacement levels, position codes) plus its player-id axis;
+- `league.json` -- the small rest: teams, settings, position labels, weeks;
+- `manifest.json` -- format version, league id, projection source, a SHA-256
+  per file and one over those.
+
+Reading checks the manifest only (callers check its league and `created_at`
+against the database first via `read_manifest`). Each file is hashed the first
+time it is read and opened with np.load(mmap_mode="r"), so a restart maps the
+player and roster columns and defers the valuation matrices until a route asks
+for them: nothing is recomputed and a restart is warm in milliseconds instead
+of waiting on an ESPN sync. Writes go to a temp directory that is swapped in
+whole, so readers never see half a snapshot.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .valuation_engine import SeasonValuations
+
+SNAPSHOT_FORMAT = 2
+
+# SeasonValuations fields stored as .npy
+_MATRICES = ("pos_codes", "points", "replacement", "vorp", "rank_pos", "rank_overall")
+# player dict field -> column file; "" / -1 stand for a missing value
+_PLAYER_COLUMNS = {"id": "player_id", "name": "player_name", "pos": "player_pos", "team": "player_team"}
+_PLAYER_BYE = "player_bye"
+_ROSTER_COLUMNS = ("roster_team", "roster_player", "roster_slot")
+
+
+class SnapshotError(ValueError):
+    """A snapshot file is missing or doesn't match the hash in its manifest."""
+
+
+def _file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _manifest_hash(files: Mapping[str, str]) -> str:
+    return hashlib.sha256("".join(f"{name}:{files[name]}\n" for name in sorted(files)).encode()).hexdigest()
+
+
+def _text_column(values: Sequence[Any]) -> np.ndarray:
+    return np.array(["" if v is None else str(v) for v in values], dtype=str)
+
+
+def write_snapshot(
+    path: str | os.PathLike,
+    *,
+    league: str,
+    source: str,
+    players: Mapping[str, Any],
+    teams: Mapping[str, Any],
+    rosters: Mapping[str, Any],
+    settings: Mapping[str, Any],
+    season: SeasonValuations,
+) -> Dict[str, Any]:
+    """Write a snapshot directory, replacing any previous one; returns its manifest."""
+    target = Path(path)
+    tmp = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    columns: Dict[str, np.ndarray] = {
+        name: _text_column([p.get(field) for p in players.values()]) for field, name in _PLAYER_COLUMNS.items()
+    }
+    columns[_PLAYER_BYE] = np.array(
+        [-1 if p.get("bye_week") is None else int(p["bye_week"]) for p in players.values()], dtype=np.int16
+    )
+    entries = [(tid, e["player_id"], e["slot"]) for tid, es in rosters.items() for e in es]
+    for i, name in enumerate(_ROSTER_COLUMNS):
+        columns[name] = _text_column([e[i] for e in entries])
+    columns["season_player_ids"] = _text_column(season.player_ids)
+    for m in _MATRICES:
+        columns[m] = np.ascontiguousarray(getattr(season, m))
+    for name, values in columns.items():
+        np.save(tmp / f"{name}.npy", values)
+    (tmp / "league.json").write_text(json.dumps({
+        "teams": teams,
+        "roster_teams": list(rosters),  # keeps teams with empty rosters
+        "settings": settings,
+        "positions": list(season.positions),
+        "weeks": [int(w) for w in season.weeks],
+    }, default=str))
+
+    files = {p.name: _file_hash(p) for p in sorted(tmp.iterdir())}
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "league": league,
+        "source": source,
+        "created_at": time.time(),
+        "files": files,
+        "sha256": _manifest_hash(files),
+    }
+    (tmp / "manifest.json").write_text(json.dumps(manifest))
+
+    old = target.with_name(f"{target.name}.old-{os.getpid()}")
+    if target.exists():
+        os.replace(target, old)
+    os.replace(tmp, target)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+
+def read_manifest(path: str | os.PathLike) -> Optional[Dict[str, Any]]:
+    """The manifest of the snapshot at `path`, or None if there is none or it has another format version."""
+    try:
+        manifest = json.loads((Path(path) / "manifest.json").read_text())
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format") == SNAPSHOT_FORMAT else None
+
+
+class Snapshot:
+    """
+    An opened snapshot. Reads go file by file: each is hashed against the
+    manifest the first time it is read (raising SnapshotError on a mismatch),
+    then memory-mapped read-only.
+    """
+
+    def __init__(self, path: Path, manifest: Dict[str, Any], verify: bool = True):
+        self.path = path
+        self.manifest = manifest
+        self.league = manifest["league"]
+        self.source = manifest["source"]
+        self.verify = verify
+        self._checked: set = set()
+        self._meta: Optional[Dict[str, Any]] = None
+
+    def _file(self, name: str) -> Path:
+        path = self.path / name
+        if self.verify and name not in self._checked:
+            expected = self.manifest["files"].get(name)
+            try:
+                ok = expected is not None and _file_hash(path) == expected
+            except OSError:
+                ok = False
+            if not ok:
+                raise SnapshotError(f"snapshot file {name} is missing or does not match its hash")
+            self._checked.add(name)
+        return path
+
+    def array(self, name: str) -> np.ndarray:
+        return np.load(self._file(f"{name}.npy"), mmap_mode="r")
+
+    def _league_meta(self) -> Dict[str, Any]:
+        if self._meta is None:
+            self._meta = json.loads(self._file("league.json").read_text())
+        return self._meta
+
+    @property
+    def teams(self) -> Dict[str, Any]:
+        return self._league_meta()["teams"]
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        return self._league_meta()["settings"]
+
+    def players(self) -> Dict[str, Dict[str, Any]]:
+        """The player table as `{id: {id, name, pos, team, bye_week}}` (missing values are None)."""
+        cols = {field: self.array(name).tolist() for field, name in _PLAYER_COLUMNS.items()}
+        byes = self.array(_PLAYER_BYE).tolist()
+        out: Dict[str, Dict[str, Any]] = {}
+        for i, pid in enumerate(cols["id"]):
+            p = {field: values[i] or None for field, values in cols.items()}
+            p["bye_week"] = None if byes[i] < 0 else byes[i]
+            out[pid] = p
+        return out
+
+    def rosters(self) -> Dict[str, List[Dict[str, str]]]:
+        team_col, player_col, slot_col = (self.array(name).tolist() for name in _ROSTER_COLUMNS)
+        out: Dict[str, List[Dict[str, str]]] = {tid: [] for tid in self._league_meta()["roster_teams"]}
+        for tid, pid, slot in zip(team_col, player_col, slot_col):
+            out[tid].append({"player_id": pid, "slot": slot})
+        return out
+
+    def season(self) -> SeasonValuations:
+        """The season valuation matrices, memory-mapped (hashed on this first read)."""
+        meta = self._league_meta()
+        return SeasonValuations(
+            weeks=meta["weeks"],
+            player_ids=self.array("season_player_ids").tolist(),
+            positions=tuple(meta["positions"]),
+            **{m: self.array(m) for m in _MATRICES},
+        )
+
+
+def read_snapshot(path: str | os.PathLike, verify: bool = True) -> Optional[Snapshot]:
+    """
+    Open a snapshot written by `write_snapshot`, or None if there is none, it
+    has another format version, or its file hashes don't add up to its
+    `sha256`. No data file is read yet; see `Snapshot`.
+    """
+    d = Path(path)
+    manifest = read_manifest(d)
+    if manifest is None:
+        return None
+    files = manifest.get("files")
+    if not isinstance(files, dict) or _manifest_hash(files) != manifest.get("sha256"):
+        return None
+    return Snapshot(d, manifest, verify=verify)
@@ -1,76 +1,321 @@
 from __future__ import annotations
-from typing import Dict, Any, List, Tuple
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, Any, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from .valuation_engine import POS_CODES
 
 FLEX_POS = ("RB", "WR", "TE")
+SUPERFLEX_POS = ("QB", "RB", "WR", "TE")
 
-def recommend_lineup(
-    roster_items: List[Dict[str, Any]],   # [{player:{...}, slot:"RB"/"BN"/"IR"... , valuation:{vorp:...}}]
-) -> Dict[str, Any]:
-    """Return optimal starters and bench from a roster+valuation view."""
+DEFAULT_ROSTER_RULES = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1}
+
+# Batch solves below this many rostered players (all teams) stay in-process.
+# Measured on a warm pool: a solve costs ~1.2 us per rostered player, pickling
+# ~0.25 us, and one dispatch round trip ~0.5 ms, so with 4 workers the pool
+# only pays off from roughly a thousand players.
+PARALLEL_MIN_PLAYERS = 1000
+
+# Starting slot label -> eligible positions. Labels not listed here (BN, IR, ...) don't start.
+SLOT_ELIGIBILITY: Dict[str, Tuple[str, ...]] = {
+    "QB": ("QB",), "RB": ("RB",), "WR": ("WR",), "TE": ("TE",), "K": ("K",),
+    "DST": ("DST",), "D/ST": ("DST",), "DEF": ("DST",),
+    "FLEX": FLEX_POS, "FLX": FLEX_POS, "RB/WR/TE": FLEX_POS,
+    "RB/WR": ("RB", "WR"), "WR/TE": ("WR", "TE"),
+    "SUPERFLEX": SUPERFLEX_POS, "SFLEX": SUPERFLEX_POS, "OP": SUPERFLEX_POS, "QB/RB/WR/TE": SUPERFLEX_POS,
+}
+
+
+def pos_mask(pos: Optional[str]) -> int:
+    code = POS_CODES.get(pos or "")
+    return 0 if code is None else 1 << code
+
+
+@dataclass(frozen=True)
+class LineupTemplate:
+    """Starting slots compiled to eligibility bitmasks, grouped into slot types."""
+
+    labels: Tuple[str, ...]       # slot type label, most restrictive first
+    masks: Tuple[int, ...]        # eligible-position bitmask per slot type
+    capacity: Tuple[int, ...]     # number of slots per type
+    order: Tuple[int, ...]        # slot type indices in roster-rules order (for output)
+
+    @property
+    def size(self) -> int:
+        return sum(self.capacity)
+
+
+@lru_cache(maxsize=128)
+def _compile(rules: Tuple[Tuple[str, int], ...]) -> LineupTemplate:
+    types: List[Tuple[str, int, int, int]] = []  # (label, mask, capacity, rules position)
+    for i, (label, count) in enumerate(rules):
+        eligible = SLOT_ELIGIBILITY.get(label.upper().replace(" ", ""))
+        if not eligible or count <= 0:
+            continue
+        mask = 0
+        for pos in eligible:
+            mask |= pos_mask(pos)
+        types.append((label, mask, count, i))
+    # restrictive (fewest eligible positions) first, so direct placements prefer them
+    by_restriction = sorted(range(len(types)), key=lambda t: (bin(types[t][1]).count("1"), types[t][3]))
+    labels = tuple(types[t][0] for t in by_restriction)
+    order = tuple(sorted(range(len(types)), key=lambda t: types[by_restriction[t]][3]))
+    return LineupTemplate(
+        labels=labels,
+        masks=tuple(types[t][1] for t in by_restriction),
+        capacity=tuple(types[t][2] for t in by_restriction),
+        order=order,
+    )
+
+
+def compile_roster_rules(rules: Optional[Dict[str, Any]] = None) -> LineupTemplate:
+    """Compile `roster_rules_json` ({"QB": 1, "FLEX": 2, "OP": 1, ...}) into a template."""
+    rules = rules or DEFAULT_ROSTER_RULES
+    return _compile(tuple((str(k), int(v)) for k, v in rules.items()))
+
+
+def solve_lineup(masks: Sequence[int], scores: Sequence[float], template: LineupTemplate) -> List[int]:
+    """
+    Exact max-score lineup. Returns the slot type index per player (-1 = bench).
+
+    Feasible starter sets form a transversal matroid, so taking players in
+    descending score order and keeping each one that can still be matched
+    (via an augmenting path over slot types) yields an optimal full lineup.
+    Slot types are few, so each insertion is a tiny BFS.
+    """
+    n_types = len(template.masks)
+    type_masks = template.masks
+    free = list(template.capacity)
+    members: List[List[int]] = [[] for _ in range(n_types)]
+    assigned = [-1] * len(scores)
+    open_slots = template.size
+
+    for p in sorted(range(len(scores)), key=lambda i: -scores[i]):
+        if open_slots == 0:
+            break
+        pm = masks[p]
+        if not pm:
+            continue
+        # BFS over slot types; parent[t] = (previous type, player moved from it into t)
+        parent: Dict[int, Tuple[int, int]] = {}
+        queue = [t for t in range(n_types) if type_masks[t] & pm]
+        for t in queue:
+            parent[t] = (-1, p)
+        found = -1
+        qi = 0
+        while qi < len(queue):
+            t = queue[qi]
+            qi += 1
+            if free[t]:
+                found = t
+                break
+            for q in members[t]:
+                qm = masks[q]
+                for u in range(n_types):
+                    if u not in parent and type_masks[u] & qm:
+                        parent[u] = (t, q)
+                        queue.append(u)
+        if found < 0:
+            continue
+        # augment: shift each player on the path one type forward
+        free[found] -= 1
+        open_slots -= 1
+        t = found
+        while True:
+            prev, mover = parent[t]
+            members[t].append(mover)
+            assigned[mover] = t
+            if prev < 0:
+                break
+            members[prev].remove(mover)
+            t = prev
+    return assigned
+
+
+def lineup_value(
+    masks: Sequence[int],
+    scores: Sequence[float],
+    template: LineupTemplate,
+    memo_key: Optional[Hashable] = None,
+) -> float:
+    """
+    Sum of starter scores for the optimal lineup (inner-loop helper for trade/FA search).
+    With a `memo_key` (see `lineup_memo_key`) the value is read from and stored in LINEUP_VALUES.
+    """
+    if memo_key is not None:
+        cached = LINEUP_VALUES.get(memo_key)
+        if cached is not None:
+            return cached
+    value = sum(scores[i] for i, t in enumerate(solve_lineup(masks, scores, template)) if t >= 0)
+    if memo_key is not None:
+        LINEUP_VALUES.put(memo_key, value)
+    return value
+
+
+def rules_signature(rules: Optional[Dict[str, Any]] = None) -> Tuple[Tuple[str, int], ...]:
+    """Order-independent, hashable form of roster rules (the settings part of memo keys)."""
+    return tuple(sorted((str(k), int(v)) for k, v in (rules or DEFAULT_ROSTER_RULES).items()))
+
+
+class LineupValueCache:
+    """
+    LRU memo of optimal lineup values keyed by
+    (valuation key, rules signature, sorted roster player ids).
+
+    The valuation key names the valuations the scores came from -- the
+    (league, source, week, data version) keys used by jobs.tasks -- so a data
+    version bump never serves an old value. What-if rosters differ by a player
+    or two and recur within and across requests, so most lookups hit.
+    """
+
+    def __init__(self, max_entries: int = 8192):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[float]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: float) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+LINEUP_VALUES = LineupValueCache(max_entries=int(os.getenv("LINEUP_CACHE_SIZE") or 50_000))
+
+
+def lineup_memo_key(valuation_key: Hashable, rules_sig: Tuple[Tuple[str, int], ...], player_ids: Iterable[str]) -> Hashable:
+    return (valuation_key, rules_sig, tuple(sorted(player_ids)))
+
+
+def _lineup_inputs(roster_items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[int], List[float]]:
     # filter out IR and players w/o valuation (treat missing as very low)
-    items: List[Tuple[str, float, Dict[str, Any]]] = []
+    items: List[Dict[str, Any]] = []
+    masks: List[int] = []
+    scores: List[float] = []
     for it in roster_items:
-        p = it.get("player") or {}
-        pos = p.get("pos")
-        if it.get("slot", "").upper() == "IR":
+        if (it.get("slot") or "").upper() == "IR":
             continue
         v = (it.get("valuation") or {}).get("vorp")
-        score = float(v) if isinstance(v, (int, float)) else -999.0
-        items.append((pos, score, it))
-
-    # sort by score desc
-    items.sort(key=lambda x: x[1], reverse=True)
-
-    chosen = {"QB": None, "RB": [], "WR": [], "TE": None, "FLEX": None}
-    used_ids: set[str] = set()
-
-    def pick_first(predicate):
-        for idx, (pos, score, it) in enumerate(items):
-            pid = (it.get("player") or {}).get("id")
-            if pid in used_ids:
-                continue
-            if predicate(pos):
-                used_ids.add(pid)
-                return items.pop(idx)[2]
-        return None
-
-    # Required slots
-    chosen["QB"]  = pick_first(lambda pos: pos == "QB")
-    chosen["RB"].append(pick_first(lambda pos: pos == "RB"))
-    chosen["RB"].append(pick_first(lambda pos: pos == "RB"))
-    chosen["WR"].append(pick_first(lambda pos: pos == "WR"))
-    chosen["WR"].append(pick_first(lambda pos: pos == "WR"))
-    chosen["TE"]  = pick_first(lambda pos: pos == "TE")
-
-    # FLEX (best remaining RB/WR/TE)
-    best_flex = pick_first(lambda pos: pos in FLEX_POS)
-    chosen["FLEX"] = best_flex
-
-    # Bench = everyone else not used (and not IR)
-    bench = []
-    for _, _, it in items:
-        pid = (it.get("player") or {}).get("id")
-        if pid not in used_ids:
-            bench.append(it)
-
-    # Flatten result into clean payload
+        items.append(it)
+        masks.append(pos_mask((it.get("player") or {}).get("pos")))
+        scores.append(float(v) if isinstance(v, (int, float)) else -999.0)
+    return items, masks, scores
+
+
+def _lineup_payload(
+    items: List[Dict[str, Any]],
+    scores: List[float],
+    assigned: List[int],
+    template: LineupTemplate,
+) -> Dict[str, Any]:
+    ranked = sorted(range(len(items)), key=lambda i: -scores[i])
+
+    # Flatten result into clean payload: slot types in roster-rules order, best first
     starters = []
-    def add(slot_name: str, it_or_list):
-        if isinstance(it_or_list, list):
-            for it in it_or_list:
-                if it:
-                    starters.append({"slot": slot_name, "player": it["player"], "valuation": it.get("valuation")})
-        elif it_or_list:
-            it = it_or_list
-            starters.append({"slot": slot_name, "player": it["player"], "valuation": it.get("valuation")})
-
-    add("QB",  chosen["QB"])
-    add("RB",  [x for x in chosen["RB"] if x])
-    add("WR",  [x for x in chosen["WR"] if x])
-    add("TE",  chosen["TE"])
-    add("FLEX",chosen["FLEX"])
+    for t in template.order:
+        for i in ranked:
+            if assigned[i] == t:
+                it = items[i]
+                starters.append({"slot": template.labels[t], "player": it["player"], "valuation": it.get("valuation")})
+    bench = [items[i] for i in ranked if assigned[i] < 0]
 
     # compute simple total
     total_vorp = sum(float((s.get("valuation") or {}).get("vorp") or 0.0) for s in starters)
 
     return {"starters": starters, "bench": bench, "total_vorp": round(total_vorp, 2)}
+
+
+def recommend_lineup(
+    roster_items: List[Dict[str, Any]],   # [{player:{...}, slot:"RB"/"BN"/"IR"... , valuation:{vorp:...}}]
+    roster_rules: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Return optimal starters and bench from a roster+valuation view under `roster_rules`."""
+    template = compile_roster_rules(roster_rules)
+    items, masks, scores = _lineup_inputs(roster_items)
+    return _lineup_payload(items, scores, solve_lineup(masks, scores, template), template)
+
+
+def _solve_timed(
+    jobs: List[Tuple[str, List[int], List[float]]],
+    template: LineupTemplate,
+) -> List[Tuple[str, List[int], float]]:
+    """Solve a chunk of (team_id, masks, scores); top-level so it can run in a worker process."""
+    out = []
+    for team_id, masks, scores in jobs:
+        t0 = time.perf_counter()
+        assigned = solve_lineup(masks, scores, template)
+        out.append((team_id, assigned, (time.perf_counter() - t0) * 1000.0))
+    return out
+
+
+# Lineup worker pool, kept apart from the trade search pool so batch solves
+# never queue behind (or block) long trade searches.
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = Lock()
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    """Shared worker pool, started on first use so requests don't pay for process startup."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=workers)
+        return _POOL
+
+
+def recommend_lineups(
+    rosters: Dict[str, List[Dict[str, Any]]],   # team_id -> roster+valuation view
+    roster_rules: Optional[Dict[str, Any]] = None,
+    processes: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Optimal lineup for every team, each with its own `elapsed_ms` solve time.
+
+    Only masks and scores cross the process boundary: with processes > 1 and at
+    least PARALLEL_MIN_PLAYERS rostered players the solves are chunked over the
+    shared lineup pool, smaller leagues solve inline (a pool costs more than it
+    saves there).
+    """
+    template = compile_roster_rules(roster_rules)
+    inputs = {tid: _lineup_inputs(items) for tid, items in rosters.items()}
+    jobs = [(tid, masks, scores) for tid, (_, masks, scores) in inputs.items()]
+
+    n_players = sum(len(masks) for _, masks, _ in jobs)
+    if processes and processes > 1 and len(jobs) > 1 and n_players >= PARALLEL_MIN_PLAYERS:
+        chunks = [c for c in (jobs[i::processes] for i in range(processes)) if c]
+        parts = list(_pool(processes).map(_solve_timed, chunks, [template] * len(chunks)))
+        solved = {tid: (assigned, ms) for part in parts for tid, assigned, ms in part}
+    else:
+        solved = {tid: (assigned, ms) for tid, assigned, ms in _solve_timed(jobs, template)}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for tid, (items, _, scores) in inputs.items():
+        assigned, ms = solved[tid]
+        results[tid] = _lineup_payload(items, scores, assigned, template)
+        results[tid]["elapsed_ms"] = round(ms, 3)
+    return results
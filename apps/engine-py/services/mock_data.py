@@ -10,7 +10,10 @@ store with real league data at runtime.
 """
 
 from __future__ import annotations
-from typing import Dict, Any, List, Optional
+import datetime
+import os
+import re
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 
 # --- Expanded mock player pool (20 players across positions) ---
 PLAYERS: Dict[str, Dict[str, Any]] = {
@@ -64,6 +67,117 @@ ROSTERS: Dict[str, List[Dict[str, str]]] = {
 
 SETTINGS = {"roster_rules_json": {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1, "BN": 6}}
 
+# League identity + data version. Writers bump the version whenever players,
+# rosters or settings change so version-keyed caches stop serving old results.
+_LEAGUE: Dict[str, Any] = {"id": "local", "version": 0}
+
+def league_id() -> str:
+    return _LEAGUE["id"]
+
+_ESPN_LEAGUE = re.compile(r"^espn-(\d+)-(\d{4})$")
+
+def league_scope(league: Optional[str] = None) -> Tuple[int, int]:
+    """
+    (league id, season) for a league id like "espn-<id>-<year>" (the current
+    league if None). Other ids fall back to ESPN_LEAGUE_ID (else 0) and
+    ESPN_YEAR (else the current year).
+    """
+    m = _ESPN_LEAGUE.match(league_id() if league is None else league)
+    if m:
+        return int(m.group(1)), int(m.group(2))
+    return int(os.getenv("ESPN_LEAGUE_ID") or 0), int(os.getenv("ESPN_YEAR") or datetime.date.today().year)
+
+def data_version() -> int:
+    return _LEAGUE["version"]
+
+def bump_data_version() -> int:
+    _LEAGUE["version"] += 1
+    return _LEAGUE["version"]
+
+# League ownership index: player_id -> team_id for every rostered player, plus
+# the complement (free agents) partitioned by position. load_league applies the
+# roster adds/drops and player diffs to both, so neither is rebuilt and FA reads
+# never rescan PLAYERS or the rosters.
+OWNERS: Dict[str, str] = {}
+_FA_BY_POS: Dict[str, Dict[str, None]] = {}  # pos -> insertion-ordered set of player ids
+
+def _roster_moves(
+    old: Dict[str, List[Dict[str, str]]], new: Dict[str, List[Dict[str, str]]],
+) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """(drops, adds) as (team_id, player_id) turning rosters `old` into `new`; slot moves are neither."""
+    drops: List[Tuple[str, str]] = []
+    adds: List[Tuple[str, str]] = []
+    for team_id in old.keys() | new.keys():
+        before, after = old.get(team_id, []), new.get(team_id, [])
+        if before == after:
+            continue
+        was = {r["player_id"] for r in before}
+        now = {r["player_id"] for r in after}
+        drops.extend((team_id, pid) for pid in was - now)
+        adds.extend((team_id, pid) for pid in now - was)
+    return drops, adds
+
+def _apply_moves(drops: Iterable[Tuple[str, str]], adds: Iterable[Tuple[str, str]]) -> None:
+    """Drops first, so a player traded between teams ends up owned by the new team."""
+    for team_id, pid in drops:
+        if OWNERS.get(pid) == team_id:
+            del OWNERS[pid]
+            p = PLAYERS.get(pid)
+            if p is not None:
+                _FA_BY_POS.setdefault(p["pos"], {})[pid] = None
+    for team_id, pid in adds:
+        if pid not in OWNERS:
+            p = PLAYERS.get(pid)
+            if p is not None:
+                _FA_BY_POS.get(p["pos"], {}).pop(pid, None)
+        OWNERS[pid] = team_id
+
+def _repartition(changed_players: Dict[str, Optional[str]]) -> None:
+    """Move players whose record changed between FA partitions; maps player_id -> previous pos (None if new)."""
+    for pid, old_pos in changed_players.items():
+        if old_pos is not None:
+            _FA_BY_POS.get(old_pos, {}).pop(pid, None)
+        p = PLAYERS.get(pid)
+        if p is not None and pid not in OWNERS:
+            _FA_BY_POS.setdefault(p["pos"], {})[pid] = None
+
+def _changed_players(players: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """Players added, removed or moved to another position by replacing PLAYERS with `players`."""
+    changed = {
+        pid: p["pos"] for pid, p in PLAYERS.items()
+        if pid not in players or players[pid].get("pos") != p["pos"]
+    }
+    changed.update({pid: None for pid in players.keys() - PLAYERS.keys()})
+    return changed
+
+def load_league(
+    teams: Dict[str, Dict[str, Any]],
+    rosters: Dict[str, List[Dict[str, str]]],
+    settings: Dict[str, Any],
+    players: Optional[Dict[str, Dict[str, Any]]] = None,
+    league: Optional[str] = None,
+) -> None:
+    """Replace league state in place (module globals keep their identity)."""
+    drops, adds = _roster_moves(ROSTERS, rosters)
+    TEAMS.clear()
+    TEAMS.update(teams)
+    ROSTERS.clear()
+    ROSTERS.update(rosters)
+    SETTINGS.clear()
+    SETTINGS.update(settings)
+    if players is not None:
+        changed = _changed_players(players)
+        PLAYERS.clear()
+        PLAYERS.update(players)
+        _repartition(changed)
+    if league is not None:
+        _LEAGUE["id"] = league
+    _apply_moves(drops, adds)
+    bump_data_version()
+
+_repartition({pid: None for pid in PLAYERS})
+_apply_moves([], _roster_moves({}, ROSTERS)[1])
+
 # ----------------- Helpers used by routes -----------------
 def list_players(pos: Optional[str] = None, nfl_team: Optional[str] = None) -> List[Dict[str, Any]]:
     items = list(PLAYERS.values())
@@ -88,6 +202,11 @@ def team(team_id: str) -> Optional[Dict[str, Any]]:
 def roster(team_id: str) -> List[Dict[str, str]]:
     return ROSTERS.get(team_id, [])
 
-def free_agent_pool(team_id: str) -> List[str]:
-    on_team = {r["player_id"] for r in roster(team_id)}
-    return [pid for pid in PLAYERS.keys() if pid not in on_team]
+def free_agents_by_pos(positions: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+    """Unrostered player ids per position (all positions by default)."""
+    keys = _FA_BY_POS.keys() if positions is None else positions
+    return {pos: list(_FA_BY_POS.get(pos, ())) for pos in keys}
+
+def free_agent_pool(pos: Optional[str] = None) -> List[str]:
+    """Players on no roster in the league, optionally for one position."""
+    return [pid for ids in free_agents_by_pos(None if pos is None else [pos]).values() for pid in ids]
@@ -1,4 +1,6 @@
-from typing import Dict, Any, Protocol
+from typing import Dict, Any, Protocol, Sequence
+
+import numpy as np
 
 class ProjectionSource(Protocol):
     id: str
@@ -8,3 +10,33 @@ class ProjectionSource(Protocol):
     def weekly_points(self, players: Dict[str, Dict[str, Any]], *, week: int) -> Dict[str, float]:
         """Return projected fantasy points for each player_id for the given week."""
         ...
+
+    def weekly_points_many(self, players: Dict[str, Dict[str, Any]], weeks: Sequence[int]) -> np.ndarray:
+        """
+        Return a dense [len(weeks), len(players)] float matrix of projected points.
+        Columns follow `players` iteration order. Optional: see `weekly_points_many()`.
+        """
+        ...
+
+def source_version(source: ProjectionSource) -> int:
+    """
+    The source's own projection version (0 if it has none). Sources whose
+    projections can change in place (e.g. a reloaded file) bump it, so caches
+    keyed on it drop only that source's results.
+    """
+    return int(getattr(source, "version", 0))
+
+def weekly_points_many(
+    source: ProjectionSource,
+    players: Dict[str, Dict[str, Any]],
+    weeks: Sequence[int],
+) -> np.ndarray:
+    """Batch projections from `source`, falling back to one weekly_points call per week."""
+    many = getattr(source, "weekly_points_many", None)
+    if many is not None:
+        return np.asarray(many(players, weeks), dtype=np.float64)
+    out = np.empty((len(weeks), len(players)), dtype=np.float64)
+    for i, w in enumerate(weeks):
+        proj = source.weekly_points(players, week=w)
+        out[i] = [proj[pid] for pid in players]
+    return out
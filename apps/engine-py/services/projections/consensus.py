@@ -0,0 +1,170 @@
+"""
+Consensus projection source.
+
+Fans out to the other registered sources concurrently and blends their
+[weeks, players] matrices with a weighted mean, a median or a trimmed mean.
+Each sub-source result is cached on its own under the league data version
+and that source's version, so a failing or reloaded source never forces the
+others to recompute. A source that misses the per-call timeout is dropped from
+that blend too. Each source fetches on its own single worker, so a hung source
+holds one thread and never starves the others. Its in-flight fetch is shared
+by later blends rather than started again, and queued fetches that time out
+are cancelled.
+"""
+
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from threading import Lock
+from typing import Any, Callable, Dict, Sequence, Tuple
+
+import numpy as np
+
+from .. import mock_data
+from .base import ProjectionSource, source_version, weekly_points_many
+
+METHODS = ("mean", "median", "trimmed")
+
+
+def blend(stack: np.ndarray, method: str = "mean", weights: np.ndarray | None = None, trim: float = 0.1) -> np.ndarray:
+    """Blend an [S, W, P] stack of source matrices into one [W, P] matrix."""
+    if method == "median":
+        return np.median(stack, axis=0)
+    if method == "trimmed":
+        k = int(trim * stack.shape[0])
+        if k == 0 or stack.shape[0] - 2 * k < 1:
+            return stack.mean(axis=0)
+        return np.sort(stack, axis=0)[k:stack.shape[0] - k].mean(axis=0)
+    if method != "mean":
+        raise ValueError(f"unknown blend method '{method}'")
+    if weights is None:
+        return stack.mean(axis=0)
+    w = weights / weights.sum()
+    return np.tensordot(w, stack, axes=1)
+
+
+class ConsensusSource:
+    id = "consensus"
+    name = "Consensus"
+    description = "Blend of the other registered sources (mean, median or trimmed mean)"
+
+    def __init__(
+        self,
+        sources: Callable[[], Dict[str, ProjectionSource]],
+        weights: Dict[str, float] | None = None,
+        method: str = "mean",
+        trim: float = 0.1,
+        cache_size: int = 32,
+        timeout_s: float | None = None,
+    ):
+        if method not in METHODS:
+            raise ValueError(f"unknown blend method '{method}'")
+        self._sources = sources
+        self.weights = weights or {}
+        self.method = method
+        self.trim = trim
+        self.timeout_s = timeout_s  # per blend; None waits for every source
+        self._pools: Dict[str, ThreadPoolExecutor] = {}  # one worker per sub-source
+        self._inflight: Dict[Tuple[str, int, int, Tuple[int, ...]], Future] = {}
+        self._cache: "OrderedDict[Tuple[str, int, int, Tuple[int, ...]], np.ndarray]" = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = Lock()
+        self._timings: Dict[str, Dict[str, Any]] = {}
+
+    # ----- per-source fetch + cache -----
+    def _stats(self, sid: str) -> Dict[str, Any]:
+        return self._timings.setdefault(
+            sid, {"calls": 0, "cache_hits": 0, "errors": 0, "timeouts": 0, "last_ms": None, "total_ms": 0.0},
+        )
+
+    def _fetch(self, sid: str, src: ProjectionSource, players: Dict[str, Dict[str, Any]], version: int, weeks: Tuple[int, ...]) -> np.ndarray:
+        # players is the league's player table, which the data version identifies
+        key = (sid, version, source_version(src), weeks)
+        with self._lock:
+            hit = self._cache.get(key)
+            stats = self._stats(sid)
+            if hit is not None and hit.shape[1] == len(players):
+                self._cache.move_to_end(key)
+                stats["cache_hits"] += 1
+                return hit
+        t0 = time.perf_counter()
+        try:
+            matrix = weekly_points_many(src, players, weeks)
+        except Exception:
+            with self._lock:
+                stats["errors"] += 1
+            raise
+        ms = (time.perf_counter() - t0) * 1000.0
+        with self._lock:
+            stats["calls"] += 1
+            stats["last_ms"] = round(ms, 3)
+            stats["total_ms"] = round(stats["total_ms"] + ms, 3)
+            self._cache[key] = matrix
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return matrix
+
+    def _submit(self, sid: str, src: ProjectionSource, players: Dict[str, Dict[str, Any]], version: int, weeks: Tuple[int, ...]) -> Future:
+        """The fetch for this key already running on `sid`'s worker, or a new one."""
+        key = (sid, version, source_version(src), weeks)
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None and not fut.done():
+                return fut
+            pool = self._pools.get(sid)
+            if pool is None:
+                pool = self._pools[sid] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"consensus-{sid}")
+            fut = self._inflight[key] = pool.submit(self._fetch, sid, src, players, version, weeks)
+        fut.add_done_callback(lambda f: self._forget(key, f))
+        return fut
+
+    def _forget(self, key: Tuple[str, int, int, Tuple[int, ...]], fut: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    def invalidate(self, source_id: str | None = None) -> None:
+        with self._lock:
+            for k in [k for k in self._cache if source_id is None or k[0] == source_id]:
+                del self._cache[k]
+
+    def timings(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {sid: dict(s) for sid, s in self._timings.items()}
+
+    @property
+    def version(self) -> int:
+        """Moves whenever a sub-source's version does (versions only grow)."""
+        return sum(source_version(s) for s in self._sources().values() if s is not self)
+
+    # ----- ProjectionSource -----
+    def weekly_points(self, players: Dict[str, Dict[str, Any]], *, week: int) -> Dict[str, float]:
+        return dict(zip(players, self.weekly_points_many(players, [week])[0].tolist()))
+
+    def weekly_points_many(self, players: Dict[str, Dict[str, Any]], weeks: Sequence[int]) -> np.ndarray:
+        sources = {sid: s for sid, s in self._sources().items() if s is not self}
+        if not sources:
+            raise ValueError("consensus source has no sub-sources")
+        version = mock_data.data_version()
+        wkey = tuple(int(w) for w in weeks)
+        futures = {sid: self._submit(sid, src, players, version, wkey) for sid, src in sources.items()}
+        _, late = wait(futures.values(), timeout=self.timeout_s)
+
+        ids, mats = [], []
+        for sid, fut in futures.items():
+            if fut in late:
+                fut.cancel()  # only succeeds while queued; a running fetch finishes and fills the cache
+                with self._lock:
+                    self._stats(sid)["timeouts"] += 1
+                continue  # a slow source drops out of this blend
+            try:
+                mats.append(fut.result())
+                ids.append(sid)
+            except Exception:
+                continue  # a failing source drops out of the blend
+        if not mats:
+            raise ValueError("all consensus sub-sources failed or timed out")
+
+        weights = np.array([float(self.weights.get(sid, 1.0)) for sid in ids])
+        return blend(np.stack(mats), self.method, weights, self.trim)
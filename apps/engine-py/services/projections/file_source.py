@@ -0,0 +1,138 @@
+"""
+File-backed projection source.
+
+Reads per-player, per-week projections from a local columnar file without
+parsing or copying it:
+
+- a directory holding `points.npy` ([weeks, players] float matrix),
+  `player_ids.json` and `weeks.json` -- opened with np.load(mmap_mode="r");
+- an Arrow IPC file (`.arrow` / `.feather`) with a `player_id` column and one
+  `w<week>` column per week -- memory-mapped, requires pyarrow.
+
+Both map the file into memory, so pages are shared across worker processes
+and only the weeks that are actually read get touched. Replace files by
+renaming a new one over them (as `write_projection_dir` does), never by
+rewriting them in place under a live mapping.
+
+Reads never check the file. `changed()` compares its modification times and
+inodes with the mapped ones, and `reload()` re-maps it and bumps this
+source's `version`. The reload endpoint does both, so only valuations
+computed from this source are recomputed.
+"""
+
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# --- soft import so the npy format works without pyarrow ---
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.ipc  # type: ignore  # noqa: F401
+    _ARROW_AVAILABLE = True
+except Exception:  # ImportError or anything else
+    pa = None  # type: ignore
+    _ARROW_AVAILABLE = False
+
+_ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+
+
+def write_projection_dir(path: str | os.PathLike, player_ids: Sequence[str], weeks: Sequence[int], points: np.ndarray) -> None:
+    """
+    Write the npy directory format read by `FileSource`. Each file is written
+    aside and renamed over the old one, so a reader's existing mapping keeps
+    the previous contents until it reloads.
+    """
+    d = Path(path)
+    d.mkdir(parents=True, exist_ok=True)
+    with open(d / "points.npy.tmp", "wb") as f:
+        np.save(f, np.ascontiguousarray(points, dtype=np.float64))
+    (d / "player_ids.json.tmp").write_text(json.dumps(list(player_ids)))
+    (d / "weeks.json.tmp").write_text(json.dumps([int(w) for w in weeks]))
+    for name in ("player_ids.json", "weeks.json", "points.npy"):
+        os.replace(d / f"{name}.tmp", d / name)
+
+
+class FileSource:
+    id = "file"
+    name = "File"
+    description = "Projections from a local columnar file (memory-mapped)"
+
+    def __init__(self, path: str | os.PathLike, source_id: str | None = None):
+        self.path = Path(path)
+        if source_id:
+            self.id = source_id
+        self.version = 0
+        self._loaded = False
+
+    # ----- lazy loading -----
+    def changed(self) -> bool:
+        """True if the file was replaced since it was mapped (or was never mapped)."""
+        return not self._loaded or self._file_stamp() != self._stamp
+
+    def reload(self) -> None:
+        """Drop current mappings and bump `version`; the file is re-mapped on next access."""
+        self._loaded = False
+        self.version += 1
+
+    def _files(self) -> List[Path]:
+        if self.path.suffix in _ARROW_SUFFIXES:
+            return [self.path]
+        return [self.path / n for n in ("points.npy", "player_ids.json", "weeks.json")]
+
+    def _file_stamp(self) -> tuple:
+        # the inode catches a rename-over within the filesystem's mtime granularity
+        return tuple((st.st_mtime_ns, st.st_ino) for st in (f.stat() for f in self._files()))
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        stamp = self._file_stamp()  # taken first: a write during the load is seen by changed()
+        if self.path.suffix in _ARROW_SUFFIXES:
+            if not _ARROW_AVAILABLE:
+                raise ImportError("pyarrow is required for Arrow IPC projection files")
+            table = pa.ipc.open_file(pa.memory_map(str(self.path), "r")).read_all()
+            self._table = table
+            self._matrix = None
+            player_ids: List[str] = table.column("player_id").to_pylist()
+            self._weeks = [int(n[1:]) for n in table.column_names if n.startswith("w") and n[1:].isdigit()]
+        else:
+            self._table = None
+            self._matrix = np.load(self.path / "points.npy", mmap_mode="r")
+            player_ids = json.loads((self.path / "player_ids.json").read_text())
+            self._weeks = json.loads((self.path / "weeks.json").read_text())
+        self._col = {pid: i for i, pid in enumerate(player_ids)}
+        self._row = {w: i for i, w in enumerate(self._weeks)}
+        self._stamp = stamp
+        self._loaded = True
+
+    def _week_values(self, week: int) -> np.ndarray | None:
+        """One week across all file players; None if the file has no such week."""
+        if week not in self._row:
+            return None
+        if self._table is not None:
+            return self._table.column(f"w{week}").to_numpy()
+        return self._matrix[self._row[week]]
+
+    # ----- ProjectionSource -----
+    def weeks(self) -> List[int]:
+        self._load()
+        return list(self._weeks)
+
+    def weekly_points(self, players: Dict[str, Dict[str, Any]], *, week: int) -> Dict[str, float]:
+        return dict(zip(players, self.weekly_points_many(players, [week])[0].tolist()))
+
+    def weekly_points_many(self, players: Dict[str, Dict[str, Any]], weeks: Sequence[int]) -> np.ndarray:
+        """Players or weeks missing from the file project to 0.0."""
+        self._load()
+        cols = np.fromiter((self._col.get(pid, -1) for pid in players), dtype=np.int64, count=len(players))
+        known = cols >= 0
+        out = np.zeros((len(weeks), len(players)), dtype=np.float64)
+        for i, w in enumerate(weeks):
+            values = self._week_values(w)
+            if values is not None:
+                out[i, known] = values[cols[known]]
+        return out
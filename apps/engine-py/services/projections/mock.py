@@ -1,12 +1,39 @@
-from typing import Dict, Any
-import hashlib
+from typing import Dict, Any, Sequence
+import zlib
 
-# tiny deterministic helper
-def _hash01(key: str) -> float:
-    h = hashlib.md5(key.encode()).hexdigest()
-    return int(h[:8], 16) / 0xFFFFFFFF
+import numpy as np
 
-_BASE_BY_POS = {"QB": 18.0, "RB": 12.0, "WR": 11.0, "TE": 8.0}
+from ..valuation_engine import BASE_POINTS_BY_POS
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+
+def _splitmix64(z: np.ndarray) -> np.ndarray:
+    # uint64 arithmetic wraps, which is what the mixer wants
+    z = (z ^ (z >> np.uint64(30))) * _M1
+    z = (z ^ (z >> np.uint64(27))) * _M2
+    return z ^ (z >> np.uint64(31))
+
+def mock_points_matrix(players: Dict[str, Dict[str, Any]], weeks: Sequence[int], source_id: str) -> np.ndarray:
+    """
+    Deterministic [len(weeks), len(players)] projections: base_by_pos + noise.
+
+    One crc32 per player seeds a vectorized splitmix64 over (player, week), so
+    the whole matrix costs a few array ops instead of an MD5 per cell.
+    """
+    seeds = np.fromiter(
+        (zlib.crc32(f"{pid}:{source_id}".encode()) for pid in players),
+        dtype=np.uint64, count=len(players),
+    )
+    base = np.fromiter(
+        (BASE_POINTS_BY_POS.get(p.get("pos", ""), 0.0) for p in players.values()),
+        dtype=np.float64, count=len(players),
+    )
+    w = np.asarray(weeks, dtype=np.uint64)[:, None]
+    z = _splitmix64(_splitmix64(seeds)[None, :] + w * _GOLDEN)
+    unit = (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))  # 0..1
+    return base[None, :] + unit * 6.0  # up to ~6 pts variation
 
 class MockSource:
     id = "mock"
@@ -14,10 +41,7 @@ class MockSource:
     description = "Deterministic dev source for projections"
 
     def weekly_points(self, players: Dict[str, Dict[str, Any]], *, week: int) -> Dict[str, float]:
-        out: Dict[str, float] = {}
-        for pid, p in players.items():
-            pos = p.get("pos", "")
-            base = _BASE_BY_POS.get(pos, 0.0)
-            noise = _hash01(f"{pid}:{week}:{self.id}") * 6.0  # ± ~6 pts
-            out[pid] = base + noise
-        return out
+        return dict(zip(players, self.weekly_points_many(players, [week])[0].tolist()))
+
+    def weekly_points_many(self, players: Dict[str, Dict[str, Any]], weeks: Sequence[int]) -> np.ndarray:
+        return mock_points_matrix(players, weeks, self.id)
@@ -1,4 +1,7 @@
+import os
 from typing import Dict, Any, List
+from .consensus import ConsensusSource
+from .file_source import FileSource
 from .mock import MockSource
 
 # Register available sources here
@@ -6,6 +9,26 @@ _SOURCES = {
     "mock": MockSource(),
 }
 
+# Optional file-backed projections (npy directory or Arrow IPC file)
+if os.getenv("PROJECTIONS_FILE"):
+    _SOURCES["file"] = FileSource(os.environ["PROJECTIONS_FILE"])
+
+def _parse_weights(raw: str) -> Dict[str, float]:
+    # "mock:1,file:2" -> {"mock": 1.0, "file": 2.0}
+    out: Dict[str, float] = {}
+    for part in filter(None, (p.strip() for p in raw.split(","))):
+        sid, _, w = part.partition(":")
+        out[sid.strip()] = float(w or 1.0)
+    return out
+
+# Blend of every other registered source
+_SOURCES["consensus"] = ConsensusSource(
+    lambda: {sid: s for sid, s in _SOURCES.items() if sid != "consensus"},
+    weights=_parse_weights(os.getenv("CONSENSUS_WEIGHTS", "")),
+    method=os.getenv("CONSENSUS_METHOD", "mean"),
+    timeout_s=float(os.getenv("CONSENSUS_TIMEOUT_S") or 0) or None,
+)
+
 def list_sources() -> List[Dict[str, Any]]:
     return [
         {"id": s.id, "name": s.name, "description": s.description}
@@ -1,64 +1,102 @@
-from typing import Dict, Any, List, Tuple
+import heapq
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 from .valuation import compute_vorp_for_week
 
+STARTER_SLOTS = ("QB", "RB", "WR", "TE")
+FLEX_POS = ("RB", "WR", "TE")
+
+
+def worst_starter_index(
+    players: Dict[str, Dict[str, Any]],
+    current_roster: List[Dict[str, str]],
+    valuations: Dict[str, Dict[str, Any]],
+) -> Tuple[Dict[str, Tuple[str, float]], Optional[Tuple[str, float]]]:
+    """
+    One pass over the roster -> ({pos: (player_id, vorp) of the weakest starter}, weakest FLEX-eligible starter).
+    Only players in starting slots count.
+    """
+    worst: Dict[str, Tuple[str, float]] = {}
+    for p in current_roster:
+        pid = p["player_id"]
+        if pid not in players or p["slot"] not in STARTER_SLOTS:
+            continue
+        vorp = float((valuations.get(pid) or {}).get("vorp") or 0.0)
+        pos = players[pid]["pos"]
+        if pos not in worst or vorp < worst[pos][1]:
+            worst[pos] = (pid, vorp)
+    flex = [worst[pos] for pos in FLEX_POS if pos in worst]
+    worst_flex = min(flex, key=lambda x: x[1]) if flex else None
+    return worst, worst_flex
+
+
 def recommend_free_agents(
     players: Dict[str, Dict[str, Any]],
     current_roster: List[Dict[str, str]],  # [{player_id, slot}]
-    free_agents: List[str],
-    projections: Dict[str, float],
+    free_agents: Union[List[str], Dict[str, List[str]]],  # flat ids, or ids partitioned by position
+    projections: Optional[Dict[str, float]],
     settings: Dict[str, Any],
     week: int,
     top_n: int = 10,
+    valuations: Optional[Dict[str, Dict[str, Any]]] = None,
 ) -> List[Dict[str, Any]]:
     """
     For each FA, simulate replacing your worst starter at the same position (or into FLEX).
+    Pass `valuations` (e.g. cached or rest-of-season) to skip computing them from `projections`.
+    Position-partitioned `free_agents` lets whole positions you can't start be skipped unread.
     Return items: {player_id, delta_value, suggested_faab, rationale}
     """
-    valuations = compute_vorp_for_week(players, projections, settings, week)
-    # Build current roster view with valuations
-    roster_items = [
-        {"player": players[p["player_id"]], "slot": p["slot"], "valuation": valuations.get(p["player_id"])}
-        for p in current_roster if p["player_id"] in players
-    ]
+    if valuations is None:
+        if projections is None:
+            raise ValueError("either projections or valuations is required")
+        valuations = compute_vorp_for_week(players, projections, settings, week)
 
-    # Find worst starter by position for quick delta estimates
-    def starter_vorps(pos: str) -> List[Tuple[str, float]]:
-        return [
-            (ri["player"]["id"], float((ri["valuation"] or {}).get("vorp") or 0.0))
-            for ri in roster_items
-            if ri["slot"] in ("QB", "RB", "WR", "TE") and ri["player"]["pos"] == pos
-        ]
+    # Worst starter per position (and across FLEX positions), built once per request
+    worst, worst_flex = worst_starter_index(players, current_roster, valuations)
 
-    suggestions: List[Dict[str, Any]] = []
-    for pid in free_agents:
+    def candidates() -> Iterator[str]:
+        if not isinstance(free_agents, dict):
+            yield from free_agents
+            return
+        for pos, ids in free_agents.items():
+            if pos in worst or pos in FLEX_POS:
+                yield from ids
+
+    # Bounded min-heap of (delta, -order, pid, via_flex); once full, any FA that
+    # can't beat the current N-th best is skipped before building its suggestion.
+    heap: List[Tuple[float, int, str, bool]] = []
+    for i, pid in enumerate(candidates()):
         p = players.get(pid)
         if not p:
             continue
         pos = p["pos"]
-        fa_vorp = float(valuations.get(pid, {}).get("vorp") or 0.0)
-
-        worst_same = sorted(starter_vorps(pos), key=lambda x: x[1])[0] if starter_vorps(pos) else None
+        worst_same = worst.get(pos)
         if worst_same is None:
             # If you don't start this pos, maybe FLEX (RB/WR/TE only)
-            if pos not in ("RB", "WR", "TE"):
+            if pos not in FLEX_POS:
                 continue
-            worst_flexable = sorted(
-                starter_vorps("RB") + starter_vorps("WR") + starter_vorps("TE"),
-                key=lambda x: x[1]
-            )[0] if (starter_vorps("RB") or starter_vorps("WR") or starter_vorps("TE")) else None
-            replace_id, replace_vorp = worst_flexable if worst_flexable else (None, 0.0)
+            replace_vorp = worst_flex[1] if worst_flex else 0.0
         else:
-            replace_id, replace_vorp = worst_same
+            replace_vorp = worst_same[1]
 
+        fa_vorp = float(valuations.get(pid, {}).get("vorp") or 0.0)
         delta = round(max(0.0, fa_vorp - replace_vorp), 2)
         if delta <= 0:
             continue
+        if len(heap) < top_n:
+            heapq.heappush(heap, (delta, -i, pid, worst_same is None))
+        elif delta > heap[0][0]:
+            heapq.heapreplace(heap, (delta, -i, pid, worst_same is None))
+
+    suggestions: List[Dict[str, Any]] = []
+    for delta, _, pid, via_flex in sorted(heap, reverse=True):
+        p = players[pid]
+        pos = p["pos"]
 
         # naive FAAB suggestion: 3x delta, clamp 1..25
         suggested_faab = int(min(25, max(1, round(delta * 3))))
 
         rationale = f"{p['name']} ({pos}) beats your worst {pos} by +{delta:.2f} VORP."
-        if worst_same is None and pos in ("RB", "WR", "TE"):
+        if via_flex:
             rationale = f"{p['name']} ({pos}) improves your FLEX over your weakest starter by +{delta:.2f} VORP."
 
         suggestions.append({
@@ -67,6 +105,4 @@ def recommend_free_agents(
             "suggested_faab": suggested_faab,
             "rationale": rationale,
         })
-
-    suggestions.sort(key=lambda s: s["delta_value"], reverse=True)
-    return suggestions[:top_n]
+    return suggestions
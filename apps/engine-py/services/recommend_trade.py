@@ -1,59 +1,366 @@
-from typing import Dict, Any, List, Tuple
+import heapq
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, Future, ProcessPoolExecutor, wait
+from itertools import combinations
+from threading import Lock
+from typing import Dict, Any, Hashable, List, Optional, Tuple
 
-def simple_one_for_one_trades(
+import numpy as np
+
+from .lineup import compile_roster_rules, lineup_memo_key, lineup_value, pos_mask, rules_signature, solve_lineup
+
+log = logging.getLogger(__name__)
+
+
+# -----------------------------------------------------------------------------
+# Package search (1-for-1, 2-for-1, 1-for-2, 2-for-2)
+# -----------------------------------------------------------------------------
+
+# Share of your lineup gain the opponent may lose and still count as "fair".
+FAIRNESS = {"conservative": 0.0, "neutral": 0.5, "aggressive": 1.0}
+_EPS = 1e-9  # bounds are sums of floats
+
+
+class _Side:
+    """One roster as position masks + clamped scores, valued by exact lineup optimization."""
+
+    def __init__(
+        self,
+        players: Dict[str, Dict[str, Any]],
+        roster: List[Dict[str, str]],
+        valuations: Dict[str, Dict[str, Any]],
+        roster_rules: Optional[Dict[str, Any]],
+        valuation_key: Optional[Hashable],
+    ):
+        self.ids: List[str] = []
+        self.masks: List[int] = []
+        self.scores: List[float] = []
+        for r in roster:
+            p = players.get(r["player_id"])
+            if p is None or (r.get("slot") or "").upper() == "IR":
+                continue
+            self.ids.append(r["player_id"])
+            self.masks.append(pos_mask(p.get("pos")))
+            # don't penalize below replacement (same as team score)
+            self.scores.append(max(0.0, float((valuations.get(r["player_id"]) or {}).get("vorp") or 0.0)))
+        self.template = compile_roster_rules(roster_rules)
+        self.memo = (valuation_key, rules_signature(roster_rules)) if valuation_key is not None else None
+        assigned = solve_lineup(self.masks, self.scores, self.template)
+        self.starters = [i for i, t in enumerate(assigned) if t >= 0]
+        self.base = sum(self.scores[i] for i in self.starters)
+
+    def value(self, drop: Tuple[int, ...], add: Tuple[Tuple[str, int, float], ...]) -> float:
+        """V(roster - players at `drop` + `add` (id, mask, score)), memoized by roster signature."""
+        keep = [i for i in range(len(self.ids)) if i not in drop]
+        key = None
+        if self.memo is not None:
+            key = lineup_memo_key(*self.memo, [self.ids[i] for i in keep] + [a[0] for a in add])
+        return lineup_value(
+            [self.masks[i] for i in keep] + [a[1] for a in add],
+            [self.scores[i] for i in keep] + [a[2] for a in add],
+            self.template,
+            memo_key=key,
+        )
+
+    def entries(self, idx: Tuple[int, ...]) -> Tuple[Tuple[str, int, float], ...]:
+        return tuple((self.ids[i], self.masks[i], self.scores[i]) for i in idx)
+
+    def swap_table(
+        self, other: "_Side", deadline: Optional[float] = None,
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (drop[i], swap[i, j]) = (V(S - i), V(S - i + other_j)) - V(S), or None
+        if `deadline` passes first (a partial table bounds nothing).
+
+        A player outside the optimal lineup stays outside it when players are
+        added (matroid exchange), so for bench players V(S - i + j) = V(S + j)
+        and only starters need their own solves.
+        """
+        adds = [other.entries((j,)) for j in range(len(other.ids))]
+        plus = [self.value((), a) - self.base for a in adds]
+        drop = np.zeros(len(self.ids))
+        swap = np.tile(np.array(plus, dtype=np.float64), (len(self.ids), 1))
+        for i in self.starters:
+            if deadline is not None and time.time() >= deadline:
+                return None
+            drop[i] = self.value((i,), ()) - self.base
+            swap[i] = [self.value((i,), a) - self.base for a in adds]
+        return drop, swap
+
+
+def search_trades(
     players: Dict[str, Dict[str, Any]],
     your_roster: List[Dict[str, str]],      # [{player_id, slot}]
     opp_roster: List[Dict[str, str]],
     valuations: Dict[str, Dict[str, Any]],  # {pid: {vorp, ...}}
+    roster_rules: Optional[Dict[str, Any]] = None,
     max_offers: int = 2,
+    aggressiveness: str = "neutral",
+    opponent_team_id: str = "UNKNOWN",
+    deadline: Optional[float] = None,       # time.time() after which to return what was found
+    valuation_key: Optional[Hashable] = None,  # identifies `valuations`; enables the lineup value memo
 ) -> List[Dict[str, Any]]:
     """
-    Very simple: try swapping your weakest starter at a position for their strongest bench
-    that (a) helps you in that pos and (b) doesn't hurt them overall (delta_them >= 0),
-    ideally improves them too.
-    """
-    def starters(roster):  # pids for starters only
-        return [r["player_id"] for r in roster if r["slot"] in ("QB", "RB", "WR", "TE")]
-
-    def bench(roster):
-        return [r["player_id"] for r in roster if r["slot"] in ("BN", "IR")]
+    Best packages of up to two players each way, scored by re-optimizing both lineups.
 
-    def vorp(pid: str) -> float:
-        return float(valuations.get(pid, {}).get("vorp") or 0.0)
+    An offer needs delta_you > 0 and delta_them >= -FAIRNESS[aggressiveness] * delta_you.
+    Lineup value is a weighted matroid rank (monotone, submodular), so single-swap
+    results bound every two-player package, e.g.
+      V(Y - {g1,g2} + r) <= min_g V(Y - g + r)
+      V(Y - g + {r1,r2}) <= V(Y - g + r1) + V(Y - g + r2) - V(Y - g)
+    and likewise for the opponent. Packages whose bounds can't be positive and
+    fair are dropped up front; the rest are solved in descending bound order
+    until no remaining bound can reach the current top `max_offers`.
+    """
+    ratio = FAIRNESS.get(aggressiveness)
+    if ratio is None:
+        raise ValueError(f"unknown aggressiveness '{aggressiveness}'")
+    if deadline is not None and time.time() >= deadline:
+        return []
+    you = _Side(players, your_roster, valuations, roster_rules, valuation_key)
+    them = _Side(players, opp_roster, valuations, roster_rules, valuation_key)
+    ng, nr = len(you.ids), len(them.ids)
+    if not ng or not nr:
+        return []
 
-    your_starters = starters(your_roster)
-    their_bench = bench(opp_roster)
+    gets, gives = them.entries, you.entries
 
-    # pick your weakest starter (lowest VORP), and find an opponent bench upgrade
-    candidates: List[Tuple[str, str, float, float, float]] = []  # (give, get, delta_you, delta_them, their_gain)
-    if not your_starters or not their_bench:
+    # exact single swaps: d1[g, r] = delta_you, e1[g, r] = delta_them
+    yours = you.swap_table(them, deadline)
+    theirs = them.swap_table(you, deadline) if yours is not None else None
+    if theirs is None:
         return []
+    d0, d1 = yours
+    e0, e1t = theirs
+    e1 = e1t.T
 
-    weakest = sorted(your_starters, key=vorp)[0]
-    w_v = vorp(weakest)
-
-    for pid in their_bench:
-        get_v = vorp(pid)
-        delta_you = max(0.0, get_v - w_v)
+    # blocks of (upper bound you, upper bound them) over (give set, get set).
+    # Besides the single-swap bounds: V(Y - G + R) <= V(Y + R), and G can add at
+    # most its own scores to what the opponent keeps, V(O - R + G) <= V(O - R) + sum(G).
+    pairs_g = list(combinations(range(ng), 2))
+    pairs_r = list(combinations(range(nr), 2))
+    singles_g = [(g,) for g in range(ng)]
+    singles_r = [(r,) for r in range(nr)]
+    score_g = np.array(you.scores)
+    blocks = [(d1, e1, singles_g, singles_r)]
+    if pairs_g:
+        gi, gj = np.array(pairs_g).T
+        t21 = np.minimum(e1[gi] + e1[gj] - e0[None, :], e0[None, :] + (score_g[gi] + score_g[gj])[:, None])  # [Gpairs, R]
+        blocks.append((np.minimum(d1[gi], d1[gj]), t21, pairs_g, singles_r))
+    if pairs_r:
+        ri, rj = np.array(pairs_r).T
+        plus2 = np.array([you.value((), gets(k)) - you.base for k in pairs_r])
+        starters_r = set(them.starters)
+        drop2 = np.array([them.value(k, ()) - them.base if starters_r.intersection(k) else 0.0 for k in pairs_r])
+        u12 = np.minimum(d1[:, ri] + d1[:, rj] - d0[:, None], plus2[None, :])                          # [G, Rpairs]
+        t12 = np.minimum(np.minimum(e1[:, ri], e1[:, rj]), drop2[None, :] + score_g[:, None])
+        blocks.append((u12, t12, singles_g, pairs_r))
+        if pairs_g:
+            t22 = np.minimum(np.minimum(t21[:, ri], t21[:, rj]), drop2[None, :] + (score_g[gi] + score_g[gj])[:, None])
+            blocks.append((np.minimum(u12[gi], u12[gj]), t22, pairs_g, pairs_r))
 
-        # approximate opponent delta: they lose bench pid, don't affect starters (0)
-        # (MVP: we don't simulate their lineup; assume losing a bench piece is small negative)
-        delta_them = -min(0.5, max(0.0, get_v * 0.1))  # small cost to them
-        their_gain = -delta_them
+    cands: List[Tuple[float, Tuple[int, ...], Tuple[int, ...]]] = []
+    for ub_you, ub_them, gsets, rsets in blocks:
+        keep = (ub_you > _EPS) & (ub_them >= -ratio * ub_you - _EPS)
+        for a, b in zip(*np.nonzero(keep)):
+            cands.append((float(ub_you[a, b]), gsets[a], rsets[b]))
+    cands.sort(key=lambda c: (-c[0], len(c[1]) + len(c[2])))
 
-        if delta_you > 0 and delta_them >= -0.1:  # near-neutral for them
-            candidates.append((weakest, pid, round(delta_you, 2), round(delta_them, 2), round(their_gain, 2)))
+    found: List[Tuple[float, float, Tuple[int, ...], Tuple[int, ...]]] = []
+    best: List[float] = []  # min-heap of the top `max_offers` delta_you values
+    for ub, g, r in cands:
+        if deadline is not None and time.time() >= deadline:
+            break
+        # once the top list is full only strict improvements count, so a bigger
+        # package never displaces a smaller one worth the same to you
+        floor = best[0] if len(best) >= max_offers else 0.0
+        if ub <= floor + _EPS:
+            break
+        if len(g) == len(r) == 1:
+            # single swaps are exact already
+            d_you, d_them = ub, float(e1[g[0], r[0]])
+        else:
+            d_you = you.value(g, gets(r)) - you.base
+            if d_you <= floor + _EPS:
+                continue
+            d_them = them.value(r, gives(g)) - them.base
+            if d_them < -ratio * d_you - _EPS:
+                continue
+        found.append((d_you, d_them, g, r))
+        heapq.heappush(best, d_you)
+        if len(best) > max_offers:
+            heapq.heappop(best)
 
-    # sort by your delta, then least harm to them
-    candidates.sort(key=lambda t: (t[2], -t[3]), reverse=True)
+    # best for you first, then smaller packages, then kindest to them
+    found.sort(key=lambda f: (-f[0], len(f[2]) + len(f[3]), -f[1]))
     offers = []
-    for give, get, d_you, d_them, g_them in candidates[:max_offers]:
+    for d_you, d_them, g, r in found[:max_offers]:
+        give = [you.ids[i] for i in g]
+        get = [them.ids[i] for i in r]
         offers.append({
-            "opponent_team_id": "UNKNOWN",  # fill at call site
-            "give": [give],
-            "get": [get],
-            "delta_you": d_you,
-            "delta_them": d_them,
-            "rationale": f"Swap {give} for {get}: you +{d_you:.2f} VORP; them {d_them:.2f}.",
+            "opponent_team_id": opponent_team_id,
+            "give": give,
+            "get": get,
+            "delta_you": round(d_you, 2),
+            "delta_them": round(d_them, 2),
+            "rationale": f"Swap {', '.join(give)} for {', '.join(get)}: you +{d_you:.2f} VORP; them {d_them:+.2f}.",
         })
     return offers
+
+
+# -----------------------------------------------------------------------------
+# League-wide search (one task per opponent, time-budgeted)
+# -----------------------------------------------------------------------------
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = Lock()
+# After the deadline, in-flight searches get this long to hand back partial offers.
+_GRACE_S = 0.05
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    """Shared worker pool, started on first use so requests don't pay for process startup."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ProcessPoolExecutor(max_workers=workers)
+        return _POOL
+
+
+def _drop_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a broken pool (a worker died) so the next search starts a fresh one."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+
+
+def _search_opponent(
+    opponent_id: str,
+    players: Dict[str, Dict[str, Any]],
+    your_roster: List[Dict[str, str]],
+    opp_roster: List[Dict[str, str]],
+    valuations: Dict[str, Dict[str, Any]],
+    roster_rules: Optional[Dict[str, Any]],
+    max_offers: int,
+    aggressiveness: str,
+    deadline: Optional[float],
+    valuation_key: Optional[Hashable] = None,
+) -> Tuple[str, List[Dict[str, Any]], bool]:
+    """Top-level so it can run in a worker process; also reports whether the deadline cut it short."""
+    offers = search_trades(
+        players, your_roster, opp_roster, valuations,
+        roster_rules=roster_rules, max_offers=max_offers, aggressiveness=aggressiveness,
+        opponent_team_id=opponent_id, deadline=deadline, valuation_key=valuation_key,
+    )
+    return opponent_id, offers, deadline is not None and time.time() >= deadline
+
+
+def search_league_trades(
+    players: Dict[str, Dict[str, Any]],
+    your_roster: List[Dict[str, str]],
+    opponents: Dict[str, List[Dict[str, str]]],  # opponent team_id -> roster
+    valuations: Dict[str, Dict[str, Any]],
+    roster_rules: Optional[Dict[str, Any]] = None,
+    max_offers: int = 2,
+    aggressiveness: str = "neutral",
+    budget_s: Optional[float] = None,
+    processes: Optional[int] = None,
+    valuation_key: Optional[Hashable] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    search_trades against every opponent, best offers for you first.
+
+    With processes > 1 each opponent is a task in a shared process pool (only
+    the players and valuations on the two rosters are sent). At most
+    `processes` tasks are in flight and new ones are only handed out before
+    the deadline, so once `budget_s` runs out nothing more is queued and the
+    running searches stop at the same deadline, handing back the offers they
+    found so far. A search that raises is logged and its opponent counted as
+    not searched (listed under "failed"); the other opponents' offers are still
+    returned. Returns (offers, {"truncated", "searched", "opponents", "failed",
+    "elapsed_ms"}).
+    """
+    if aggressiveness not in FAIRNESS:
+        raise ValueError(f"unknown aggressiveness '{aggressiveness}'")
+    t0 = time.time()
+    deadline = t0 + budget_s if budget_s is not None else None
+    results: Dict[str, Tuple[List[Dict[str, Any]], bool]] = {}
+    failed: List[str] = []
+
+    def fail(opp_id: str, e: BaseException) -> None:
+        log.warning("trade search against %s failed: %s", opp_id, e)
+        failed.append(opp_id)
+
+    if processes and processes > 1 and len(opponents) > 1:
+        pool = _pool(processes)
+        queue = iter(opponents.items())
+        owner: Dict[Future, str] = {}
+
+        def submit_next():
+            if deadline is not None and time.time() >= deadline:
+                return None
+            for opp_id, opp_roster in queue:
+                ids = [r["player_id"] for r in your_roster] + [r["player_id"] for r in opp_roster]
+                try:
+                    f = pool.submit(
+                        _search_opponent, opp_id,
+                        {pid: players[pid] for pid in ids if pid in players},
+                        your_roster, opp_roster,
+                        {pid: valuations[pid] for pid in ids if pid in valuations},
+                        roster_rules, max_offers, aggressiveness, deadline, valuation_key,
+                    )
+                except BrokenExecutor as e:
+                    _drop_pool(pool)
+                    fail(opp_id, e)
+                    continue
+                owner[f] = opp_id
+                return f
+            return None
+
+        inflight = {f for f in (submit_next() for _ in range(processes)) if f is not None}
+        while inflight:
+            timeout = None if deadline is None else max(0.0, deadline - time.time())
+            done, inflight = wait(inflight, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # deadline: running searches stop on their own, collect the ones that return in time
+                done, _ = wait(inflight, timeout=_GRACE_S)
+                inflight = set()
+            for f in done:
+                try:
+                    _, offers, cut = f.result()
+                except Exception as e:
+                    if isinstance(e, BrokenExecutor):
+                        _drop_pool(pool)
+                    fail(owner[f], e)
+                else:
+                    results[owner[f]] = (offers, cut)
+                nxt = submit_next()
+                if nxt is not None:
+                    inflight.add(nxt)
+    else:
+        for opp_id, opp_roster in opponents.items():
+            if deadline is not None and time.time() >= deadline:
+                break
+            try:
+                _, offers, cut = _search_opponent(
+                    opp_id, players, your_roster, opp_roster, valuations,
+                    roster_rules, max_offers, aggressiveness, deadline, valuation_key,
+                )
+            except Exception as e:
+                fail(opp_id, e)
+                continue
+            results[opp_id] = (offers, cut)
+
+    # keep league order among equal gains, as the sequential loop did
+    all_offers = [o for opp_id in opponents if opp_id in results for o in results[opp_id][0]]
+    all_offers.sort(key=lambda x: x.get("delta_you", 0.0), reverse=True)
+    complete = sum(1 for _, cut in results.values() if not cut)
+    return all_offers, {
+        "truncated": complete < len(opponents),
+        "searched": complete,
+        "opponents": len(opponents),
+        "failed": failed,
+        "elapsed_ms": round((time.time() - t0) * 1000.0, 3),
+    }
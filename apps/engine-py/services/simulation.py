@@ -0,0 +1,171 @@
+"""
+Monte Carlo projection distributions.
+
+Draws N outcome samples for every player and week as one [players, samples]
+matrix per week around the point projections of a `SeasonValuations`, and
+reduces them to percentiles, boom/bust probabilities and VORP distributions.
+
+Each week gets its own child of `SeedSequence(seed)`, so results are identical
+whether weeks run in-process or are chunked across a process pool.
+"""
+
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .valuation_engine import SeasonValuations
+
+# Weekly outcome spread as a fraction of the projection (coefficient of variation).
+CV_BY_POS: Dict[str, float] = {"QB": 0.35, "RB": 0.45, "WR": 0.50, "TE": 0.55, "K": 0.40, "DST": 0.60}
+DEFAULT_CV = 0.50
+DEFAULT_PERCENTILES: Tuple[float, ...] = (10.0, 25.0, 50.0, 75.0, 90.0)
+
+
+@dataclass
+class SimulationResult:
+    """Per-week, per-player summaries; arrays are [W, P] unless noted."""
+
+    weeks: List[int]
+    player_ids: List[str]
+    n_samples: int
+    seed: int
+    percentiles: Tuple[float, ...]
+    points_pct: np.ndarray       # [Q, W, P]
+    points_mean: np.ndarray
+    points_std: np.ndarray
+    boom_prob: np.ndarray        # P(points >= boom * projection); 0 if projection <= 0
+    bust_prob: np.ndarray        # P(points <= bust * projection); 0 if projection <= 0
+    vorp_pct: np.ndarray         # [Q, W, P]
+    vorp_mean: np.ndarray
+    prob_above_replacement: np.ndarray
+
+    def player(self, pid: str, week: int) -> Dict[str, object]:
+        i, j = self.weeks.index(week), self.player_ids.index(pid)
+        return {
+            "player_id": pid,
+            "week": week,
+            "mean": round(float(self.points_mean[i, j]), 2),
+            "std": round(float(self.points_std[i, j]), 2),
+            "percentiles": {f"p{q:g}": round(float(v), 2) for q, v in zip(self.percentiles, self.points_pct[:, i, j])},
+            "boom_prob": round(float(self.boom_prob[i, j]), 4),
+            "bust_prob": round(float(self.bust_prob[i, j]), 4),
+            "vorp_mean": round(float(self.vorp_mean[i, j]), 2),
+            "vorp_percentiles": {f"p{q:g}": round(float(v), 2) for q, v in zip(self.percentiles, self.vorp_pct[:, i, j])},
+            "prob_above_replacement": round(float(self.prob_above_replacement[i, j]), 4),
+        }
+
+
+def _cv_per_player(season: SeasonValuations) -> np.ndarray:
+    cv_by_code = np.array([CV_BY_POS.get(p, DEFAULT_CV) for p in season.positions], dtype=np.float32)
+    return cv_by_code[season.pos_codes]
+
+
+def _sorted_percentiles(x: np.ndarray, percentiles: Tuple[float, ...]) -> np.ndarray:
+    """Linear-interpolated percentiles (numpy's default method) of row-sorted x -> [Q, rows]."""
+    pos = np.asarray(percentiles, dtype=np.float64) / 100.0 * (x.shape[1] - 1)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, x.shape[1] - 1)
+    frac = (pos - lo)[:, None]
+    return x[:, lo].T * (1.0 - frac) + x[:, hi].T * frac
+
+
+def _simulate_weeks(
+    means: np.ndarray,          # [w, P] projections for this chunk of weeks
+    repl: np.ndarray,           # [w, P] replacement level per player
+    cv: np.ndarray,             # [P]
+    seeds: Sequence[np.random.SeedSequence],
+    n_samples: int,
+    percentiles: Tuple[float, ...],
+    boom: float,
+    bust: float,
+) -> Tuple[np.ndarray, ...]:
+    """Simulate a chunk of weeks; top-level so it can run in a worker process."""
+    n_weeks, n = means.shape
+    q = len(percentiles)
+    pct = np.empty((q, n_weeks, n), dtype=np.float64)
+    mean = np.empty((n_weeks, n), dtype=np.float64)
+    std = np.empty((n_weeks, n), dtype=np.float64)
+    boom_p = np.empty((n_weeks, n), dtype=np.float64)
+    bust_p = np.empty((n_weeks, n), dtype=np.float64)
+    above_p = np.empty((n_weeks, n), dtype=np.float64)
+    for i in range(n_weeks):
+        rng = np.random.default_rng(seeds[i])
+        mu = means[i].astype(np.float32)[:, None]
+        # [players, samples]: one contiguous row per player. Sorting the normal
+        # draws first is enough -- the affine map + clip below is monotone, so
+        # the outcome rows come out sorted and percentiles are plain lookups.
+        x = rng.standard_normal((n, n_samples), dtype=np.float32)
+        x.sort(axis=1)
+        x *= mu * cv[:, None]
+        x += mu
+        np.maximum(x, 0.0, out=x)  # no negative fantasy weeks in this model
+        pct[:, i] = _sorted_percentiles(x, percentiles)
+        mean[i] = x.mean(axis=1, dtype=np.float64)
+        std[i] = x.std(axis=1, dtype=np.float64)
+        # boom/bust are relative to the projection: undefined (0) without one,
+        # where every draw is 0 and would count as both
+        live = mu[:, 0] > 0
+        boom_p[i] = np.where(live, np.count_nonzero(x >= boom * mu, axis=1) / n_samples, 0.0)
+        bust_p[i] = np.where(live, np.count_nonzero(x <= bust * mu, axis=1) / n_samples, 0.0)
+        above_p[i] = np.count_nonzero(x > repl[i].astype(np.float32)[:, None], axis=1) / n_samples
+    return pct, mean, std, boom_p, bust_p, above_p
+
+
+def simulate_season(
+    season: SeasonValuations,
+    n_samples: int = 10_000,
+    seed: int = 0,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    boom: float = 1.5,
+    bust: float = 0.5,
+    weeks: Sequence[int] | None = None,
+    processes: int | None = None,
+) -> SimulationResult:
+    """
+    Simulate outcome distributions for `weeks` (default: all season weeks).
+
+    VORP samples are points minus the point-estimate replacement level for the
+    player's position and week, so VORP percentiles are a shift of the points
+    percentiles. processes > 1 spreads weeks over a process pool.
+    """
+    weeks = list(weeks) if weeks is not None else list(season.weeks)
+    rows = [season.week_index(w) for w in weeks]
+    means = season.points[rows]
+    repl = season.replacement[rows][:, season.pos_codes]
+    cv = _cv_per_player(season)
+    pcts = tuple(float(q) for q in percentiles)
+    # spawn from the full season so a week's stream doesn't depend on `weeks`
+    children = np.random.SeedSequence(seed).spawn(len(season.weeks))
+    seeds = [children[r] for r in rows]
+
+    if processes and processes > 1 and len(weeks) > 1:
+        chunks = np.array_split(np.arange(len(weeks)), min(processes, len(weeks)))
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = [
+                pool.submit(_simulate_weeks, means[c], repl[c], cv, [seeds[i] for i in c], n_samples, pcts, boom, bust)
+                for c in chunks
+            ]
+            parts = [f.result() for f in futures]
+        pct = np.concatenate([p[0] for p in parts], axis=1)
+        mean, std, boom_p, bust_p, above_p = (np.concatenate([p[k] for p in parts], axis=0) for k in range(1, 6))
+    else:
+        pct, mean, std, boom_p, bust_p, above_p = _simulate_weeks(means, repl, cv, seeds, n_samples, pcts, boom, bust)
+
+    return SimulationResult(
+        weeks=weeks,
+        player_ids=season.player_ids,
+        n_samples=n_samples,
+        seed=seed,
+        percentiles=pcts,
+        points_pct=pct,
+        points_mean=mean,
+        points_std=std,
+        boom_prob=boom_p,
+        bust_prob=bust_p,
+        vorp_pct=pct - repl[None, :, :],
+        vorp_mean=mean - repl,
+        prob_above_replacement=above_p,
+    )
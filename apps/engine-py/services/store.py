@@ -2,64 +2,601 @@
 """
 SQLAlchemy-based persistent store.
 
-NOTE: This module defines the production data access layer but is not
-currently wired to API routes. Routes use services/mock_data.py for
-demonstration purposes. See CONTRIBUTING.md for migration path.
+Routes get a Store through `db.session.get_store` when DB_URL is set and fall
+back to services/mock_data.py otherwise. Writes are set-based: players, teams
+and roster spots go in as multi-row INSERT ... ON CONFLICT statements
+(PostgreSQL, or SQLite for tests), so a full league sync is a handful of
+statements rather than one round trip per row. Valuations stream through
+COPY into a staging table on PostgreSQL, into one partition per season.
+`AsyncStore` mirrors the reads for async routes.
 """
 
 from __future__ import annotations
-from typing import Iterable, Sequence
-from sqlalchemy import select, delete
+import csv
+import io
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import func, select, delete, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from db.models import Team, Player, RosterSpot, Valuation, League
+from db.models import Team, Player, RosterSpot, Valuation, League, TeamWeekBuild, TeamWeekRow
+from services.mock_data import league_scope
+from services.valuation_engine import encode_positions, rank_arrays
+
+# Bind parameters per statement; rows are chunked to stay under the driver
+# limits (PostgreSQL 65535, SQLite 32766).
+MAX_BIND_PARAMS = 30_000
+
+PLAYER_COLS = ("id", "ext_id", "name", "pos", "team", "bye_week")
+TEAM_COLS = ("id", "league_id", "year", "name", "owner_ids")
+VALUATION_COLS = ("league_id", "season", "week", "source", "player_id", "projected_points", "vorp")
+VALUATION_KEY = VALUATION_COLS[:5]  # primary key
+
+ValuationRow = Tuple[int, int, int, str, str, float, float]  # VALUATION_COLS order
+
+_STAGE_DDL = (
+    "CREATE TEMP TABLE IF NOT EXISTS valuations_stage ("
+    "league_id integer, season integer, week integer, source text, player_id text,"
+    " projected_points double precision, vorp double precision"
+    ") ON COMMIT DELETE ROWS"
+)
+_COPY_STAGE = f"COPY valuations_stage ({', '.join(VALUATION_COLS)}) FROM STDIN"
+# Rows for unknown players are skipped (FK), unchanged rows are not rewritten.
+_MERGE_STAGE = f"""
+INSERT INTO valuations ({', '.join(VALUATION_COLS)})
+SELECT {', '.join(f's.{c}' for c in VALUATION_COLS)}
+FROM valuations_stage s JOIN players p ON p.id = s.player_id
+ON CONFLICT ({', '.join(VALUATION_KEY)}) DO UPDATE
+SET projected_points = EXCLUDED.projected_points, vorp = EXCLUDED.vorp
+WHERE (valuations.projected_points, valuations.vorp) IS DISTINCT FROM (EXCLUDED.projected_points, EXCLUDED.vorp)
+"""
+
+# Characters psycopg2's copy_expert reads per call from a CsvRowStream
+COPY_CHUNK = 1 << 16
+
+
+class CsvRowStream:
+    """
+    Read-only file over valuation rows as CSV lines, for psycopg2's
+    `copy_expert`. Rows are encoded as COPY asks for them, so a season's
+    matrix is never held as one string; counts rows and seasons on the way.
+    """
+
+    def __init__(self, rows: Iterable[ValuationRow]):
+        self._rows = iter(rows)
+        self._buf = io.StringIO()
+        self._writer = csv.writer(self._buf)
+        self.rows = 0
+        self.seasons: set = set()
+
+    def read(self, size: int = -1) -> str:
+        while size < 0 or self._buf.tell() < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            self.rows += 1
+            self.seasons.add(row[1])
+        data = self._buf.getvalue()
+        cut = len(data) if size < 0 else min(size, len(data))
+        self._buf.seek(0)
+        self._buf.truncate()
+        self._buf.write(data[cut:])  # the tail of a split line
+        return data[:cut]
+
+
+def _row(obj: Any, cols: Sequence[str]) -> Dict[str, Any]:
+    if isinstance(obj, Mapping):
+        return {c: obj.get(c) for c in cols}
+    return {c: getattr(obj, c) for c in cols}
+
+
+def _owner_ids(manager: Any) -> Optional[List[str]]:
+    """Normalize a mock/ESPN `manager` value (str, dict or list of either) to owner id strings."""
+    if manager is None:
+        return None
+    items = manager if isinstance(manager, (list, tuple)) else [manager]
+    return [str(m.get("id") or m.get("displayName") or m) if isinstance(m, dict) else str(m) for m in items]
+
+
+def player_dict(p: Player) -> Dict[str, Any]:
+    return {"id": p.id, "name": p.name, "pos": p.pos, "team": p.team, "bye_week": p.bye_week}
+
+
+def valuation_rows(season: Any, source: str, league_id: int, year: int) -> Iterator[ValuationRow]:
+    """Rows for every (week, player) cell of a `SeasonValuations` matrix, scoped to a league-season."""
+    for i, week in enumerate(season.weeks):
+        for pid, pts, vorp in zip(season.player_ids, season.points[i].tolist(), season.vorp[i].tolist()):
+            yield (league_id, year, week, source, pid, pts, vorp)
+
+
+def week_valuation_dicts(
+    rows: Sequence[Valuation], players: Mapping[str, Mapping[str, Any]], week: int,
+) -> Dict[str, Dict[str, Any]]:
+    """Stored valuations for one week in `WeekValuations.to_dicts` shape, ranks recomputed from their points."""
+    ids = [r.player_id for r in rows]
+    pos_codes, _ = encode_positions({pid: {"pos": (players.get(pid) or {}).get("pos")} for pid in ids}, ids)
+    points = np.array([r.projected_points for r in rows], dtype=np.float64)
+    rank_overall, rank_pos = rank_arrays(pos_codes, points)
+    return {
+        r.player_id: {
+            "player_id": r.player_id,
+            "week": week,
+            "vorp": round(r.vorp, 2),
+            "rank_pos": int(rank_pos[i]),
+            "rank_overall": int(rank_overall[i]),
+        }
+        for i, r in enumerate(rows)
+    }
+
+
+def team_dict(t: Team) -> Dict[str, Any]:
+    owners = t.owner_ids or []
+    return {"id": t.id, "name": t.name, "manager": owners[0] if owners else None, "owner_ids": owners}
+
+
+# --- Read queries (shared by Store and AsyncStore) ---
+def _roster_q(team_id: str, week: int):
+    return select(RosterSpot).where(RosterSpot.team_id==team_id, RosterSpot.week==week).order_by(RosterSpot.id)
+
+
+def _roster_weeks_q(team_id: str):
+    return select(func.max(RosterSpot.week)).where(RosterSpot.team_id == team_id)
+
+
+def _players_by_id_q(ids: List[str]):
+    return select(Player).where(Player.id.in_(ids))
+
+
+def _players_q(pos: Optional[str], nfl_team: Optional[str], limit: int, offset: int):
+    q = select(Player)
+    if pos:
+        q = q.where(Player.pos == pos)
+    if nfl_team:
+        q = q.where(Player.team == nfl_team)
+    return q.order_by(Player.id).offset(offset).limit(limit)
+
+
+def _valuations_q(week: int, source: str):
+    # every selected column is in ix_val_season_week_source, so PostgreSQL can
+    # answer from the index alone, within the season's partition
+    league_id, season = league_scope()
+    return select(Valuation).where(
+        Valuation.season == season, Valuation.week == week, Valuation.source == source,
+        Valuation.league_id == league_id,
+    )
+
+
+def _team_week_q(team_id: str, week: int, source: str):
+    league_id, season = league_scope()
+    return select(TeamWeekRow).where(
+        TeamWeekRow.league_id == league_id, TeamWeekRow.season == season,
+        TeamWeekRow.team_id == team_id, TeamWeekRow.week == week, TeamWeekRow.source == source,
+    ).order_by(TeamWeekRow.seq)
+
+
+def _team_weeks_q(week: int, source: str):
+    league_id, season = league_scope()
+    return select(TeamWeekRow).where(
+        TeamWeekRow.league_id == league_id, TeamWeekRow.season == season,
+        TeamWeekRow.week == week, TeamWeekRow.source == source,
+    ).order_by(TeamWeekRow.team_id, TeamWeekRow.seq)
+
+
+def _team_weeks_current_q(week: int, source: str):
+    # current while no sync or ingest has moved the league's synced_at since the build
+    league_id, season = league_scope()
+    return (
+        select(TeamWeekBuild.week)
+        .join(League, (League.id == TeamWeekBuild.league_id) & (League.year == TeamWeekBuild.season))
+        .where(
+            TeamWeekBuild.league_id == league_id, TeamWeekBuild.season == season,
+            TeamWeekBuild.source == source, TeamWeekBuild.week == week,
+            TeamWeekBuild.synced_at == League.synced_at,
+        )
+    )
+
+
+def _by_team(rows: Iterable[TeamWeekRow]) -> Dict[str, List[TeamWeekRow]]:
+    out: Dict[str, List[TeamWeekRow]] = {}
+    for r in rows:
+        out.setdefault(r.team_id, []).append(r)
+    return out
+
 
 class Store:
     def __init__(self, session: Session):
         self.s = session
 
+    # --- Bulk write helpers ---
+    def _insert(self, model):
+        dialect = self.s.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise NotImplementedError(f"bulk upsert not supported on '{dialect}'")
+        return insert(model)
+
+    def _upsert(self, model, rows: List[Dict[str, Any]], keys: Sequence[str], update: Sequence[str]) -> int:
+        """
+        INSERT ... ON CONFLICT (keys) DO UPDATE. PostgreSQL gets one multi-row
+        statement per chunk; SQLite has no round trips to save, so it runs one
+        prepared statement with executemany (compiling huge VALUES lists costs more).
+        """
+        if not rows:
+            return 0
+
+        def on_conflict(stmt):
+            if update:
+                return stmt.on_conflict_do_update(
+                    index_elements=list(keys), set_={c: stmt.excluded[c] for c in update}
+                )
+            return stmt.on_conflict_do_nothing(index_elements=list(keys))
+
+        if self.s.get_bind().dialect.name == "sqlite":
+            self.s.connection().execute(on_conflict(self._insert(model.__table__)), rows)
+            return len(rows)
+        chunk = max(1, MAX_BIND_PARAMS // len(rows[0]))
+        for i in range(0, len(rows), chunk):
+            self.s.execute(on_conflict(self._insert(model).values(rows[i:i + chunk])))
+        return len(rows)
+
     # --- Leagues/Teams ---
     def upsert_league(self, league_id: int, year: int, settings: dict | None) -> None:
-        league = self.s.get(League, {"id": league_id, "year": year})
-        if league is None:
-            league = League(id=league_id, year=year, settings=settings)
-            self.s.add(league)
-        else:
-            league.settings = settings
+        self._upsert(
+            League, [{"id": league_id, "year": year, "settings": settings, "synced_at": datetime.utcnow()}],
+            keys=("id", "year"), update=("settings", "synced_at"),
+        )
 
     def upsert_team(self, t: Team) -> None:
-        existing = self.s.get(Team, t.id)
-        if existing:  # shallow updates OK for MVP
-            existing.name = t.name
-            existing.league_id = t.league_id
-            existing.year = t.year
-            existing.owner_ids = t.owner_ids
-        else:
-            self.s.add(t)
+        self.upsert_teams([t])
+
+    def upsert_teams(self, teams: Iterable[Team | Mapping[str, Any]]) -> int:
+        rows = [_row(t, TEAM_COLS) for t in teams]
+        return self._upsert(Team, rows, keys=("id",), update=TEAM_COLS[1:])
 
     # --- Players/Rosters ---
-    def upsert_players(self, players: Iterable[Player]) -> None:
-        for p in players:
-            e = self.s.get(Player, p.id)
-            if e:
-                e.name, e.pos, e.team, e.bye_week, e.ext_id = p.name, p.pos, p.team, p.bye_week, p.ext_id
-            else:
-                self.s.add(p)
+    def upsert_players(self, players: Iterable[Player | Mapping[str, Any]]) -> int:
+        rows = list({r["id"]: r for r in (_row(p, PLAYER_COLS) for p in players)}.values())
+        return self._upsert(Player, rows, keys=("id",), update=PLAYER_COLS[1:])
 
     def replace_roster(self, team_id: str, week: int, spots: list[RosterSpot]) -> None:
-        self.s.execute(delete(RosterSpot).where(RosterSpot.team_id==team_id, RosterSpot.week==week))
-        for rs in spots:
-            self.s.add(rs)
+        self.replace_rosters(week, {team_id: [{"player_id": rs.player_id, "slot": rs.slot} for rs in spots]})
+
+    def replace_rosters(self, week: int, rosters: Mapping[str, Sequence[Mapping[str, str]]]) -> int:
+        """Swap in `rosters` (team_id -> [{player_id, slot}]) for `week`: one delete plus a bulk insert."""
+        if not rosters:
+            return 0
+        self.s.execute(delete(RosterSpot).where(RosterSpot.week == week, RosterSpot.team_id.in_(list(rosters))))
+        rows = list({
+            (tid, r["player_id"]): {"team_id": tid, "player_id": r["player_id"], "slot": r["slot"], "week": week}
+            for tid, entries in rosters.items() for r in entries
+        }.values())
+        return self._upsert(RosterSpot, rows, keys=("team_id", "player_id", "week"), update=("slot",))
+
+    def sync_league(
+        self,
+        league_id: int,
+        year: int,
+        week: int,
+        settings: dict | None,
+        teams: Mapping[str, Mapping[str, Any]],
+        rosters: Mapping[str, Sequence[Mapping[str, str]]],
+        players: Mapping[str, Mapping[str, Any]],
+    ) -> Dict[str, int]:
+        """Write a league snapshot in the in-memory store's shapes; returns row counts."""
+        self.upsert_league(league_id, year, settings)
+        n_players = self.upsert_players(players.values())
+        n_teams = self.upsert_teams(
+            {"id": tid, "league_id": league_id, "year": year, "name": t.get("name") or tid,
+             "owner_ids": _owner_ids(t.get("manager"))}
+            for tid, t in teams.items()
+        )
+        n_spots = self.replace_rosters(week, rosters)
+        return {"teams": n_teams, "players": n_players, "roster_spots": n_spots}
 
     # --- Reads for endpoints ---
     def get_team(self, team_id: str) -> Team | None:
         return self.s.get(Team, team_id)
 
     def roster_for_week(self, team_id: str, week: int) -> list[RosterSpot]:
-        return list(self.s.scalars(select(RosterSpot).where(RosterSpot.team_id==team_id, RosterSpot.week==week)))
+        return list(self.s.scalars(_roster_q(team_id, week)))
+
+    def roster_week(self, team_id: str, week: int) -> int:
+        """Latest stored roster week at or before `week` (else the latest stored); syncs write one week at a time."""
+        weeks = _roster_weeks_q(team_id)
+        found = self.s.scalar(weeks.where(RosterSpot.week <= week))
+        if found is None:
+            found = self.s.scalar(weeks)
+        return week if found is None else found
+
+    def players_by_id(self, player_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        ids = list(player_ids)
+        if not ids:
+            return {}
+        return {p.id: player_dict(p) for p in self.s.scalars(_players_by_id_q(ids))}
+
+    def list_players(
+        self, pos: Optional[str] = None, nfl_team: Optional[str] = None, limit: int = 50, offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        return [player_dict(p) for p in self.s.scalars(_players_q(pos, nfl_team, limit, offset))]
+
+    def all_players(self) -> Dict[str, Dict[str, Any]]:
+        """Every stored player by id (the free-agent pool is whoever no roster holds)."""
+        return {p.id: player_dict(p) for p in self.s.scalars(select(Player).order_by(Player.id))}
+
+    def valuations_for_week(self, week: int, source: str = "mock") -> list[Valuation]:
+        """Stored valuations for `week` of the current league-season."""
+        return list(self.s.scalars(_valuations_q(week, source)))
+
+    def team_week(self, team_id: str, week: int, source: str = "mock") -> list[TeamWeekRow]:
+        """Materialized roster + valuation rows for one team-week, in roster order."""
+        return list(self.s.scalars(_team_week_q(team_id, week, source)))
+
+    def team_weeks(self, week: int, source: str = "mock") -> Dict[str, list[TeamWeekRow]]:
+        """Every team's materialized rows for `week` (one index range), by team, in roster order."""
+        return _by_team(self.s.scalars(_team_weeks_q(week, source)))
+
+    def team_weeks_current(self, week: int, source: str = "mock") -> bool:
+        """True if the team-week rows for `week` were built from the league's latest sync."""
+        return self.s.scalar(_team_weeks_current_q(week, source)) is not None
+
+    def league_synced_at(self) -> Optional[datetime]:
+        """Last sync of the current league-season, or None if it was never stored."""
+        league_id, season = league_scope()
+        return self.s.scalar(select(League.synced_at).where(League.id == league_id, League.year == season))
+
+    def latest_sync(self) -> Optional[Tuple[str, float]]:
+        """("espn-<id>-<year>", last sync as epoch seconds) of the league `load_league` returns, or None."""
+        row = self.s.execute(
+            select(League.id, League.year, League.synced_at)
+            .order_by(League.year.desc(), League.synced_at.desc()).limit(1)
+        ).first()
+        if row is None:
+            return None
+        return f"espn-{row.id}-{row.year}", row.synced_at.replace(tzinfo=timezone.utc).timestamp()
+
+    def load_league(self, league_id: int | None = None, year: int | None = None) -> Optional[Dict[str, Any]]:
+        """
+        Latest stored snapshot of a league (newest league if none given) in the
+        `mock_data.load_league` argument shapes, or None if nothing is stored.
+        """
+        q = select(League)
+        if league_id is not None:
+            q = q.where(League.id == league_id)
+        if year is not None:
+            q = q.where(League.year == year)
+        league = self.s.scalars(q.order_by(League.year.desc(), League.synced_at.desc()).limit(1)).first()
+        if league is None:
+            return None
+        team_rows = list(self.s.scalars(
+            select(Team).where(Team.league_id == league.id, Team.year == league.year).order_by(Team.id)
+        ))
+        teams = {t.id: team_dict(t) for t in team_rows}
+        rosters: Dict[str, List[Dict[str, str]]] = {tid: [] for tid in teams}
+        if teams:
+            latest = (
+                select(RosterSpot.team_id, func.max(RosterSpot.week).label("week"))
+                .where(RosterSpot.team_id.in_(list(teams)))
+                .group_by(RosterSpot.team_id)
+                .subquery()
+            )
+            spots = self.s.execute(
+                select(RosterSpot.team_id, RosterSpot.player_id, RosterSpot.slot)
+                .join(latest, (RosterSpot.team_id == latest.c.team_id) & (RosterSpot.week == latest.c.week))
+                .order_by(RosterSpot.id)
+            )
+            for tid, pid, slot in spots:
+                rosters[tid].append({"player_id": pid, "slot": slot})
+        players = self.all_players()
+        return {
+            "teams": teams,
+            "rosters": rosters,
+            "settings": league.settings or {},
+            "players": players,
+            "league": f"espn-{league.id}-{league.year}",
+        }
+
+    # --- Team-week materialization ---
+    def rosters_by_week(self, weeks: Iterable[int]) -> Dict[int, Dict[str, List[Dict[str, str]]]]:
+        """
+        week -> team -> roster entries for the current league-season's teams,
+        each team's roster taken from the stored week `roster_week` resolves to.
+        """
+        league_id, season = league_scope()
+        stored: Dict[str, Dict[int, List[Dict[str, str]]]] = {}
+        for team_id, week, player_id, slot in self.s.execute(
+            select(RosterSpot.team_id, RosterSpot.week, RosterSpot.player_id, RosterSpot.slot)
+            .join(Team, Team.id == RosterSpot.team_id)
+            .where(Team.league_id == league_id, Team.year == season)
+            .order_by(RosterSpot.id)
+        ):
+            stored.setdefault(team_id, {}).setdefault(week, []).append({"player_id": player_id, "slot": slot})
+        out: Dict[int, Dict[str, List[Dict[str, str]]]] = {}
+        for week in weeks:
+            out[week] = {}
+            for team_id, by_week in stored.items():
+                found = max((w for w in by_week if w <= week), default=max(by_week))
+                out[week][team_id] = by_week[found]
+        return out
+
+    def refresh_team_weeks(
+        self,
+        source: str,
+        weeks: Sequence[int],
+        built: Mapping[Tuple[str, int], Tuple[str, List[Dict[str, Any]]]],
+        synced_at: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Rewrite the current league-season's team-weeks of `built` ((team, week)
+        -> (inputs hash, rows)) whose stored hash differs, and drop its stored
+        team-weeks for `weeks` that are no longer built (team left the league).
+        With `synced_at` (`league_synced_at()` read before the rosters were),
+        `weeks` are recorded as built from that sync for `team_weeks_current`.
+        """
+        league_id, season = league_scope()
+        scope = (TeamWeekRow.league_id == league_id, TeamWeekRow.season == season, TeamWeekRow.source == source)
+        stored = {
+            (team_id, week): digest
+            for team_id, week, digest in self.s.execute(
+                select(TeamWeekRow.team_id, TeamWeekRow.week, func.min(TeamWeekRow.inputs_hash))
+                .where(*scope, TeamWeekRow.week.in_(list(weeks)))
+                .group_by(TeamWeekRow.team_id, TeamWeekRow.week)
+            )
+        }
+        changed = [k for k, (digest, _) in built.items() if stored.get(k) != digest]
+        stale = changed + [k for k in stored if k not in built]
+        if stale:
+            self.s.execute(delete(TeamWeekRow).where(
+                *scope, tuple_(TeamWeekRow.team_id, TeamWeekRow.week).in_(stale)
+            ))
+        rows = [r for k in changed for r in built[k][1]]
+        self._upsert(
+            TeamWeekRow, rows, keys=("league_id", "season", "team_id", "week", "source", "player_id"), update=(),
+        )
+        if synced_at is not None:
+            now = datetime.utcnow()
+            self._upsert(
+                TeamWeekBuild,
+                [
+                    {"league_id": league_id, "season": season, "source": source, "week": w,
+                     "synced_at": synced_at, "built_at": now}
+                    for w in weeks
+                ],
+                keys=("league_id", "season", "source", "week"), update=("synced_at", "built_at"),
+            )
+        return {
+            "team_weeks": len(built),
+            "changed": len(changed),
+            "teams_changed": sorted({t for t, _ in changed}),
+            "rows": len(rows),
+        }
+
+    def drop_team_week_builds(self, source: str) -> int:
+        """Forget the current league-season's builds for `source`, so routes stop reading its team-weeks."""
+        league_id, season = league_scope()
+        return self.s.execute(delete(TeamWeekBuild).where(
+            TeamWeekBuild.league_id == league_id, TeamWeekBuild.season == season, TeamWeekBuild.source == source,
+        )).rowcount
+
+    # --- Valuations ---
+    def upsert_valuations(self, vals: Sequence[Valuation]) -> Dict[str, Any]:
+        """Upsert ORM valuations; ones without a league/season get the current league's scope."""
+        league_id, season = league_scope()
+        return self.write_valuations(
+            (
+                league_id if v.league_id is None else v.league_id, season if v.season is None else v.season,
+                v.week, v.source or "mock", v.player_id, v.projected_points, v.vorp,
+            )
+            for v in vals
+        )
+
+    def write_valuations(self, rows: Iterable[ValuationRow]) -> Dict[str, Any]:
+        """
+        Upsert valuation rows on (league_id, season, week, source, player_id).
+        PostgreSQL streams them with COPY into a temp staging table and merges
+        with one INSERT ... SELECT ... ON CONFLICT; SQLite uses `_upsert`.
+        Returns row counts and throughput.
+        """
+        t0 = time.perf_counter()
+        bind = self.s.get_bind()
+        if bind.dialect.name == "postgresql":
+            staged, written = self._copy_valuations(rows, bind.dialect.driver)
+        else:
+            written = staged = self._upsert(
+                Valuation, [dict(zip(VALUATION_COLS, r)) for r in rows],
+                keys=VALUATION_KEY, update=("projected_points", "vorp"),
+            )
+        elapsed = time.perf_counter() - t0
+        return {
+            "rows": staged,
+            "written": written,
+            "elapsed_ms": round(elapsed * 1000.0, 3),
+            "rows_per_sec": round(staged / elapsed) if elapsed > 0 else None,
+        }
+
+    def ensure_season_partition(self, season: int) -> None:
+        """
+        Create the `valuations_<season>` partition if it doesn't exist
+        (PostgreSQL only). Without it the season's rows would land in
+        valuations_default, and the partition could then no longer be created.
+        """
+        if self.s.get_bind().dialect.name != "postgresql":
+            return
+        season = int(season)
+        conn = self.s.connection()
+        # to_regclass first: CREATE ... PARTITION OF locks the parent even when the table exists
+        if conn.exec_driver_sql(f"SELECT to_regclass('valuations_{season}')").scalar() is None:
+            conn.exec_driver_sql(
+                f"CREATE TABLE IF NOT EXISTS valuations_{season} PARTITION OF valuations FOR VALUES IN ({season})"
+            )
+
+    def _copy_valuations(self, rows: Iterable[ValuationRow], driver: str) -> Tuple[int, int]:
+        conn = self.s.connection()  # same transaction as the session
+        conn.exec_driver_sql(_STAGE_DDL)
+        conn.exec_driver_sql("TRUNCATE valuations_stage")
+        raw = conn.connection.driver_connection
+        staged = 0
+        seasons = set()
+        with raw.cursor() as cur:
+            if driver == "psycopg2":
+                stream = CsvRowStream(rows)
+                cur.copy_expert(_COPY_STAGE + " WITH (FORMAT csv)", stream, size=COPY_CHUNK)
+                staged, seasons = stream.rows, stream.seasons
+            else:  # psycopg 3
+                with cur.copy(_COPY_STAGE) as copy:
+                    for r in rows:
+                        copy.write_row(r)
+                        seasons.add(r[1])
+                        staged += 1
+        for season in sorted(seasons):
+            self.ensure_season_partition(season)
+        written = conn.exec_driver_sql(_MERGE_STAGE).rowcount
+        return staged, written
+
+
+class AsyncStore:
+    """
+    Async versions of the Store reads, for `async def` routes on an
+    AsyncSession. Writes stay on the sync Store (jobs, syncs, ingest).
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.s = session
+
+    async def get_team(self, team_id: str) -> Team | None:
+        return await self.s.get(Team, team_id)
+
+    async def roster_for_week(self, team_id: str, week: int) -> list[RosterSpot]:
+        return list(await self.s.scalars(_roster_q(team_id, week)))
+
+    async def roster_week(self, team_id: str, week: int) -> int:
+        weeks = _roster_weeks_q(team_id)
+        found = await self.s.scalar(weeks.where(RosterSpot.week <= week))
+        if found is None:
+            found = await self.s.scalar(weeks)
+        return week if found is None else found
+
+    async def players_by_id(self, player_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        ids = list(player_ids)
+        if not ids:
+            return {}
+        return {p.id: player_dict(p) for p in await self.s.scalars(_players_by_id_q(ids))}
+
+    async def list_players(
+        self, pos: Optional[str] = None, nfl_team: Optional[str] = None, limit: int = 50, offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        return [player_dict(p) for p in await self.s.scalars(_players_q(pos, nfl_team, limit, offset))]
+
+    async def valuations_for_week(self, week: int, source: str = "mock") -> list[Valuation]:
+        return list(await self.s.scalars(_valuations_q(week, source)))
 
-    def valuations_for_week(self, week: int) -> list[Valuation]:
-        return list(self.s.scalars(select(Valuation).where(Valuation.week==week)))
+    async def team_week(self, team_id: str, week: int, source: str = "mock") -> list[TeamWeekRow]:
+        return list(await self.s.scalars(_team_week_q(team_id, week, source)))
 
-    def upsert_valuations(self, vals: Sequence[Valuation]) -> None:
-        for v in vals:
-            self.s.merge(v)  # relies on uq constraint
+    async def team_weeks_current(self, week: int, source: str = "mock") -> bool:
+        return await self.s.scalar(_team_weeks_current_q(week, source)) is not None
@@ -0,0 +1,172 @@
+"""
+Read-through cache in front of the Store.
+
+`CachedStore` serves the hot route reads (team, roster, players, valuations,
+team-week rows, league rosters) from an in-process LRU keyed by (league, read, args, data version). Writers
+bump the league's data version (`mock_data.load_league`) so entries from
+before a sync are never served again; the valuation job, which doesn't change
+league data, calls `invalidate()` after persisting. The TTL bounds staleness
+when the writer ran in another worker process.
+
+Rows are expunged from their session before caching, so cached ORM objects are
+detached, fully loaded and shared read-only across requests. `CachedAsyncStore`
+does the same for async routes over the same entries.
+"""
+
+from __future__ import annotations
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+
+from db.models import RosterSpot, Team, TeamWeekRow, Valuation
+from services import mock_data
+from services.store import AsyncStore, Store
+from services.valuation_cache import ValuationCache
+
+STORE_READS = ValuationCache(
+    max_entries=int(os.getenv("STORE_CACHE_SIZE") or 4096),
+    ttl_s=float(os.getenv("STORE_CACHE_TTL_S") or 30.0),
+)
+
+
+def invalidate(league: Optional[Hashable] = None) -> None:
+    """Drop cached reads for `league` (current league by default)."""
+    STORE_READS.invalidate(mock_data.league_id() if league is None else league)
+
+
+def stats() -> Dict[str, int]:
+    return STORE_READS.stats()
+
+
+def _key(read: str, args: Hashable) -> tuple:
+    return (mock_data.league_id(), read, args, mock_data.data_version())
+
+
+class CachedStore(Store):
+    """Store whose reads go through `STORE_READS`; writes pass straight through."""
+
+    def _cached(self, read: str, args: Hashable, load: Callable[[], Any]) -> Any:
+        return STORE_READS.get_or_compute(_key(read, args), load)
+
+    def _detach(self, rows):
+        for row in rows:
+            self.s.expunge(row)
+        return rows
+
+    def get_team(self, team_id: str) -> Team | None:
+        def load():
+            team = super(CachedStore, self).get_team(team_id)
+            return self._detach([team])[0] if team is not None else None
+        return self._cached("team", team_id, load)
+
+    def roster_for_week(self, team_id: str, week: int) -> list[RosterSpot]:
+        return self._cached(
+            "roster", (team_id, week), lambda: self._detach(super(CachedStore, self).roster_for_week(team_id, week))
+        )
+
+    def roster_week(self, team_id: str, week: int) -> int:
+        return self._cached("roster_week", (team_id, week), lambda: super(CachedStore, self).roster_week(team_id, week))
+
+    def valuations_for_week(self, week: int, source: str = "mock") -> list[Valuation]:
+        return self._cached(
+            "valuations", (week, source),
+            lambda: self._detach(super(CachedStore, self).valuations_for_week(week, source)),
+        )
+
+    def team_week(self, team_id: str, week: int, source: str = "mock") -> list[TeamWeekRow]:
+        return self._cached(
+            "team_week", (team_id, week, source),
+            lambda: self._detach(super(CachedStore, self).team_week(team_id, week, source)),
+        )
+
+    def team_weeks(self, week: int, source: str = "mock") -> Dict[str, list[TeamWeekRow]]:
+        def load():
+            by_team = super(CachedStore, self).team_weeks(week, source)
+            for rows in by_team.values():
+                self._detach(rows)
+            return by_team
+        return self._cached("team_weeks", (week, source), load)
+
+    def team_weeks_current(self, week: int, source: str = "mock") -> bool:
+        return self._cached(
+            "team_weeks_current", (week, source), lambda: super(CachedStore, self).team_weeks_current(week, source)
+        )
+
+    def players_by_id(self, player_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        ids = tuple(sorted(set(player_ids)))
+        return self._cached("players_by_id", ids, lambda: super(CachedStore, self).players_by_id(ids))
+
+    def list_players(
+        self, pos: Optional[str] = None, nfl_team: Optional[str] = None, limit: int = 50, offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        return self._cached(
+            "players", (pos, nfl_team, limit, offset),
+            lambda: super(CachedStore, self).list_players(pos, nfl_team, limit, offset),
+        )
+
+    def all_players(self) -> Dict[str, Dict[str, Any]]:
+        return self._cached("all_players", (), lambda: super(CachedStore, self).all_players())
+
+    def rosters_by_week(self, weeks: Iterable[int]) -> Dict[int, Dict[str, List[Dict[str, str]]]]:
+        weeks = tuple(weeks)
+        return self._cached("rosters_by_week", weeks, lambda: super(CachedStore, self).rosters_by_week(weeks))
+
+
+class CachedAsyncStore(AsyncStore):
+    """AsyncStore whose reads go through `STORE_READS` (shared with CachedStore)."""
+
+    async def _cached(self, read: str, args: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        key = _key(read, args)
+        value = STORE_READS.get(key)
+        if value is None:
+            value = await load()
+            STORE_READS.put(key, value)
+        return value
+
+    def _detach(self, rows):
+        for row in rows:
+            self.s.expunge(row)
+        return rows
+
+    async def get_team(self, team_id: str) -> Team | None:
+        async def load():
+            team = await super(CachedAsyncStore, self).get_team(team_id)
+            return self._detach([team])[0] if team is not None else None
+        return await self._cached("team", team_id, load)
+
+    async def roster_for_week(self, team_id: str, week: int) -> list[RosterSpot]:
+        async def load():
+            return self._detach(await super(CachedAsyncStore, self).roster_for_week(team_id, week))
+        return await self._cached("roster", (team_id, week), load)
+
+    async def roster_week(self, team_id: str, week: int) -> int:
+        return await self._cached(
+            "roster_week", (team_id, week), lambda: super(CachedAsyncStore, self).roster_week(team_id, week)
+        )
+
+    async def valuations_for_week(self, week: int, source: str = "mock") -> list[Valuation]:
+        async def load():
+            return self._detach(await super(CachedAsyncStore, self).valuations_for_week(week, source))
+        return await self._cached("valuations", (week, source), load)
+
+    async def team_week(self, team_id: str, week: int, source: str = "mock") -> list[TeamWeekRow]:
+        async def load():
+            return self._detach(await super(CachedAsyncStore, self).team_week(team_id, week, source))
+        return await self._cached("team_week", (team_id, week, source), load)
+
+    async def team_weeks_current(self, week: int, source: str = "mock") -> bool:
+        return await self._cached(
+            "team_weeks_current", (week, source),
+            lambda: super(CachedAsyncStore, self).team_weeks_current(week, source),
+        )
+
+    async def players_by_id(self, player_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        ids = tuple(sorted(set(player_ids)))
+        return await self._cached("players_by_id", ids, lambda: super(CachedAsyncStore, self).players_by_id(ids))
+
+    async def list_players(
+        self, pos: Optional[str] = None, nfl_team: Optional[str] = None, limit: int = 50, offset: int = 0,
+    ) -> List[Dict[str, Any]]:
+        return await self._cached(
+            "players", (pos, nfl_team, limit, offset),
+            lambda: super(CachedAsyncStore, self).list_players(pos, nfl_team, limit, offset),
+        )
@@ -1,4 +1,6 @@
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Hashable, Optional, Tuple
+
+from .lineup import LINEUP_VALUES
 
 def _is_starter(slot: str) -> bool:
     return slot in ("QB", "RB", "WR", "TE", "FLEX")
@@ -6,11 +8,23 @@ def _is_starter(slot: str) -> bool:
 def compute_team_score(
     roster_items: List[Dict[str, Any]],
     treat_flex_as: Tuple[str, ...] = ("RB", "WR", "TE"),
+    valuation_key: Optional[Hashable] = None,
 ) -> float:
     """
     Sum starter valuations; for FLEX choose the best from allowed positions.
     roster_items: [{"player": {...}, "slot": "RB", "valuation": {...}}, ...]
+    With a `valuation_key` (the key of the valuations the roster was joined
+    with, e.g. `jobs.tasks.valuation_key`) the score is memoized in
+    LINEUP_VALUES by the roster's (player, slot) signature.
     """
+    key = None
+    if valuation_key is not None:
+        slots = tuple(sorted(((item.get("player") or {}).get("id") or "", item.get("slot") or "") for item in roster_items))
+        key = (valuation_key, ("slots", treat_flex_as), slots)
+        cached = LINEUP_VALUES.get(key)
+        if cached is not None:
+            return cached
+
     total = 0.0
 
     # First: take fixed slots (QB, RB, WR, TE). Track candidates for FLEX.
@@ -39,4 +53,7 @@ def compute_team_score(
                 total += max(0.0, vorp)
                 break
 
-    return round(total, 2)
+    total = round(total, 2)
+    if key is not None:
+        LINEUP_VALUES.put(key, total)
+    return total
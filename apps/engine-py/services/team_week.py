@@ -0,0 +1,88 @@
+"""
+Materialized team-week rows.
+
+One denormalized row per (league, season, team, week, source, rostered
+player): slot, player fields, projected points, VORP and ranks. The valuation
+job builds them from the season matrix and each team's stored roster for that
+week (`Store.rosters_by_week`, resolved like `Store.roster_week`), so they
+match what the routes' fallback path reads. Each team-week carries a hash of
+its inputs so a refresh only rewrites the teams whose roster, players or
+valuations changed. Team and lineup routes turn a team-week back into the
+`roster_view` shape they used to join in Python.
+"""
+
+from __future__ import annotations
+import hashlib
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+TeamWeekKey = Tuple[str, int]  # (team_id, week)
+
+
+def build_team_weeks(
+    players: Mapping[str, Mapping[str, Any]],
+    rosters: Mapping[int, Mapping[str, Sequence[Mapping[str, str]]]],
+    season: Any,
+    weeks: Iterable[int],
+    source: str,
+    league_id: int,
+    year: int,
+) -> Dict[TeamWeekKey, Tuple[str, List[Dict[str, Any]]]]:
+    """
+    (team, week) -> (inputs hash, rows) for each of `weeks` of a
+    `SeasonValuations`, over every team in that week's rosters
+    (week -> team -> entries), scoped to a league-season.
+    """
+    col = {pid: i for i, pid in enumerate(season.player_ids)}
+    out: Dict[TeamWeekKey, Tuple[str, List[Dict[str, Any]]]] = {}
+    for week in weeks:
+        wv = season.week(week)
+        for team_id, entries in rosters.get(week, {}).items():
+            rows = []
+            for seq, entry in enumerate(entries):
+                pid = entry["player_id"]
+                p = players.get(pid) or {}
+                i = col.get(pid)
+                rows.append({
+                    "league_id": league_id,
+                    "season": year,
+                    "team_id": team_id,
+                    "week": week,
+                    "source": source,
+                    "player_id": pid,
+                    "seq": seq,
+                    "slot": entry["slot"],
+                    "name": p.get("name"),
+                    "pos": p.get("pos"),
+                    "nfl_team": p.get("team"),
+                    "bye_week": p.get("bye_week"),
+                    # same rounding as WeekValuations.to_dicts
+                    "projected_points": None if i is None else float(wv.points[i]),
+                    "vorp": None if i is None else round(float(wv.vorp[i]), 2),
+                    "rank_pos": None if i is None else int(wv.rank_pos[i]),
+                    "rank_overall": None if i is None else int(wv.rank_overall[i]),
+                })
+            digest = hashlib.sha1(repr([tuple(r.values()) for r in rows]).encode()).hexdigest()
+            for r in rows:
+                r["inputs_hash"] = digest
+            out[(team_id, week)] = (digest, rows)
+    return out
+
+
+def roster_view(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Team-week rows (ORM objects, in roster order) as `[{player, slot, valuation}]`."""
+    return [
+        {
+            "player": None if r.name is None else {
+                "id": r.player_id, "name": r.name, "pos": r.pos, "team": r.nfl_team, "bye_week": r.bye_week,
+            },
+            "slot": r.slot,
+            "valuation": None if r.vorp is None else {
+                "player_id": r.player_id,
+                "week": r.week,
+                "vorp": r.vorp,
+                "rank_pos": r.rank_pos,
+                "rank_overall": r.rank_overall,
+            },
+        }
+        for r in rows
+    ]
@@ -0,0 +1,115 @@
+"""
+League-wide trade market.
+
+Top trades for every ordered team pair (team -> opponent) at each
+aggressiveness level, built by a background job so /recommend/trades can
+read them instead of searching live. A refresh diffs every team's roster
+signature against the previous build and only re-searches pairs that touch a
+changed team; a change in valuations or roster rules rebuilds everything.
+Refreshes search serially in the calling (job) thread, so they never take
+workers from the pool live budgeted searches run on.
+"""
+
+from __future__ import annotations
+import time
+from threading import Lock
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from .lineup import rules_signature
+from .recommend_trade import FAIRNESS, search_league_trades
+
+# Offers kept per pair and level (max_offers_per_opponent caps at 10).
+MARKET_DEPTH = 10
+
+Pair = Tuple[str, str]  # (team_id, opponent_team_id)
+
+
+def roster_signature(players: Dict[str, Dict[str, Any]], roster: List[Dict[str, str]]) -> Tuple:
+    """What trade search sees of a roster: who is on it, their positions, and who is on IR."""
+    return tuple(sorted(
+        (r["player_id"], (players.get(r["player_id"]) or {}).get("pos"), (r.get("slot") or "").upper() == "IR")
+        for r in roster
+    ))
+
+
+def valuation_fingerprint(valuations: Dict[str, Dict[str, Any]], roster_rules: Optional[Dict[str, Any]]) -> int:
+    return hash((rules_signature(roster_rules), tuple((pid, (v or {}).get("vorp")) for pid, v in valuations.items())))
+
+
+class TradeMarket:
+    def __init__(self, depth: int = MARKET_DEPTH):
+        self.depth = depth
+        self.fingerprint: Optional[int] = None
+        self.signatures: Dict[str, Tuple] = {}
+        self.pairs: Dict[Pair, Dict[str, List[Dict[str, Any]]]] = {}  # pair -> level -> offers
+        self.data_version: Optional[int] = None
+        self.updated_at: Optional[float] = None
+        self._lock = Lock()          # guards the swap of the fields above
+        self._refresh_lock = Lock()  # one refresh at a time
+
+    def refresh(
+        self,
+        players: Dict[str, Dict[str, Any]],
+        rosters: Dict[str, List[Dict[str, str]]],
+        valuations: Dict[str, Dict[str, Any]],
+        roster_rules: Optional[Dict[str, Any]] = None,
+        data_version: Optional[int] = None,
+        valuation_key: Optional[Hashable] = None,
+    ) -> Dict[str, Any]:
+        """Re-search the rows and columns of teams whose roster changed; returns refresh stats."""
+        with self._refresh_lock:
+            t0 = time.time()
+            fingerprint = valuation_fingerprint(valuations, roster_rules)
+            signatures = {tid: roster_signature(players, r) for tid, r in rosters.items()}
+            if fingerprint != self.fingerprint:
+                changed = set(signatures)
+                pairs: Dict[Pair, Dict[str, List[Dict[str, Any]]]] = {}
+            else:
+                changed = {tid for tid, sig in signatures.items() if self.signatures.get(tid) != sig}
+                pairs = {k: v for k, v in self.pairs.items() if k[0] in signatures and k[1] in signatures}
+
+            searched = 0
+            for tid in signatures:
+                opponents = [o for o in signatures if o != tid and (tid in changed or o in changed)]
+                if not opponents:
+                    continue
+                rows: Dict[Pair, Dict[str, List[Dict[str, Any]]]] = {(tid, o): {} for o in opponents}
+                for level in FAIRNESS:
+                    offers, _ = search_league_trades(
+                        players, rosters[tid], {o: rosters[o] for o in opponents}, valuations,
+                        roster_rules=roster_rules, max_offers=self.depth, aggressiveness=level,
+                        valuation_key=valuation_key,
+                    )
+                    for o in opponents:
+                        rows[(tid, o)][level] = []
+                    for offer in offers:
+                        rows[(tid, offer["opponent_team_id"])][level].append(offer)
+                pairs.update(rows)
+                searched += len(opponents)
+
+            with self._lock:
+                self.pairs = pairs
+                self.signatures = signatures
+                self.fingerprint = fingerprint
+                self.data_version = data_version
+                self.updated_at = time.time()
+            return {
+                "teams_changed": sorted(changed),
+                "pairs_searched": searched,
+                "pairs": len(pairs),
+                "elapsed_ms": round((time.time() - t0) * 1000.0, 3),
+            }
+
+    def offers_for(self, team_id: str, aggressiveness: str = "neutral", max_offers: int = 2) -> List[Dict[str, Any]]:
+        """Best `max_offers` per opponent for `team_id`, best for you first (league order on ties)."""
+        if aggressiveness not in FAIRNESS:
+            raise ValueError(f"unknown aggressiveness '{aggressiveness}'")
+        with self._lock:
+            pairs, order = self.pairs, list(self.signatures)
+        offers = [
+            dict(offer)
+            for opp in order if (team_id, opp) in pairs
+            for offer in pairs[(team_id, opp)][aggressiveness][:max_offers]
+        ]
+        offers.sort(key=lambda x: x.get("delta_you", 0.0), reverse=True)
+        return offers
@@ -0,0 +1,107 @@
+"""
+Versioned LRU cache for projections and valuations.
+
+Entries are keyed by (league, source, week, data version). Writers bump the
+league's data version (see `mock_data.bump_data_version`), so stale entries
+are never hit again. Keys are indexed by (league, source) and version: the
+first put under a newer version drops that group's older entries in one
+pass over just those keys, so a put never scans the whole cache.
+`week=None` holds the season matrix that per-week entries are sliced from;
+string "weeks" hold derived views (e.g. "ros" for rest-of-season sums).
+An optional TTL bounds how long an entry is served when the writer that
+would bump the version runs in another process.
+"""
+
+from __future__ import annotations
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple, Union
+
+CacheKey = Tuple[Hashable, str, Optional[Union[int, str]], Any]  # (league, source, week, version)
+
+
+class ValuationCache:
+    def __init__(self, max_entries: int = 64, ttl_s: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[CacheKey, Tuple[Any, float]]" = OrderedDict()  # key -> (value, expires at)
+        # (league, source) -> version -> keys cached under it
+        self._versions: Dict[Tuple[Hashable, str], Dict[Any, Set[CacheKey]]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, key: CacheKey) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                self._drop(key)
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _drop(self, key: CacheKey) -> None:
+        del self._entries[key]
+        versions = self._versions[key[:2]]
+        keys = versions[key[3]]
+        keys.discard(key)
+        if not keys:
+            del versions[key[3]]
+            if not versions:
+                del self._versions[key[:2]]
+
+    def put(self, key: CacheKey, value: Any) -> None:
+        group, version = key[:2], key[3]
+        expires = time.monotonic() + self.ttl_s if self.ttl_s is not None else float("inf")
+        with self._lock:
+            versions = self._versions.setdefault(group, {})
+            if version not in versions:
+                if any(v > version for v in versions):
+                    return  # computed for a version a writer has already moved past
+                # drop what this (league, source) cached under older versions
+                for old in list(versions):
+                    for k in versions.pop(old):
+                        del self._entries[k]
+                versions[version] = set()
+            versions[version].add(key)
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_compute(self, key: CacheKey, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            # computed outside the lock; concurrent misses may both compute
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, league: Hashable | None = None) -> None:
+        with self._lock:
+            if league is None:
+                self._entries.clear()
+                self._versions.clear()
+            else:
+                for group in [g for g in self._versions if g[0] == league]:
+                    for keys in self._versions.pop(group).values():
+                        for k in keys:
+                            del self._entries[k]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
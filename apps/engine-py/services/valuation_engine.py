@@ -0,0 +1,323 @@
+"""
+Columnar valuation engine.
+
+Players are encoded once into parallel arrays (integer position codes and
+float projections) so replacement levels, VORP and ranks are computed with
+NumPy instead of per-position Python lists. `services.valuation` keeps its
+dict-based API on top of this module.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Any, List, Sequence, Tuple
+import math
+
+import numpy as np
+
+# Known positions get stable codes; unknown labels are appended per call.
+POSITIONS: Tuple[str, ...] = ("QB", "RB", "WR", "TE", "K", "DST")
+POS_CODES: Dict[str, int] = {p: i for i, p in enumerate(POSITIONS)}
+# mock projection baseline per position; other positions project 0 + noise
+BASE_POINTS_BY_POS: Dict[str, float] = {"QB": 18.0, "RB": 12.0, "WR": 11.0, "TE": 8.0}
+
+
+@dataclass
+class WeekValuations:
+    """Raw-array valuation result for one week, aligned on `player_ids`."""
+
+    player_ids: List[str]
+    positions: Tuple[str, ...]   # code -> position label
+    pos_codes: np.ndarray        # int16[P]
+    points: np.ndarray           # float64[P]
+    replacement: np.ndarray      # float64[len(positions)]
+    vorp: np.ndarray             # float64[P], unrounded
+    rank_pos: np.ndarray         # int32[P], 1-based
+    rank_overall: np.ndarray     # int32[P], 1-based
+
+    def replacement_levels(self) -> Dict[str, float]:
+        present = np.unique(self.pos_codes)
+        return {self.positions[c]: float(self.replacement[c]) for c in present}
+
+    def to_dicts(self, week: int) -> Dict[str, Dict[str, Any]]:
+        """Expand into the `compute_vorp_for_week` response shape."""
+        vorp = self.vorp.tolist()
+        rank_pos = self.rank_pos.tolist()
+        rank_overall = self.rank_overall.tolist()
+        return {
+            pid: {
+                "player_id": pid,
+                "week": week,
+                "vorp": round(vorp[i], 2),
+                "rank_pos": rank_pos[i],
+                "rank_overall": rank_overall[i],
+            }
+            for i, pid in enumerate(self.player_ids)
+        }
+
+
+def encode_positions(
+    players: Dict[str, Dict[str, Any]],
+    player_ids: Sequence[str],
+) -> Tuple[np.ndarray, Tuple[str, ...]]:
+    """Map each player's position to an integer code."""
+    labels = list(POSITIONS)
+    codes = dict(POS_CODES)
+    out = np.empty(len(player_ids), dtype=np.int16)
+    for i, pid in enumerate(player_ids):
+        pos = players[pid]["pos"]
+        code = codes.get(pos)
+        if code is None:
+            code = codes[pos] = len(labels)
+            labels.append(pos)
+        out[i] = code
+    return out, tuple(labels)
+
+
+def starters_required(settings: Dict[str, Any], pos: str) -> int:
+    rules = (settings or {}).get("roster_rules_json", {})
+    # FLEX reduces replacement level slightly across RB/WR/TE; keep it simple for MVP
+    flex = int(rules.get("FLEX", rules.get("FLX", 0)))
+    base = int(rules.get(pos, 0))
+    if pos in ("RB", "WR", "TE"):
+        return base + max(0, math.floor(flex / 3))
+    return base
+
+
+def starters_per_code(settings: Dict[str, Any], positions: Sequence[str]) -> np.ndarray:
+    return np.array([starters_required(settings, pos) for pos in positions], dtype=np.int64)
+
+
+def replacement_by_code(
+    pos_codes: np.ndarray,
+    points: np.ndarray,
+    starters: np.ndarray,
+    teams_count: int,
+) -> np.ndarray:
+    """
+    Nth-best projection per position (N = starters * teams, clamped to pool size),
+    found with a partial selection instead of a full sort.
+    """
+    repl = np.zeros(len(starters), dtype=np.float64)
+    for code in np.unique(pos_codes):
+        pts = points[pos_codes == code]
+        n = max(1, int(starters[code]) * teams_count)
+        k = min(len(pts), n) - 1
+        # k-th largest == (len - 1 - k)-th smallest
+        kth = len(pts) - 1 - k
+        repl[code] = np.partition(pts, kth)[kth]
+    return repl
+
+
+def rank_arrays(pos_codes: np.ndarray, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    1-based overall and positional ranks by descending points.
+
+    Ties keep input order, matching the stable `sorted(..., reverse=True)` the
+    dict implementation used.
+    """
+    n = len(points)
+    order = np.argsort(-points, kind="stable")
+    rank_overall = np.empty(n, dtype=np.int32)
+    rank_overall[order] = np.arange(1, n + 1, dtype=np.int32)
+
+    # Stable sort of the overall order by position keeps the points order inside
+    # each position group, so a rank is just the offset from the group start.
+    grouped = order[np.argsort(pos_codes[order], kind="stable")]
+    codes_sorted = pos_codes[grouped]
+    starts = np.flatnonzero(np.r_[True, codes_sorted[1:] != codes_sorted[:-1]])
+    group_start = np.repeat(starts, np.diff(np.r_[starts, n]))
+    rank_pos = np.empty(n, dtype=np.int32)
+    rank_pos[grouped] = np.arange(n, dtype=np.int32) - group_start + 1
+    return rank_overall, rank_pos
+
+
+def value_week(
+    players: Dict[str, Dict[str, Any]],
+    projections: Dict[str, float],
+    settings: Dict[str, Any],
+    teams_count: int = 12,
+) -> WeekValuations:
+    """Value one week of projections; arrays follow `projections` iteration order."""
+    player_ids = list(projections.keys())
+    points = np.fromiter(projections.values(), dtype=np.float64, count=len(player_ids))
+    pos_codes, positions = encode_positions(players, player_ids)
+    return value_arrays(player_ids, pos_codes, positions, points, settings, teams_count)
+
+
+def value_arrays(
+    player_ids: List[str],
+    pos_codes: np.ndarray,
+    positions: Tuple[str, ...],
+    points: np.ndarray,
+    settings: Dict[str, Any],
+    teams_count: int = 12,
+) -> WeekValuations:
+    """Value pre-encoded arrays (for callers that already hold columnar data)."""
+    repl = replacement_by_code(pos_codes, points, starters_per_code(settings, positions), teams_count)
+    rank_overall, rank_pos = rank_arrays(pos_codes, points)
+    return WeekValuations(
+        player_ids=player_ids,
+        positions=positions,
+        pos_codes=pos_codes,
+        points=points,
+        replacement=repl,
+        vorp=points - repl[pos_codes],
+        rank_pos=rank_pos,
+        rank_overall=rank_overall,
+    )
+
+
+@dataclass
+class SeasonValuations:
+    """Weeks x players valuation matrices; row `i` is week `weeks[i]`."""
+
+    weeks: List[int]
+    player_ids: List[str]
+    positions: Tuple[str, ...]
+    pos_codes: np.ndarray        # int16[P]
+    points: np.ndarray           # float64[W, P]
+    replacement: np.ndarray      # float64[W, len(positions)]
+    vorp: np.ndarray             # float64[W, P]
+    rank_pos: np.ndarray         # int32[W, P]
+    rank_overall: np.ndarray     # int32[W, P]
+
+    def week_index(self, week: int) -> int:
+        try:
+            return self.weeks.index(week)
+        except ValueError:
+            raise KeyError(f"week {week} not in season valuations") from None
+
+    def week(self, week: int) -> WeekValuations:
+        """Row views for one week (no copies)."""
+        i = self.week_index(week)
+        return WeekValuations(
+            player_ids=self.player_ids,
+            positions=self.positions,
+            pos_codes=self.pos_codes,
+            points=self.points[i],
+            replacement=self.replacement[i],
+            vorp=self.vorp[i],
+            rank_pos=self.rank_pos[i],
+            rank_overall=self.rank_overall[i],
+        )
+
+    def projections(self, week: int) -> Dict[str, float]:
+        return dict(zip(self.player_ids, self.points[self.week_index(week)].tolist()))
+
+
+def value_season(
+    player_ids: List[str],
+    pos_codes: np.ndarray,
+    positions: Tuple[str, ...],
+    points: np.ndarray,
+    weeks: Sequence[int],
+    settings: Dict[str, Any],
+    teams_count: int = 12,
+) -> SeasonValuations:
+    """
+    Value every week at once from a [W, P] projection matrix.
+
+    Each position is handled as one column block across all weeks, so the work
+    is a handful of axis=1 partitions/argsorts rather than W separate passes.
+    """
+    n_weeks, n = points.shape
+    starters = starters_per_code(settings, positions)
+    repl = np.zeros((n_weeks, len(positions)), dtype=np.float64)
+    rank_pos = np.empty((n_weeks, n), dtype=np.int32)
+    for code in np.unique(pos_codes):
+        cols = np.flatnonzero(pos_codes == code)
+        block = points[:, cols]
+        m = len(cols)
+        k = min(m, max(1, int(starters[code]) * teams_count)) - 1
+        kth = m - 1 - k
+        repl[:, code] = np.partition(block, kth, axis=1)[:, kth]
+        order = np.argsort(-block, axis=1, kind="stable")
+        ranks = np.empty_like(order, dtype=np.int32)
+        np.put_along_axis(ranks, order, np.arange(1, m + 1, dtype=np.int32)[None, :], axis=1)
+        rank_pos[:, cols] = ranks
+
+    order = np.argsort(-points, axis=1, kind="stable")
+    rank_overall = np.empty((n_weeks, n), dtype=np.int32)
+    np.put_along_axis(rank_overall, order, np.arange(1, n + 1, dtype=np.int32)[None, :], axis=1)
+
+    return SeasonValuations(
+        weeks=list(weeks),
+        player_ids=player_ids,
+        positions=positions,
+        pos_codes=pos_codes,
+        points=points,
+        replacement=repl,
+        vorp=points - repl[:, pos_codes],
+        rank_pos=rank_pos,
+        rank_overall=rank_overall,
+    )
+
+
+ROS_LAST_WEEK = 17  # fantasy regular season + playoffs end before NFL week 18
+
+
+@dataclass
+class RestOfSeason:
+    """
+    Prefix sums over a season's weekly points/VORP with bye weeks zeroed.
+
+    Row i of each `*_cum` matrix is the sum over `weeks[:i]`, so any week range
+    is one subtraction per player.
+    """
+
+    weeks: List[int]
+    player_ids: List[str]
+    positions: Tuple[str, ...]
+    pos_codes: np.ndarray
+    points_cum: np.ndarray       # float64[W + 1, P]
+    vorp_cum: np.ndarray         # float64[W + 1, P]
+
+    def _span(self, from_week: int, to_week: int) -> Tuple[int, int]:
+        weeks = np.asarray(self.weeks)
+        return int(np.searchsorted(weeks, from_week, "left")), int(np.searchsorted(weeks, to_week, "right"))
+
+    def points(self, from_week: int, to_week: int = ROS_LAST_WEEK) -> np.ndarray:
+        a, b = self._span(from_week, to_week)
+        return self.points_cum[max(a, b)] - self.points_cum[a]
+
+    def vorp(self, from_week: int, to_week: int = ROS_LAST_WEEK) -> np.ndarray:
+        a, b = self._span(from_week, to_week)
+        return self.vorp_cum[max(a, b)] - self.vorp_cum[a]
+
+    def to_dicts(self, from_week: int, to_week: int = ROS_LAST_WEEK) -> Dict[str, Dict[str, Any]]:
+        """ROS valuations in `compute_vorp_for_week` shape (ranked by ROS points)."""
+        points = self.points(from_week, to_week)
+        vorp = self.vorp(from_week, to_week).tolist()
+        rank_overall, rank_pos = rank_arrays(self.pos_codes, points)
+        rank_pos, rank_overall = rank_pos.tolist(), rank_overall.tolist()
+        pts = points.tolist()
+        return {
+            pid: {
+                "player_id": pid,
+                "week": from_week,
+                "through_week": to_week,
+                "projected_points": round(pts[i], 2),
+                "vorp": round(vorp[i], 2),
+                "rank_pos": rank_pos[i],
+                "rank_overall": rank_overall[i],
+            }
+            for i, pid in enumerate(self.player_ids)
+        }
+
+
+def rest_of_season(season: SeasonValuations, bye_weeks: np.ndarray) -> RestOfSeason:
+    """Build ROS prefix sums; `bye_weeks` is int[P] (0 = unknown/no bye)."""
+    weeks = np.asarray(season.weeks)
+    order = np.argsort(weeks, kind="stable")
+    on_bye = weeks[order][:, None] == bye_weeks[None, :]
+    points = np.where(on_bye, 0.0, season.points[order])
+    vorp = np.where(on_bye, 0.0, season.vorp[order])  # a bye week is worth replacement, i.e. 0 VORP
+    zero = np.zeros((1, points.shape[1]))
+    return RestOfSeason(
+        weeks=weeks[order].tolist(),
+        player_ids=season.player_ids,
+        positions=season.positions,
+        pos_codes=season.pos_codes,
+        points_cum=np.concatenate([zero, np.cumsum(points, axis=0)]),
+        vorp_cum=np.concatenate([zero, np.cumsum(vorp, axis=0)]),
+    )
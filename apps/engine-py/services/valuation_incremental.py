@@ -0,0 +1,312 @@
+"""
+Incremental VORP maintenance for single-player projection changes.
+
+Same semantics as `compute_replacement_levels` / `compute_vorp_for_week`, but
+players live in order-statistic trees (one per position, one overall) keyed by
+(-points, insertion order). A point update is O(log n) to reposition the player
+and find the new replacement level, and `update` returns only the entries whose
+VORP or ranks actually changed.
+
+`apply_updates` carries such updates into a cached `SeasonValuations`, so a
+projection reload that touches a few players patches the cached matrix
+instead of revaluing the season.
+"""
+
+from __future__ import annotations
+import random
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .valuation_engine import SeasonValuations, WeekValuations, starters_required
+
+Key = Tuple[float, int]  # (-points, seq): ascending key == descending points, stable ties
+
+
+class _Node:
+    __slots__ = ("key", "pid", "prio", "size", "left", "right")
+
+    def __init__(self, key: Key, pid: str, prio: float):
+        self.key = key
+        self.pid = pid
+        self.prio = prio
+        self.size = 1
+        self.left: Optional[_Node] = None
+        self.right: Optional[_Node] = None
+
+
+def _size(n: Optional[_Node]) -> int:
+    return n.size if n else 0
+
+
+def _fix(n: _Node) -> _Node:
+    n.size = 1 + _size(n.left) + _size(n.right)
+    return n
+
+
+def _split(n: Optional[_Node], key: Key) -> Tuple[Optional[_Node], Optional[_Node]]:
+    """Split into (keys < key, keys >= key)."""
+    if n is None:
+        return None, None
+    if n.key < key:
+        left, right = _split(n.right, key)
+        n.right = left
+        return _fix(n), right
+    left, right = _split(n.left, key)
+    n.left = right
+    return left, _fix(n)
+
+
+def _merge(a: Optional[_Node], b: Optional[_Node]) -> Optional[_Node]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.prio > b.prio:
+        a.right = _merge(a.right, b)
+        return _fix(a)
+    b.left = _merge(a, b.left)
+    return _fix(b)
+
+
+class OrderStatTree:
+    """Treap with subtree sizes: insert/remove/rank/kth in O(log n) expected."""
+
+    def __init__(self, rng: random.Random):
+        self._root: Optional[_Node] = None
+        self._rng = rng
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def insert(self, key: Key, pid: str) -> None:
+        left, right = _split(self._root, key)
+        self._root = _merge(_merge(left, _Node(key, pid, self._rng.random())), right)
+
+    def remove(self, key: Key) -> None:
+        left, rest = _split(self._root, key)
+        _, right = _split(rest, (key[0], key[1] + 1))  # seq is an int: drops exactly `key`
+        self._root = _merge(left, right)
+
+    def rank(self, key: Key) -> int:
+        """1-based position of `key` (number of keys < key, plus one)."""
+        r, n = 1, self._root
+        while n is not None:
+            if n.key < key:
+                r += _size(n.left) + 1
+                n = n.right
+            else:
+                n = n.left
+        return r
+
+    def kth(self, k: int) -> Key:
+        """Key at 1-based position k."""
+        n = self._root
+        while n is not None:
+            ls = _size(n.left)
+            if k <= ls:
+                n = n.left
+            elif k == ls + 1:
+                return n.key
+            else:
+                k -= ls + 1
+                n = n.right
+        raise IndexError(k)
+
+    def between(self, lo: Key, hi: Key) -> Iterator[str]:
+        """Player ids with lo < key < hi, in key order."""
+        stack: List[_Node] = []
+        n = self._root
+        while stack or n is not None:
+            if n is not None:
+                if n.key > lo:
+                    stack.append(n)
+                    n = n.left
+                else:
+                    n = n.right
+                continue
+            n = stack.pop()
+            if n.key >= hi:
+                return
+            yield n.pid
+            n = n.right
+
+    def __iter__(self) -> Iterator[str]:
+        stack: List[_Node] = []
+        n = self._root
+        while stack or n is not None:
+            if n is not None:
+                stack.append(n)
+                n = n.left
+            else:
+                n = stack.pop()
+                yield n.pid
+                n = n.right
+
+
+class IncrementalValuations:
+    """
+    Live valuations for one week that absorb single-player projection updates.
+
+    `valuations` always equals `compute_vorp_for_week` over the current
+    projections (same rounding, same tie order).
+    """
+
+    def __init__(
+        self,
+        players: Dict[str, Dict[str, Any]],
+        projections: Dict[str, float],
+        settings: Dict[str, Any],
+        week: int,
+        teams_count: int = 12,
+    ):
+        self.week = week
+        self._rng = random.Random(0)
+        self._pos: Dict[str, str] = {}
+        self._key: Dict[str, Key] = {}
+        self._by_pos: Dict[str, OrderStatTree] = {}
+        self._overall = OrderStatTree(self._rng)
+        self._depth: Dict[str, int] = {}  # replacement rank per position
+        self.replacement: Dict[str, float] = {}
+        self.valuations: Dict[str, Dict[str, Any]] = {}
+
+        for seq, (pid, pts) in enumerate(projections.items()):
+            pos = players[pid]["pos"]
+            key = (-float(pts), seq)
+            self._pos[pid] = pos
+            self._key[pid] = key
+            tree = self._by_pos.get(pos)
+            if tree is None:
+                tree = self._by_pos[pos] = OrderStatTree(self._rng)
+                self._depth[pos] = max(1, starters_required(settings, pos) * teams_count)
+            tree.insert(key, pid)
+            self._overall.insert(key, pid)
+
+        for pos in self._by_pos:
+            self.replacement[pos] = self._replacement_for(pos)
+        for pid in self._key:
+            self.valuations[pid] = self._entry(pid)
+
+    @classmethod
+    def from_week(
+        cls, wv: WeekValuations, settings: Dict[str, Any], week: int, teams_count: int = 12,
+    ) -> "IncrementalValuations":
+        """Live valuations seeded from one week of columnar valuations."""
+        labels = [wv.positions[c] for c in wv.pos_codes.tolist()]
+        players = {pid: {"pos": pos} for pid, pos in zip(wv.player_ids, labels)}
+        return cls(players, dict(zip(wv.player_ids, wv.points.tolist())), settings, week, teams_count)
+
+    def _replacement_for(self, pos: str) -> float:
+        tree = self._by_pos[pos]
+        return -tree.kth(min(len(tree), self._depth[pos]))[0]
+
+    def _entry(self, pid: str, rank_pos: int | None = None, rank_overall: int | None = None) -> Dict[str, Any]:
+        key = self._key[pid]
+        pos = self._pos[pid]
+        return {
+            "player_id": pid,
+            "week": self.week,
+            "vorp": round(-key[0] - self.replacement[pos], 2),
+            "rank_pos": rank_pos if rank_pos is not None else self._by_pos[pos].rank(key),
+            "rank_overall": rank_overall if rank_overall is not None else self._overall.rank(key),
+        }
+
+    def update(self, pid: str, points: float) -> Dict[str, Dict[str, Any]]:
+        """
+        Set one player's projection; return {pid: valuation} for every player
+        whose VORP, rank_pos or rank_overall changed (including `pid` itself).
+        """
+        return self._update(pid, points, {})
+
+    def update_many(self, points: Mapping[str, float]) -> Dict[str, Dict[str, Any]]:
+        """Set several projections; return the players whose valuation differs from before the batch."""
+        before: Dict[str, Dict[str, Any]] = {}
+        for pid, pts in points.items():
+            self._update(pid, pts, before)
+        return {pid: self.valuations[pid] for pid, prev in before.items() if self.valuations[pid] != prev}
+
+    def _update(self, pid: str, points: float, before: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        # `before` collects each player's entry as it was before its first change
+        old = self._key[pid]
+        new = (-float(points), old[1])
+        if new == old:
+            return {}
+        pos = self._pos[pid]
+        tree = self._by_pos[pos]
+        tree.remove(old)
+        tree.insert(new, pid)
+        self._overall.remove(old)
+        self._overall.insert(new, pid)
+        self._key[pid] = new
+
+        # players strictly between the old and new key shift one rank
+        lo, hi = (new, old) if new < old else (old, new)
+        step = 1 if new < old else -1
+        rank_shift: Dict[str, Tuple[int, int]] = {}  # pid -> (d_rank_pos, d_rank_overall)
+        for other in self._overall.between(lo, hi):
+            rank_shift[other] = (0, step)
+        for other in tree.between(lo, hi):
+            rank_shift[other] = (step, step)
+
+        candidates = set(rank_shift)
+        repl = self._replacement_for(pos)
+        if repl != self.replacement[pos]:
+            self.replacement[pos] = repl
+            candidates.update(tree)
+
+        changed: Dict[str, Dict[str, Any]] = {pid: self._entry(pid)}
+        for other in candidates:
+            if other == pid:
+                continue
+            prev = self.valuations[other]
+            d_pos, d_all = rank_shift.get(other, (0, 0))
+            entry = self._entry(other, prev["rank_pos"] + d_pos, prev["rank_overall"] + d_all)
+            if entry != prev:
+                changed[other] = entry
+
+        if changed[pid] == self.valuations[pid]:
+            del changed[pid]
+        for other in changed:
+            before.setdefault(other, self.valuations[other])  # entries are replaced, never mutated
+        self.valuations.update(changed)
+        return changed
+
+    def projections(self) -> Dict[str, float]:
+        return {pid: -key[0] for pid, key in self._key.items()}
+
+
+def apply_updates(
+    season: SeasonValuations,
+    live: Mapping[int, IncrementalValuations],
+    updates: Mapping[int, Mapping[str, float]],
+) -> Tuple[SeasonValuations, Dict[int, Dict[str, Dict[str, Any]]]]:
+    """
+    Apply `updates` (week -> player -> points) through each week's live
+    valuations, which must match `season`. Returns a patched copy of `season`
+    (cached matrices are shared read-only) and week -> {pid: valuation} for
+    the players whose VORP or ranks changed.
+    """
+    points, vorp = season.points.copy(), season.vorp.copy()
+    replacement = season.replacement.copy()
+    rank_pos, rank_overall = season.rank_pos.copy(), season.rank_overall.copy()
+    col = {pid: i for i, pid in enumerate(season.player_ids)}
+    code = {pos: c for c, pos in enumerate(season.positions)}
+    changed: Dict[int, Dict[str, Dict[str, Any]]] = {}
+    for week, cells in updates.items():
+        wi = season.week_index(week)
+        inc = live[week]
+        week_changed = inc.update_many(cells)
+        for pid, pts in cells.items():
+            points[wi, col[pid]] = pts
+        for pos, repl in inc.replacement.items():
+            replacement[wi, code[pos]] = repl
+        vorp[wi] = points[wi] - replacement[wi, season.pos_codes]  # unrounded, like value_season
+        for pid, entry in week_changed.items():
+            rank_pos[wi, col[pid]] = entry["rank_pos"]
+            rank_overall[wi, col[pid]] = entry["rank_overall"]
+        changed[week] = week_changed
+    patched = SeasonValuations(
+        weeks=season.weeks, player_ids=season.player_ids, positions=season.positions, pos_codes=season.pos_codes,
+        points=points, replacement=replacement, vorp=vorp, rank_pos=rank_pos, rank_overall=rank_overall,
+    )
+    return patched, changed
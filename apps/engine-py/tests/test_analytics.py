@@ -0,0 +1,113 @@
+"""DuckDB analytics store: multi-season queries and league/source-scoped backfills."""
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from db.models import Base, Transaction
+from services.projections.mock import MockSource
+from services.store import Store, valuation_rows
+from services.valuation import compute_season_valuations
+
+pytest.importorskip("duckdb")
+from services.analytics import AnalyticsStore  # noqa: E402
+
+SETTINGS = {"roster_rules_json": {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1}}
+PLAYERS = {
+    f"P{i}": {"id": f"P{i}", "name": f"Player {i}", "pos": ["QB", "RB", "WR", "TE"][i % 4], "team": "BUF",
+              "bye_week": 5 + i % 3}
+    for i in range(24)
+}
+SEASON = compute_season_valuations(PLAYERS, MockSource(), SETTINGS, weeks=(1, 2, 3))
+
+
+def _shifted(season, by):
+    """`season` with every projection moved by `by` points (a second source or year)."""
+    return type(season)(
+        weeks=season.weeks, player_ids=season.player_ids, positions=season.positions, pos_codes=season.pos_codes,
+        points=season.points + by, replacement=season.replacement, vorp=season.vorp + by,
+        rank_pos=season.rank_pos, rank_overall=season.rank_overall,
+    )
+
+
+@pytest.fixture
+def db():
+    store = AnalyticsStore(":memory:")
+    store.load_season(2024, "mock", SEASON, PLAYERS, 7)
+    store.load_season(2025, "mock", _shifted(SEASON, 1.0), PLAYERS, 7)
+    store.load_season(2025, "actual", _shifted(SEASON, -2.0), PLAYERS, 7)
+    return store
+
+
+def test_seasons_and_reload_replaces_only_that_league_source(db):
+    assert [(r["season"], r["source"], r["weeks"]) for r in db.seasons()] == [
+        (2025, "actual", 3), (2025, "mock", 3), (2024, "mock", 3),
+    ]
+    db.load_season(2025, "mock", SEASON, PLAYERS, 8)
+    db.load_season(2025, "mock", SEASON, PLAYERS, 7)
+    rows = {(r["season"], r["source"]): r["rows"] for r in db.seasons()}
+    assert rows[(2025, "mock")] == 2 * 3 * len(PLAYERS) and rows[(2025, "actual")] == 3 * len(PLAYERS)
+
+
+def test_vorp_trends_compare_each_season_with_the_last(db):
+    trends = db.vorp_trends(pos="RB", seasons=2)
+    assert {r["pos"] for r in trends} == {"RB"} and {r["season"] for r in trends} == {2024, 2025}
+    by_player = {}
+    for r in trends:
+        by_player.setdefault(r["player_id"], []).append(r)
+    for pid, (old, new) in by_player.items():
+        assert (old["season"], new["season"]) == (2024, 2025) and old["change"] is None
+        assert new["change"] == pytest.approx(1.0, abs=0.011) and new["name"] == PLAYERS[pid]["name"]
+    assert len(db.vorp_trends(seasons=1, limit=3)) == 3
+
+
+def test_scarcity_curve_averages_vorp_by_positional_rank(db):
+    curve = db.scarcity_curve(2024, week=2, depth=3)
+    wv = SEASON.week(2)
+    labels = np.asarray(SEASON.positions)[SEASON.pos_codes]
+    for r in curve:
+        i = np.flatnonzero((labels == r["pos"]) & (wv.rank_pos == r["rank"]))[0]
+        assert r["vorp"] == pytest.approx(round(float(wv.vorp[i]), 2))
+    assert max(r["rank"] for r in curve) == 3
+
+
+def test_source_accuracy_against_actuals(db):
+    db.load_season(2025, "actual", SEASON, PLAYERS, 8)  # another league's actuals don't pair up
+    [acc] = db.source_accuracy(2025)
+    assert acc["source"] == "mock" and acc["n"] == 3 * len(PLAYERS)
+    assert (acc["mae"], acc["rmse"], acc["bias"]) == pytest.approx((3.0, 3.0, 3.0))
+
+
+def test_backfill_replaces_only_the_leagues_and_sources_it_reads():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as s:
+        store = Store(s)
+        store.sync_league(7, 2025, 1, SETTINGS, {}, {}, PLAYERS)
+        store.write_valuations(valuation_rows(SEASON, "mock", 7, 2025))
+        store.write_valuations(valuation_rows(SEASON, "mock", 8, 2025))
+        s.add_all([
+            Transaction(league_id=lid, year=2025, ts=datetime(2025, 9, 1), type="add", payload={"p": "P1"})
+            for lid in (7, 8)
+        ])
+        s.commit()
+
+        db = AnalyticsStore(":memory:")
+        db.load_season(2025, "espn", SEASON, PLAYERS, 7)  # a source the store doesn't hold
+        assert db.load_from_store(s, 2025) == {"valuations": 6 * len(PLAYERS), "players": len(PLAYERS),
+                                               "transactions": 2}
+        got = db.load_from_store(s, 2025, league_id=8)
+        assert got["valuations"] == 3 * len(PLAYERS) and got["transactions"] == 1
+
+    counts = db._query(
+        "SELECT league_id, source, count(*) AS n, max(rank_overall) AS worst FROM valuations "
+        "GROUP BY league_id, source ORDER BY league_id, source"
+    )
+    assert [(r["league_id"], r["source"], r["n"]) for r in counts] == [
+        (7, "espn", 3 * len(PLAYERS)), (7, "mock", 3 * len(PLAYERS)), (8, "mock", 3 * len(PLAYERS)),
+    ]
+    assert {r["worst"] for r in counts} == {len(PLAYERS)}  # ranks restart per league
+    assert db._query("SELECT league_id FROM transactions ORDER BY league_id") == [{"league_id": 7}, {"league_id": 8}]
+    engine.dispose()
@@ -0,0 +1,117 @@
+"""AsyncStore reads against the sync Store, its cache, and the async team route (SQLite + aiosqlite)."""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from db.models import Base
+from db.session import async_url, get_async_store
+from main import app
+from services import mock_data, store_cache
+from services.store import AsyncStore, Store, team_dict
+from services.store_cache import CachedAsyncStore
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    """A file database holding the mock league, shared by the sync and async engines."""
+    url = f"sqlite:///{tmp_path / 'engine.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    league_id, year = mock_data.league_scope()
+    with Session(engine) as s:
+        Store(s).sync_league(league_id, year, 1, mock_data.SETTINGS, mock_data.TEAMS, mock_data.ROSTERS, mock_data.PLAYERS)
+        s.commit()
+    engine.dispose()
+    store_cache.STORE_READS.invalidate()
+    yield url
+    store_cache.STORE_READS.invalidate()
+
+
+def _run(url, read):
+    """`read(session)` on an AsyncSession over a fresh async engine."""
+    async def main():
+        engine = create_async_engine(async_url(url))
+        try:
+            async with AsyncSession(engine) as s:
+                return await read(s)
+        finally:
+            await engine.dispose()
+    return asyncio.run(main())
+
+
+def test_async_url_swaps_in_the_async_driver():
+    assert async_url("sqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+    assert async_url("postgresql://u:pw@h/db") == "postgresql+asyncpg://u:pw@h/db"
+    assert async_url("postgresql+psycopg_async://h/db") == "postgresql+psycopg_async://h/db"
+
+
+def test_async_reads_match_the_sync_store(db_url):
+    team = next(iter(mock_data.TEAMS))
+
+    async def read(s):
+        store = AsyncStore(s)
+        return (
+            team_dict(await store.get_team(team)),
+            [(r.player_id, r.slot) for r in await store.roster_for_week(team, await store.roster_week(team, 4))],
+            await store.players_by_id(["QB1", "RB1", "nope"]),
+            await store.list_players(pos="WR", limit=3, offset=1),
+            await store.get_team("nope"),
+        )
+
+    engine = create_engine(db_url)
+    with Session(engine) as s:
+        store = Store(s)
+        expected = (
+            team_dict(store.get_team(team)),
+            [(r.player_id, r.slot) for r in store.roster_for_week(team, store.roster_week(team, 4))],
+            store.players_by_id(["QB1", "RB1", "nope"]),
+            store.list_players(pos="WR", limit=3, offset=1),
+            None,
+        )
+    engine.dispose()
+    got = _run(db_url, read)
+    assert got == expected
+    assert got[1] == [(r["player_id"], r["slot"]) for r in mock_data.roster(team)]
+    assert [p["id"] for p in got[3]] == ["WR2", "WR3", "WR4"]
+
+
+def test_cached_async_reads_share_the_store_cache(db_url):
+    team = next(iter(mock_data.TEAMS))
+
+    async def read(s):
+        store = CachedAsyncStore(s)
+        first = await store.get_team(team)
+        hits = store_cache.stats()["hits"]
+        again = await store.get_team(team)
+        return first, again, store_cache.stats()["hits"] - hits
+
+    first, again, hits = _run(db_url, read)
+    assert again is first and hits == 1
+    assert first.name == mock_data.TEAMS[team]["name"]  # detached, still loaded
+
+
+def test_team_route_reads_the_async_store(db_url):
+    team = next(iter(mock_data.TEAMS))
+    client = TestClient(app)
+    in_memory = client.get(f"/v1/teams/{team}", params={"week": 2}).json()
+
+    engine = create_async_engine(async_url(db_url))
+
+    async def store():
+        async with AsyncSession(engine, expire_on_commit=False) as s:
+            yield CachedAsyncStore(s)
+
+    app.dependency_overrides[get_async_store] = store
+    try:
+        stored = client.get(f"/v1/teams/{team}", params={"week": 2}).json()
+        assert client.get("/v1/teams/nope").status_code == 404
+    finally:
+        app.dependency_overrides.pop(get_async_store, None)
+        asyncio.run(engine.dispose())
+    assert stored["team"]["name"] == in_memory["team"]["name"]
+    assert stored["team_score"] == in_memory["team_score"]
+    assert [r["player"]["id"] for r in stored["roster"]] == [r["player"]["id"] for r in in_memory["roster"]]
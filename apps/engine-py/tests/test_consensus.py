@@ -0,0 +1,85 @@
+"""The consensus source: blending, per-source caching and timeouts."""
+import threading
+
+import numpy as np
+import pytest
+
+from services.projections.consensus import ConsensusSource, blend
+
+PLAYERS = {"a": {"pos": "QB"}, "b": {"pos": "RB"}, "c": {"pos": "WR"}}
+
+
+class ConstSource:
+    def __init__(self, sid, value, gate=None, fail=False):
+        self.id = self.name = self.description = sid
+        self.value, self.gate, self.fail = value, gate, fail
+        self.version = 0
+        self.calls = 0
+
+    def weekly_points(self, players, *, week):
+        return dict(zip(players, self.weekly_points_many(players, [week])[0].tolist()))
+
+    def weekly_points_many(self, players, weeks):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("source down")
+        return np.full((len(weeks), len(players)), self.value)
+
+
+def _consensus(*sources, **kw):
+    return ConsensusSource(lambda: {s.id: s for s in sources}, **kw)
+
+
+def test_blend_methods():
+    stack = np.array([[[1.0]], [[2.0]], [[9.0]], [[4.0]], [[100.0]]])
+    assert blend(stack, "mean")[0, 0] == pytest.approx(23.2)
+    assert blend(stack, "median")[0, 0] == 4.0
+    assert blend(stack, "trimmed", trim=0.2)[0, 0] == pytest.approx(5.0)
+    assert blend(stack[:2], "mean", np.array([3.0, 1.0]))[0, 0] == pytest.approx(1.25)
+    with pytest.raises(ValueError):
+        blend(stack, "mode")
+
+
+def test_each_source_is_cached_under_its_own_version():
+    a, b = ConstSource("a", 10.0), ConstSource("b", 20.0)
+    cons = _consensus(a, b, weights={"b": 3.0})
+    assert cons.weekly_points_many(PLAYERS, [1, 2]).tolist() == [[17.5] * 3] * 2
+    cons.weekly_points_many(PLAYERS, [1, 2])
+    assert (a.calls, b.calls) == (1, 1)
+    b.version += 1  # e.g. a reloaded file
+    assert cons.version == 1
+    cons.weekly_points_many(PLAYERS, [1, 2])
+    assert (a.calls, b.calls) == (1, 2)
+    assert cons.timings()["a"]["cache_hits"] == 2
+
+
+def test_a_failing_source_drops_out():
+    cons = _consensus(ConstSource("a", 10.0), ConstSource("b", 0.0, fail=True))
+    assert cons.weekly_points(PLAYERS, week=1) == {"a": 10.0, "b": 10.0, "c": 10.0}
+    assert cons.timings()["b"]["errors"] == 1
+    with pytest.raises(ValueError):
+        _consensus(ConstSource("b", 0.0, fail=True)).weekly_points_many(PLAYERS, [1])
+
+
+def test_a_slow_source_times_out_without_piling_up_fetches():
+    gate = threading.Event()
+    fast, slow = ConstSource("fast", 10.0), ConstSource("slow", 50.0, gate=gate)
+    cons = _consensus(fast, slow, timeout_s=0.05)
+    try:
+        for _ in range(3):
+            assert cons.weekly_points_many(PLAYERS, [1]).tolist() == [[10.0] * 3]
+        # the later blends joined the one hung fetch instead of queueing more
+        assert slow.calls == 1
+        assert cons.timings()["slow"]["timeouts"] == 3
+        (hung,) = cons._inflight.values()
+        # a different key queues behind the hung fetch and is cancelled on timeout
+        cons.weekly_points_many(PLAYERS, [2])
+        assert len(cons._inflight) == 1
+    finally:
+        gate.set()
+    hung.result(timeout=5)
+    # the hung fetch finished in the background and filled the cache
+    assert cons.weekly_points_many(PLAYERS, [1]).tolist() == [[30.0] * 3]
+    assert slow.calls == 1  # the cancelled week-2 fetch never ran
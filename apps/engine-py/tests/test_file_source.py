@@ -0,0 +1,61 @@
+"""FileSource: memory-mapped reads, explicit reloads and per-source versions."""
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from jobs import tasks
+from main import app
+from services import mock_data
+from services.projections import registry
+from services.projections.file_source import FileSource, write_projection_dir
+
+PLAYERS = {"a": {"pos": "QB"}, "b": {"pos": "RB"}, "x": {"pos": "WR"}}
+
+
+@pytest.fixture
+def file_source(tmp_path, monkeypatch):
+    write_projection_dir(tmp_path, ["a", "b"], [1, 2], np.array([[10.0, 5.0], [11.0, 6.0]]))
+    src = FileSource(tmp_path)
+    monkeypatch.setitem(registry._SOURCES, "file", src)
+    return src
+
+
+def test_reads_map_the_file_and_missing_cells_are_zero(file_source):
+    assert file_source.weekly_points(PLAYERS, week=2) == {"a": 11.0, "b": 6.0, "x": 0.0}
+    assert file_source.weekly_points_many(PLAYERS, [1, 3]).tolist() == [[10.0, 5.0, 0.0], [0.0, 0.0, 0.0]]
+    assert isinstance(file_source._matrix, np.memmap)
+
+
+def test_a_replaced_file_is_only_picked_up_by_reload(file_source, tmp_path):
+    file_source.weekly_points(PLAYERS, week=1)
+    assert not file_source.changed()
+    write_projection_dir(tmp_path, ["a", "b"], [1, 2], np.array([[20.0, 5.0], [11.0, 6.0]]))
+    version = mock_data.data_version()
+    assert file_source.weekly_points(PLAYERS, week=1)["a"] == 10.0  # reads keep the old mapping
+    assert file_source.changed()
+    file_source.reload()
+    assert file_source.version == 1
+    assert file_source.weekly_points(PLAYERS, week=1)["a"] == 20.0
+    assert mock_data.data_version() == version
+
+
+def test_reload_endpoint_revalues_only_that_source(tmp_path, monkeypatch):
+    ids = list(mock_data.PLAYERS)
+    points = np.tile(np.linspace(1.0, 20.0, len(ids)), (2, 1))
+    write_projection_dir(tmp_path, ids, [1, 2], points)
+    monkeypatch.setitem(registry._SOURCES, "file", FileSource(tmp_path))
+    client = TestClient(app)
+    mock_week = tasks.week_valuations(1, "mock")
+    file_week = tasks.week_valuations(1, "file")
+    assert client.post("/v1/projections/sources/file/reload").json() == {"id": "file", "reloaded": False, "version": 0}
+    assert tasks.get_cached_valuations(1, "file") is file_week
+
+    points[0] += 1.0  # every player moves: too wide to patch
+    write_projection_dir(tmp_path, ids, [1, 2], points)
+    body = client.post("/v1/projections/sources/file/reload").json()
+    assert body == {"id": "file", "reloaded": True, "version": 1, "revalue": True}
+    assert tasks.get_cached_valuations(1, "file") is None
+    assert tasks.week_valuations(1, "file")[ids[0]]["vorp"] == file_week[ids[0]]["vorp"]  # a uniform shift
+    assert tasks.get_cached_valuations(1, "mock") is mock_week
+    assert client.post("/v1/projections/sources/mock/reload").status_code == 400
+    assert client.post("/v1/projections/sources/nope/reload").status_code == 404
@@ -0,0 +1,115 @@
+"""League snapshots: columnar hashed writes, lazily verified memory-mapped reads."""
+import copy
+import json
+
+import numpy as np
+import pytest
+
+from jobs import tasks
+from services import mock_data
+from services.league_snapshot import SnapshotError, read_manifest, read_snapshot, write_snapshot
+from services.projections.mock import MockSource
+from services.valuation import compute_season_valuations
+
+SETTINGS = {"roster_rules_json": {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1}}
+PLAYERS = {
+    f"P{i}": {"id": f"P{i}", "name": f"Player {i}", "pos": ["QB", "RB", "WR", "TE"][i % 4], "team": "BUF",
+              "bye_week": None if i % 5 == 0 else 5 + i % 9}
+    for i in range(40)
+}
+TEAMS = {"t0": {"id": "t0", "name": "Team 0"}, "t1": {"id": "t1", "name": "Team 1"}}
+ROSTERS = {"t0": [{"player_id": "P1", "slot": "RB"}, {"player_id": "P2", "slot": "BN"}], "t1": []}
+
+
+def _write(path, players=PLAYERS):
+    season = compute_season_valuations(players, MockSource(), SETTINGS, weeks=(1, 2, 3))
+    manifest = write_snapshot(
+        path, league="espn-7-2025", source="mock",
+        players=players, teams=TEAMS, rosters=ROSTERS, settings=SETTINGS, season=season,
+    )
+    return season, manifest
+
+
+def test_read_returns_what_was_written(tmp_path):
+    season, manifest = _write(tmp_path / "league")
+    snap = read_snapshot(tmp_path / "league")
+    assert snap.manifest == manifest == read_manifest(tmp_path / "league")
+    assert (snap.league, snap.source) == ("espn-7-2025", "mock")
+    assert (snap.players(), snap.teams, snap.rosters(), snap.settings) == (PLAYERS, TEAMS, ROSTERS, SETTINGS)
+    assert isinstance(snap.array("player_id"), np.memmap) and isinstance(snap.array("roster_slot"), np.memmap)
+    got = snap.season()
+    assert list(got.weeks) == list(season.weeks) and list(got.player_ids) == list(season.player_ids)
+    for m in ("pos_codes", "points", "replacement", "vorp", "rank_pos", "rank_overall"):
+        assert isinstance(getattr(got, m), np.memmap)
+        np.testing.assert_array_equal(getattr(got, m), getattr(season, m))
+    assert got.week(2).to_dicts(2) == season.week(2).to_dicts(2)
+
+
+def test_missing_player_fields_read_back_as_none(tmp_path):
+    _write(tmp_path / "league", players={"K1": {"id": "K1", "name": "Ken", "pos": "K"}})
+    assert read_snapshot(tmp_path / "league").players() == {
+        "K1": {"id": "K1", "name": "Ken", "pos": "K", "team": None, "bye_week": None},
+    }
+
+
+def test_rewrite_gives_same_hashes_and_replaces_whole_directory(tmp_path):
+    _, first = _write(tmp_path / "league")
+    _, second = _write(tmp_path / "league")
+    assert first["files"] == second["files"] and first["sha256"] == second["sha256"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["league"]
+
+
+def test_each_file_is_checked_when_first_read(tmp_path):
+    d = tmp_path / "league"
+    _write(d)
+    points = np.load(d / "points.npy")
+    points[0, 0] += 1.0
+    np.save(d / "points.npy", points)
+    snap = read_snapshot(d)
+    assert snap.players() == PLAYERS and snap.rosters() == ROSTERS  # untouched files still load
+    with pytest.raises(SnapshotError):
+        snap.season()
+    assert read_snapshot(d, verify=False).season().points[0, 0] == points[0, 0]
+
+    _write(d)
+    (d / "roster_slot.npy").unlink()
+    with pytest.raises(SnapshotError):
+        read_snapshot(d).rosters()
+
+
+def test_tampered_manifest_or_other_format_is_rejected(tmp_path):
+    d = tmp_path / "league"
+    _write(d)
+    manifest = json.loads((d / "manifest.json").read_text())
+    (d / "manifest.json").write_text(json.dumps({**manifest, "files": {**manifest["files"], "points.npy": "0" * 64}}))
+    assert read_snapshot(d) is None
+
+    _write(d)
+    (d / "manifest.json").write_text(json.dumps({**manifest, "format": manifest["format"] + 1}))
+    assert read_snapshot(d) is None and read_manifest(d) is None
+    assert read_snapshot(tmp_path / "missing") is None
+
+
+@pytest.fixture
+def league():
+    saved = (copy.deepcopy(mock_data.TEAMS), copy.deepcopy(mock_data.ROSTERS),
+             copy.deepcopy(mock_data.SETTINGS), copy.deepcopy(mock_data.PLAYERS), mock_data.league_id())
+    yield
+    teams, rosters, settings, players, league_id = saved
+    mock_data.load_league(teams, rosters, settings, players=players, league=league_id)
+
+
+def test_startup_load_defers_the_matrices_to_the_first_valuation_read(tmp_path, monkeypatch, league):
+    monkeypatch.setattr(tasks, "LEAGUE_SNAPSHOT_DIR", str(tmp_path / "league"))
+    season, manifest = _write(tmp_path / "league")
+    loaded = tasks.load_league_snapshot()
+    assert loaded["sha256"] == manifest["sha256"] and loaded["load_ms"] >= 0
+    assert mock_data.league_id() == "espn-7-2025" and mock_data.PLAYERS == PLAYERS
+    assert tasks.get_cached_valuations(2) is None  # nothing mapped yet
+    monkeypatch.setattr(tasks, "_compute_season", lambda source: pytest.fail("recomputed"))
+    assert isinstance(tasks.season_valuations().points, np.memmap)
+    assert tasks.week_valuations(2) == season.week(2).to_dicts(2)
+
+    # a later sync in the database makes the snapshot stale
+    assert tasks.load_league_snapshot(("espn-7-2025", manifest["created_at"] + 1)) is None
+    assert tasks.load_league_snapshot(("espn-8-2025", 0)) is None
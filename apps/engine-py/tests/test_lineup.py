@@ -0,0 +1,71 @@
+"""The exact lineup optimizer against brute-force enumeration."""
+import random
+from functools import lru_cache
+
+import pytest
+
+from services.lineup import compile_roster_rules, lineup_value, pos_mask, recommend_lineup, solve_lineup
+
+POSITIONS = ["QB", "RB", "WR", "TE", "K", "DST"]
+RULES = [
+    {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1},
+    {"QB": 1, "RB": 2, "WR": 3, "TE": 1, "FLEX": 2, "OP": 1, "K": 1, "DST": 1},
+    {"QB": 2, "RB/WR": 1, "WR/TE": 1, "SUPERFLEX": 1},
+]
+
+
+def brute_force(masks, scores, template):
+    """Best total over every assignment of players to slot types (or the bench)."""
+    n_types = len(template.masks)
+
+    @lru_cache(maxsize=None)
+    def best(i, free):
+        if i == len(scores):
+            return 0.0
+        out = best(i + 1, free)  # bench
+        for t in range(n_types):
+            if free[t] and template.masks[t] & masks[i]:
+                left = free[:t] + (free[t] - 1,) + free[t + 1:]
+                out = max(out, scores[i] + best(i + 1, left))
+        return out
+
+    return best(0, tuple(template.capacity))
+
+
+def _roster(rng, n):
+    masks = [pos_mask(rng.choice(POSITIONS)) for _ in range(n)]
+    scores = [round(rng.uniform(0, 20), 1) for _ in range(n)]
+    return masks, scores
+
+
+@pytest.mark.parametrize("rules", RULES)
+@pytest.mark.parametrize("seed", range(40))
+def test_solve_lineup_is_optimal_and_feasible(rules, seed):
+    rng = random.Random(seed)
+    template = compile_roster_rules(rules)
+    masks, scores = _roster(rng, rng.randint(0, 12))
+    assigned = solve_lineup(masks, scores, template)
+
+    used = [0] * len(template.masks)
+    for p, t in enumerate(assigned):
+        if t >= 0:
+            assert template.masks[t] & masks[p]
+            used[t] += 1
+    assert all(u <= c for u, c in zip(used, template.capacity))
+
+    expected = brute_force(masks, scores, template)
+    got = sum(scores[p] for p, t in enumerate(assigned) if t >= 0)
+    assert got == pytest.approx(expected)
+    assert lineup_value(masks, scores, template) == pytest.approx(expected)
+
+
+def test_recommend_lineup_fills_flex_after_dedicated_slots():
+    def item(pid, pos, vorp):
+        return {"player": {"id": pid, "pos": pos}, "slot": "BN", "valuation": {"player_id": pid, "vorp": vorp}}
+
+    roster = [item("r1", "RB", 9), item("r2", "RB", 8), item("r3", "RB", 7), item("w1", "WR", 1), item("q1", "QB", 5)]
+    out = recommend_lineup(roster, {"QB": 1, "RB": 2, "WR": 1, "FLEX": 1})
+    starters = {s["slot"]: [] for s in out["starters"]}
+    for s in out["starters"]:
+        starters[s["slot"]].append(s["player"]["id"])
+    assert starters == {"QB": ["q1"], "RB": ["r1", "r2"], "WR": ["w1"], "FLEX": ["r3"]}
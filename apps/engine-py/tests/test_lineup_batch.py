@@ -0,0 +1,56 @@
+"""The league-wide batch lineup endpoint and its worker pool."""
+import random
+
+from fastapi.testclient import TestClient
+
+from main import app
+from services import lineup, mock_data
+
+RULES = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 2, "K": 1}
+
+
+def _rosters(n_teams, seed):
+    rng = random.Random(seed)
+    return {
+        f"t{t}": [
+            {
+                "player": {"id": f"t{t}p{i}", "pos": rng.choice(["QB", "RB", "WR", "TE", "K"])},
+                "slot": rng.choice(["BN", "BN", "BN", "IR"]),
+                "valuation": {"vorp": round(rng.uniform(-2, 15), 2)} if rng.random() > 0.05 else None,
+            }
+            for i in range(16)
+        ]
+        for t in range(n_teams)
+    }
+
+
+def _without_timing(result):
+    return {k: v for k, v in result.items() if k != "elapsed_ms"}
+
+
+def test_batch_matches_one_lineup_per_team():
+    rosters = _rosters(14, 1)
+    batch = lineup.recommend_lineups(rosters, RULES)
+    assert list(batch) == list(rosters)
+    for tid, items in rosters.items():
+        assert batch[tid]["elapsed_ms"] >= 0
+        assert _without_timing(batch[tid]) == lineup.recommend_lineup(items, RULES)
+
+
+def test_pooled_solves_match_inline(monkeypatch):
+    rosters = _rosters(12, 2)
+    inline = lineup.recommend_lineups(rosters, RULES)
+    monkeypatch.setattr(lineup, "PARALLEL_MIN_PLAYERS", 1)
+    pooled = lineup.recommend_lineups(rosters, RULES, processes=2)
+    assert {t: _without_timing(r) for t, r in pooled.items()} == {t: _without_timing(r) for t, r in inline.items()}
+
+
+def test_lineups_endpoint_covers_every_team():
+    client = TestClient(app)
+    body = client.get("/v1/recommend/lineups", params={"week": 3}).json()
+    assert body["week"] == 3
+    assert [t["team"]["id"] for t in body["teams"]] == list(mock_data.TEAMS)
+    assert set(body["timings"]) >= {"valuations_ms", "optimize_ms", "total_ms"}
+    for entry in body["teams"]:
+        single = client.get("/v1/recommend/lineup", params={"team_id": entry["team"]["id"], "week": 3}).json()
+        assert _without_timing(entry) == single
@@ -0,0 +1,80 @@
+"""Memoized lineup values (LINEUP_VALUES) under the optimizer, team score and trade search."""
+import pytest
+
+from jobs import tasks
+from services import mock_data
+from services.lineup import (
+    LINEUP_VALUES, LineupValueCache, compile_roster_rules, lineup_memo_key, lineup_value, pos_mask, rules_signature,
+)
+from services.recommend_trade import search_trades
+from services.team_score import compute_team_score
+
+RULES = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    LINEUP_VALUES.clear()
+    LINEUP_VALUES.hits = LINEUP_VALUES.misses = 0
+    yield
+    LINEUP_VALUES.clear()
+
+
+def test_lru_with_hit_and_miss_counters():
+    cache = LineupValueCache(max_entries=2)
+    cache.put("a", 1.0)
+    cache.put("b", 0.0)
+    assert cache.get("a") == 1.0
+    cache.put("c", 3.0)
+    assert cache.get("b") is None  # least recently used
+    assert cache.get("c") == 3.0
+    assert cache.stats() == {"entries": 2, "hits": 2, "misses": 1}
+
+
+def test_memo_key_ignores_roster_and_rules_order():
+    assert rules_signature({"RB": 2, "QB": 1}) == rules_signature({"QB": 1, "RB": 2})
+    assert lineup_memo_key("v", rules_signature(RULES), ["b", "a"]) == lineup_memo_key("v", rules_signature(RULES), ["a", "b"])
+
+
+def test_lineup_value_is_served_from_the_memo():
+    template = compile_roster_rules(RULES)
+    masks = [pos_mask(p) for p in ("QB", "RB", "RB", "WR", "TE", "WR", "RB")]
+    scores = [5.0, 4.0, 3.0, 2.0, 1.0, 6.0, 7.0]
+    key = lineup_memo_key(("L", "mock", 1, 0), rules_signature(RULES), "abcdefg")
+    expected = lineup_value(masks, scores, template)
+    assert lineup_value(masks, scores, template, memo_key=key) == expected
+    # a hit never re-solves: a different input under the same key still returns the memo
+    assert lineup_value(masks, [0.0] * 7, template, memo_key=key) == expected
+    assert LINEUP_VALUES.stats()["hits"] == 1
+
+
+def test_team_score_keeps_its_meaning_and_is_memoized():
+    def item(pid, pos, slot, vorp):
+        return {"player": {"id": pid, "pos": pos}, "slot": slot, "valuation": {"vorp": vorp}}
+
+    roster = [
+        item("q", "QB", "QB", 4.0), item("r1", "RB", "RB", 3.0), item("r2", "RB", "FLEX", 2.5),
+        item("w", "WR", "FLEX", 5.0), item("t", "TE", "TE", -1.0), item("b", "RB", "BN", 9.0),
+    ]
+    # slotted starters only, FLEX takes its best candidate, below-replacement floored at 0
+    assert compute_team_score(roster) == 12.0
+    vkey = tasks.valuation_key(1, "mock")
+    assert compute_team_score(roster, valuation_key=vkey) == 12.0
+    assert compute_team_score(list(reversed(roster)), valuation_key=vkey) == 12.0
+    assert LINEUP_VALUES.stats()["hits"] == 1
+    mock_data.bump_data_version()  # new valuations -> new key, no stale score
+    assert tasks.valuation_key(1, "mock") != vkey
+
+
+def test_repeated_trade_search_hits_the_memo():
+    players = {f"p{i}": {"id": f"p{i}", "pos": pos} for i, pos in enumerate(["QB", "RB", "RB", "WR", "WR", "TE"] * 2)}
+    valuations = {pid: {"vorp": float(i % 7)} for i, pid in enumerate(players)}
+    mine = [{"player_id": f"p{i}", "slot": "BN"} for i in range(6)]
+    theirs = [{"player_id": f"p{i}", "slot": "BN"} for i in range(6, 12)]
+    key = tasks.valuation_key(1, "mock")
+    first = search_trades(players, mine, theirs, valuations, RULES, valuation_key=key)
+    misses = LINEUP_VALUES.stats()["misses"]
+    assert misses > 0
+    assert search_trades(players, mine, theirs, valuations, RULES, valuation_key=key) == first
+    stats = LINEUP_VALUES.stats()
+    assert stats["misses"] == misses and stats["hits"] > 0
@@ -0,0 +1,84 @@
+"""The league ownership index kept up to date by roster deltas."""
+import copy
+import random
+
+import pytest
+
+from services import mock_data
+
+POSITIONS = ["QB", "RB", "WR", "TE", "K", "DST"]
+
+
+@pytest.fixture
+def league():
+    saved = (copy.deepcopy(mock_data.TEAMS), copy.deepcopy(mock_data.ROSTERS),
+             copy.deepcopy(mock_data.SETTINGS), copy.deepcopy(mock_data.PLAYERS), mock_data.league_id())
+    yield
+    teams, rosters, settings, players, league_id = saved
+    mock_data.load_league(teams, rosters, settings, players=players, league=league_id)
+
+
+def _expected():
+    owners = {r["player_id"]: tid for tid, entries in mock_data.ROSTERS.items() for r in entries}
+    fa = {}
+    for pid, p in mock_data.PLAYERS.items():
+        if pid not in owners:
+            fa.setdefault(p["pos"], set()).add(pid)
+    return owners, fa
+
+
+def _assert_index_matches_rebuild():
+    owners, fa = _expected()
+    assert mock_data.OWNERS == owners
+    got = {pos: set(ids) for pos, ids in mock_data.free_agents_by_pos().items() if ids}
+    assert got == fa
+    for pos in POSITIONS:
+        assert set(mock_data.free_agent_pool(pos)) == fa.get(pos, set())
+
+
+def test_initial_index():
+    _assert_index_matches_rebuild()
+    assert "RB5" in mock_data.free_agent_pool("RB")
+    assert "RB4" not in mock_data.free_agent_pool()  # on the other team
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_random_syncs_match_a_full_rebuild(league, seed):
+    rng = random.Random(seed)
+    players = {f"p{i}": {"id": f"p{i}", "name": f"P{i}", "pos": rng.choice(POSITIONS), "team": "FA"} for i in range(60)}
+    teams = {f"t{t}": {"id": f"t{t}", "name": f"T{t}"} for t in range(4)}
+    rosters = {tid: [] for tid in teams}
+    for _ in range(25):
+        for tid in list(rosters):  # drops, adds and slot changes
+            entries = [r for r in rosters[tid] if rng.random() > 0.2]
+            owned = {r["player_id"] for es in rosters.values() for r in es}
+            free = [pid for pid in players if pid not in owned]
+            entries += [{"player_id": pid, "slot": "BN"} for pid in rng.sample(free, min(len(free), rng.randint(0, 3)))]
+            for r in entries:
+                r["slot"] = rng.choice(["BN", r["slot"]])
+            rosters[tid] = entries
+        if rng.random() < 0.3 and rosters.get("t0") and rosters.get("t1"):  # a trade
+            a, b = rosters["t0"].pop(), rosters["t1"].pop()
+            rosters["t0"].append(b)
+            rosters["t1"].append(a)
+        if rng.random() < 0.3:  # a team leaves the league
+            rosters.pop(rng.choice(list(rosters)), None)
+        for pid in rng.sample(list(players), 3):  # position changes
+            players[pid] = {**players[pid], "pos": rng.choice(POSITIONS)}
+        players.pop(rng.choice(list(players)))  # a retirement
+        players[f"n{rng.random()}"] = {"id": "n", "name": "New", "pos": rng.choice(POSITIONS), "team": "FA"}
+        rosters.setdefault("t0", [])
+        mock_data.load_league({t: teams[t] for t in rosters}, copy.deepcopy(rosters), {}, players=dict(players))
+        _assert_index_matches_rebuild()
+
+
+def test_moves_only_touch_the_players_that_moved(league):
+    rosters = copy.deepcopy(mock_data.ROSTERS)
+    rosters["t-001"] = [r for r in rosters["t-001"] if r["player_id"] != "RB3"] + [{"player_id": "RB5", "slot": "BN"}]
+    rosters["t-002"][0]["slot"] = "BN"  # a slot change is not a move
+    drops, adds = mock_data._roster_moves(mock_data.ROSTERS, rosters)
+    assert (drops, adds) == ([("t-001", "RB3")], [("t-001", "RB5")])
+    mock_data.load_league(mock_data.TEAMS.copy(), rosters, dict(mock_data.SETTINGS))
+    assert mock_data.OWNERS["RB5"] == "t-001" and "RB3" not in mock_data.OWNERS
+    assert "RB3" in mock_data.free_agent_pool("RB") and "RB5" not in mock_data.free_agent_pool("RB")
+    _assert_index_matches_rebuild()
@@ -0,0 +1,112 @@
+"""Free-agent suggestions: the worst-starter index and bounded top-N heap."""
+import random
+from typing import Dict, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services import mock_data
+from services.recommend_fa import recommend_free_agents, worst_starter_index
+
+SETTINGS = {"roster_rules_json": {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1}}
+POSITIONS = ["QB", "RB", "WR", "TE", "K", "DST"]
+
+
+def baseline_free_agents(players, current_roster, free_agents, valuations, top_n):
+    """The pre-index implementation: re-filter and sort the starters for every free agent."""
+    roster_items = [
+        {"player": players[p["player_id"]], "slot": p["slot"], "valuation": valuations.get(p["player_id"])}
+        for p in current_roster if p["player_id"] in players
+    ]
+
+    def starter_vorps(pos: str) -> List[Tuple[str, float]]:
+        return [
+            (ri["player"]["id"], float((ri["valuation"] or {}).get("vorp") or 0.0))
+            for ri in roster_items
+            if ri["slot"] in ("QB", "RB", "WR", "TE") and ri["player"]["pos"] == pos
+        ]
+
+    out = []
+    for pid in free_agents:
+        p = players.get(pid)
+        if not p:
+            continue
+        pos = p["pos"]
+        fa_vorp = float(valuations.get(pid, {}).get("vorp") or 0.0)
+        same = sorted(starter_vorps(pos), key=lambda x: x[1])
+        if not same:
+            if pos not in ("RB", "WR", "TE"):
+                continue
+            flex = sorted(starter_vorps("RB") + starter_vorps("WR") + starter_vorps("TE"), key=lambda x: x[1])
+            replace_vorp = flex[0][1] if flex else 0.0
+        else:
+            replace_vorp = same[0][1]
+        delta = round(max(0.0, fa_vorp - replace_vorp), 2)
+        if delta > 0:
+            out.append({"player_id": pid, "delta_value": delta, "via_flex": not same})
+    out.sort(key=lambda s: s["delta_value"], reverse=True)
+    return out[:top_n]
+
+
+def _league(seed: int):
+    rng = random.Random(seed)
+    players = {
+        f"p{i}": {"id": f"p{i}", "name": f"Player {i}", "pos": rng.choice(POSITIONS)} for i in range(400)
+    }
+    valuations = {pid: {"vorp": round(rng.uniform(-5, 12) * 4) / 4} for pid in players}  # coarse: ties happen
+    ids = list(players)
+    rng.shuffle(ids)
+    # a roster that sometimes lacks a position entirely, so FLEX fallbacks happen
+    roster = [{"player_id": pid, "slot": rng.choice(["QB", "RB", "WR", "TE", "BN", "IR"])} for pid in ids[:rng.randint(0, 14)]]
+    roster = [r for r in roster if r["slot"] in ("BN", "IR") or players[r["player_id"]]["pos"] == r["slot"]]
+    return players, valuations, roster, ids[20:]
+
+
+@pytest.mark.parametrize("seed", range(25))
+@pytest.mark.parametrize("top_n", [1, 5, 50])
+def test_matches_the_full_sort(seed, top_n):
+    players, valuations, roster, fas = _league(seed)
+    got = recommend_free_agents(players, roster, fas, None, SETTINGS, 1, top_n=top_n, valuations=valuations)
+    expected = baseline_free_agents(players, roster, fas, valuations, top_n)
+    assert [(s["player_id"], s["delta_value"]) for s in got] == [(e["player_id"], e["delta_value"]) for e in expected]
+    for s, e in zip(got, expected):
+        assert ("FLEX" in s["rationale"]) == e["via_flex"]
+        assert 1 <= s["suggested_faab"] <= 25
+
+
+def test_position_partitioned_pool_gives_the_same_answer():
+    players, valuations, roster, fas = _league(3)
+    by_pos: Dict[str, List[str]] = {}
+    for pid in fas:
+        by_pos.setdefault(players[pid]["pos"], []).append(pid)
+    flat = recommend_free_agents(players, roster, fas, None, SETTINGS, 1, top_n=20, valuations=valuations)
+    parted = recommend_free_agents(players, roster, by_pos, None, SETTINGS, 1, top_n=20, valuations=valuations)
+    assert {s["player_id"] for s in parted} == {s["player_id"] for s in flat}
+    assert [s["delta_value"] for s in parted] == [s["delta_value"] for s in flat]
+
+
+def test_worst_starter_index_ignores_bench_and_unknown_players():
+    players = {pid: {"pos": pos} for pid, pos in [("a", "RB"), ("b", "RB"), ("c", "WR"), ("d", "TE"), ("e", "RB")]}
+    roster = [
+        {"player_id": "a", "slot": "RB"}, {"player_id": "b", "slot": "RB"}, {"player_id": "c", "slot": "WR"},
+        {"player_id": "d", "slot": "TE"}, {"player_id": "e", "slot": "BN"}, {"player_id": "zz", "slot": "QB"},
+    ]
+    vals = {"a": {"vorp": 3.0}, "b": {"vorp": 1.0}, "c": {"vorp": 0.5}, "d": {"vorp": 2.0}, "e": {"vorp": -9.0}}
+    worst, flex = worst_starter_index(players, roster, vals)
+    assert worst == {"RB": ("b", 1.0), "WR": ("c", 0.5), "TE": ("d", 2.0)}
+    assert flex == ("c", 0.5)
+
+
+def test_needs_projections_or_valuations():
+    with pytest.raises(ValueError):
+        recommend_free_agents({}, [], [], None, SETTINGS, 1)
+
+
+def test_free_agents_route_ranks_on_cached_valuations():
+    team = next(iter(mock_data.TEAMS))
+    res = TestClient(app).get("/v1/recommend/free-agents", params={"team_id": team, "week": 2, "limit": 50})
+    items = res.json()["items"]
+    rostered = {s["player_id"] for t in mock_data.TEAMS for s in mock_data.roster(t)}
+    assert all(i["player_id"] not in rostered for i in items)
+    assert [i["delta_value"] for i in items] == sorted((i["delta_value"] for i in items), reverse=True)
@@ -0,0 +1,113 @@
+"""Branch-and-bound trade search against exhaustive 1-2-for-1-2 enumeration."""
+import random
+from itertools import combinations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from services import mock_data
+from services.lineup import compile_roster_rules, lineup_value, pos_mask
+from services.recommend_trade import FAIRNESS, search_league_trades, search_trades
+
+RULES = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1}
+POSITIONS = ["QB", "RB", "RB", "WR", "WR", "TE"]
+
+
+def _league(seed):
+    rng = random.Random(seed)
+    players, valuations = {}, {}
+    for i in range(16):
+        pid = f"p{i}"
+        players[pid] = {"id": pid, "pos": rng.choice(POSITIONS)}
+        valuations[pid] = {"vorp": round(rng.uniform(-3, 15), 1)}
+    ids = list(players)
+    rng.shuffle(ids)
+    mine = [{"player_id": pid, "slot": "BN"} for pid in ids[:8]]
+    theirs = [{"player_id": pid, "slot": "BN"} for pid in ids[8:]]
+    theirs[-1]["slot"] = "IR"  # injured reserve is never traded or started
+    return players, valuations, mine, theirs
+
+
+def _value(players, valuations, pids):
+    template = compile_roster_rules(RULES)
+    masks = [pos_mask(players[p]["pos"]) for p in pids]
+    scores = [max(0.0, valuations[p]["vorp"]) for p in pids]
+    return lineup_value(masks, scores, template)
+
+
+def exhaustive(players, valuations, mine, theirs, aggressiveness):
+    """(delta_you, delta_them, give, get) for every fair, positive 1-2-for-1-2 package."""
+    you = [r["player_id"] for r in mine if r["slot"] != "IR"]
+    them = [r["player_id"] for r in theirs if r["slot"] != "IR"]
+    base_you = _value(players, valuations, you)
+    base_them = _value(players, valuations, them)
+    ratio = FAIRNESS[aggressiveness]
+    out = []
+    for ng in (1, 2):
+        for give in combinations(you, ng):
+            for nr in (1, 2):
+                for get in combinations(them, nr):
+                    d_you = _value(players, valuations, [p for p in you if p not in give] + list(get)) - base_you
+                    d_them = _value(players, valuations, [p for p in them if p not in get] + list(give)) - base_them
+                    if d_you > 1e-9 and d_them >= -ratio * d_you - 1e-9:
+                        out.append((d_you, d_them, set(give), set(get)))
+    return out
+
+
+@pytest.mark.parametrize("aggressiveness", list(FAIRNESS))
+@pytest.mark.parametrize("seed", range(25))
+def test_search_matches_exhaustive(seed, aggressiveness):
+    players, valuations, mine, theirs = _league(seed)
+    max_offers = 3
+    offers = search_trades(
+        players, mine, theirs, valuations, RULES, max_offers=max_offers, aggressiveness=aggressiveness,
+    )
+    packages = exhaustive(players, valuations, mine, theirs, aggressiveness)
+
+    best = sorted((round(d, 2) for d, *_ in packages), reverse=True)[:max_offers]
+    assert [o["delta_you"] for o in offers] == best
+
+    exact = {(frozenset(g), frozenset(r)): (d_you, d_them) for d_you, d_them, g, r in packages}
+    for o in offers:
+        d_you, d_them = exact[(frozenset(o["give"]), frozenset(o["get"]))]
+        assert o["delta_you"] == round(d_you, 2)
+        assert o["delta_them"] == round(d_them, 2)
+
+
+
+def test_expired_deadline_returns_nothing():
+    players, valuations, mine, theirs = _league(0)
+    assert search_trades(players, mine, theirs, valuations, RULES, deadline=0.0) == []
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+def test_league_search_reports_a_cut_off_budget(processes):
+    players, valuations, mine, theirs = _league(2)
+    opponents = {f"o{i}": theirs for i in range(4)}
+    full, stats = search_league_trades(players, mine, opponents, valuations, RULES, max_offers=1, processes=processes)
+    assert stats["searched"] == 4 and not stats["truncated"]
+    assert [o["opponent_team_id"] for o in full] == ["o0", "o1", "o2", "o3"]  # equal gains keep league order
+    cut, stats = search_league_trades(players, mine, opponents, valuations, RULES, budget_s=0.0, processes=processes)
+    assert stats["truncated"] and stats["searched"] < 4 and cut == []
+
+
+@pytest.mark.parametrize("processes", [None, 2])
+def test_a_failing_opponent_is_reported_not_raised(processes):
+    players, valuations, mine, theirs = _league(1)
+    players["zz"], valuations["zz"] = {"id": "zz", "pos": "RB"}, {"vorp": "corrupt"}
+    opponents = {"a": theirs, "bad": theirs + [{"player_id": "zz", "slot": "BN"}], "c": theirs}
+    offers, stats = search_league_trades(players, mine, opponents, valuations, RULES, processes=processes)
+    assert stats["failed"] == ["bad"]
+    assert stats["truncated"] and stats["searched"] == 2
+    assert offers and {o["opponent_team_id"] for o in offers} == {"a", "c"}
+
+
+def test_trades_route_returns_a_list_with_search_headers():
+    team = next(iter(mock_data.TEAMS))
+    res = TestClient(app).post("/v1/recommend/trades", json={"team_id": team, "week": 2})
+    assert res.status_code == 200 and isinstance(res.json(), list)
+    assert res.headers["X-Trade-Search-Source"] in ("market", "live")
+    assert res.headers["X-Trade-Search-Truncated"] == "false"
+    assert res.headers["X-Trade-Search-Opponents"] == f"{len(mock_data.TEAMS) - 1}/{len(mock_data.TEAMS) - 1}"
+    assert res.headers["X-Trade-Search-Failed"] == "0"
@@ -0,0 +1,72 @@
+"""Bye-aware rest-of-season prefix sums."""
+import numpy as np
+from fastapi.testclient import TestClient
+
+from jobs import tasks
+from main import app
+from services import mock_data
+from services.valuation import compute_rest_of_season
+from services.valuation_engine import encode_positions, value_season
+
+SETTINGS = {"roster_rules_json": {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 3}}
+
+
+def _season(weeks):
+    rng = np.random.default_rng(5)
+    players = {f"p{i}": {"pos": pos, "bye_week": 5 + i % 4} for i, pos in enumerate(["QB", "RB", "WR", "TE"] * 6)}
+    players["p0"]["bye_week"] = None  # unknown bye
+    ids = list(players)
+    points = rng.uniform(0, 25, size=(len(weeks), len(ids))).round(2)
+    codes, positions = encode_positions(players, ids)
+    return players, value_season(ids, codes, positions, points, weeks, SETTINGS)
+
+
+def _brute(players, season, field, k, to_week=17):
+    out = np.zeros(len(season.player_ids))
+    for wi, week in enumerate(season.weeks):
+        if not k <= week <= to_week:
+            continue
+        for j, pid in enumerate(season.player_ids):
+            if players[pid]["bye_week"] != week:
+                out[j] += getattr(season, field)[wi, j]
+    return out
+
+
+def test_any_range_matches_summing_the_weeks_with_byes_zeroed():
+    weeks = list(range(1, 19))
+    players, season = _season(weeks)
+    ros = compute_rest_of_season(players, season)
+    for k in range(1, 19):
+        assert np.allclose(ros.points(k), _brute(players, season, "points", k))
+        assert np.allclose(ros.vorp(k), _brute(players, season, "vorp", k))
+    assert np.allclose(ros.points(3, 9), _brute(players, season, "points", 3, 9))
+    assert (ros.points(12, 4) == 0).all()  # empty range
+    assert (ros.points(18) == 0).all()  # week 18 is past the ROS horizon
+
+
+def test_unsorted_or_sparse_weeks():
+    weeks = [9, 2, 14, 5]
+    players, season = _season(weeks)
+    ros = compute_rest_of_season(players, season)
+    assert ros.weeks == [2, 5, 9, 14]
+    for k in (1, 3, 6, 10, 15):
+        assert np.allclose(ros.points(k), _brute(players, season, "points", k))
+
+
+def test_to_dicts_ranks_on_ros_points():
+    players, season = _season(list(range(1, 19)))
+    rows = compute_rest_of_season(players, season).to_dicts(6)
+    best = max(rows.values(), key=lambda r: r["projected_points"])
+    assert best["rank_overall"] == 1 and best["week"] == 6 and best["through_week"] == 17
+    assert rows["p0"]["projected_points"] == round(_brute(players, season, "points", 6)[0], 2)
+
+
+def test_ros_valuations_are_cached_and_ranked_on_by_free_agents():
+    first = tasks.ros_valuations(4)
+    assert tasks.ros_valuations(4) is first
+    assert tasks.rest_of_season().points(4).shape == (len(mock_data.PLAYERS),)
+    team = next(iter(mock_data.TEAMS))
+    res = TestClient(app).get("/v1/recommend/free-agents", params={"team_id": team, "week": 4, "mode": "ros"})
+    assert res.status_code == 200
+    for item in res.json()["items"]:
+        assert item["player_id"] in first
@@ -0,0 +1,281 @@
+"""Store round-trips on SQLite, and the routes reading through it."""
+import copy
+import csv
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from db.models import Base, TeamWeekRow
+from db.session import get_store
+import routes_recommend
+from jobs import tasks
+from main import app
+from services import mock_data, store_cache
+from services.projections.mock import MockSource
+from services.store import CsvRowStream, Store, valuation_rows, week_valuation_dicts
+from services.store_cache import CachedStore
+from services.team_week import build_team_weeks
+from services.valuation import compute_season_valuations
+
+SETTINGS = {"roster_rules_json": {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1}}
+
+
+@pytest.fixture
+def store():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as s:
+        yield Store(s)
+    engine.dispose()
+
+
+@pytest.fixture
+def routed_store():
+    """The mock league synced into SQLite and served to the routes through `get_store`."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    store_cache.STORE_READS.invalidate()
+    with Session(engine) as s:
+        league_id, year = mock_data.league_scope()
+        Store(s).sync_league(
+            league_id, year, 1, mock_data.SETTINGS, mock_data.TEAMS, mock_data.ROSTERS, mock_data.PLAYERS,
+        )
+        s.commit()
+        app.dependency_overrides[get_store] = lambda: CachedStore(s)
+        yield Store(s)
+    app.dependency_overrides.pop(get_store, None)
+    store_cache.STORE_READS.invalidate()
+    engine.dispose()
+
+
+def _league(n_teams=3, per_team=5):
+    positions = ["QB", "RB", "WR", "TE"]
+    players = {
+        f"P{i}": {"id": f"P{i}", "name": f"Player {i}", "pos": positions[i % 4], "team": "BUF", "bye_week": 5 + i % 3}
+        for i in range(n_teams * per_team + 4)
+    }
+    teams = {f"t{j}": {"id": f"t{j}", "name": f"Team {j}", "manager": f"m{j}"} for j in range(n_teams)}
+    rosters = {
+        f"t{j}": [{"player_id": f"P{j * per_team + k}", "slot": "BN"} for k in range(per_team)]
+        for j in range(n_teams)
+    }
+    return players, teams, rosters
+
+
+def test_sync_league_round_trip(store):
+    players, teams, rosters = _league()
+    counts = store.sync_league(7, 2025, 3, SETTINGS, teams, rosters, players)
+    store.s.commit()
+    assert counts == {"teams": 3, "players": len(players), "roster_spots": 15}
+
+    snap = store.load_league()
+    assert snap["league"] == "espn-7-2025"
+    assert snap["settings"] == SETTINGS
+    assert snap["rosters"] == rosters
+    assert snap["players"] == players
+    assert {tid: t["name"] for tid, t in snap["teams"].items()} == {tid: t["name"] for tid, t in teams.items()}
+    assert store.latest_sync()[0] == "espn-7-2025"
+
+    # a later week replaces only that week; load_league reads each team's latest
+    rosters["t0"] = rosters["t0"][:2]
+    players["P0"]["name"] = "Renamed"
+    store.sync_league(7, 2025, 4, SETTINGS, {"t0": teams["t0"]}, {"t0": rosters["t0"]}, players)
+    store.s.commit()
+    snap = store.load_league()
+    assert snap["rosters"] == rosters
+    assert snap["players"]["P0"]["name"] == "Renamed"
+    assert store.roster_week("t0", 3) == 3
+    assert store.roster_week("t0", 9) == 4
+    assert store.roster_week("t1", 9) == 3
+
+
+def test_write_valuations_round_trip(store):
+    players, teams, rosters = _league()
+    store.sync_league(7, 2025, 1, SETTINGS, teams, rosters, players)
+    season = compute_season_valuations(players, MockSource(), SETTINGS, weeks=(1, 2))
+    league_id, year = mock_data.league_scope()
+
+    first = store.write_valuations(valuation_rows(season, "mock", league_id, year))
+    again = store.write_valuations(valuation_rows(season, "mock", league_id, year))
+    store.s.commit()
+    assert first["rows"] == again["rows"] == 2 * len(players)
+
+    stored = {v.player_id: (v.projected_points, v.vorp) for v in store.valuations_for_week(2)}
+    wv = season.week(2)
+    assert stored == {
+        pid: (float(wv.points[i]), float(wv.vorp[i])) for i, pid in enumerate(season.player_ids)
+    }
+    assert store.valuations_for_week(3) == []
+
+    # the team route's cold-matrix fallback matches the in-memory slice
+    assert week_valuation_dicts(store.valuations_for_week(2), players, 2) == wv.to_dicts(2)
+
+
+def test_copy_stream_encodes_rows_as_they_are_read():
+    rows = [(7, 2025 + i % 2, 1 + i % 18, "mock", f"P,{i}", i / 3, -i / 7) for i in range(5000)]
+    pulled = []
+    stream = CsvRowStream(pulled.append(r) or r for r in rows)
+    chunks = [stream.read(4096)]
+    assert 0 < len(pulled) < len(rows)  # one chunk's worth, not the whole matrix
+    while chunks[-1]:
+        assert len(chunks[-1]) <= 4096
+        chunks.append(stream.read(4096))
+    assert list(csv.reader(io.StringIO("".join(chunks)))) == [[str(v) for v in r] for r in rows]
+    assert stream.rows == len(rows) and stream.seasons == {2025, 2026}
+    assert CsvRowStream(iter(rows)).read() == "".join(chunks)  # read() with no size drains it
+
+
+def test_refresh_team_weeks_rewrites_only_changed_teams(store):
+    players, teams, rosters = _league()
+    season = compute_season_valuations(players, MockSource(), SETTINGS, weeks=(1, 2))
+    scope = mock_data.league_scope()
+
+    def build():
+        return build_team_weeks(players, {1: rosters, 2: rosters}, season, (1, 2), "mock", *scope)
+
+    built = build()
+    first = store.refresh_team_weeks("mock", (1, 2), built)
+    store.s.commit()
+    assert first["changed"] == 6 and first["rows"] == 30
+    assert [r.player_id for r in store.team_week("t1", 2)] == [e["player_id"] for e in rosters["t1"]]
+
+    assert store.refresh_team_weeks("mock", (1, 2), built)["changed"] == 0
+
+    rosters["t1"] = rosters["t1"][1:]
+    del rosters["t2"]
+    second = store.refresh_team_weeks("mock", (1, 2), build())
+    store.s.commit()
+    assert second["teams_changed"] == ["t1"]
+    assert [r.player_id for r in store.team_week("t1", 1)] == [e["player_id"] for e in rosters["t1"]]
+    assert store.team_week("t2", 1) == []
+
+    # another league-season's rows are neither read nor dropped
+    other = build_team_weeks(players, {1: rosters}, season, (1,), "mock", scope[0] + 1, scope[1])
+    keys = ("league_id", "season", "team_id", "week", "source", "player_id")
+    store._upsert(TeamWeekRow, other[("t0", 1)][1], keys=keys, update=())
+    assert store.refresh_team_weeks("mock", (1, 2), build())["changed"] == 0
+    assert len(store.team_week("t0", 1)) == len(rosters["t0"])
+    assert store.s.query(TeamWeekRow).filter_by(league_id=scope[0] + 1).count() == len(rosters["t0"])
+
+
+def test_rosters_by_week_resolves_each_teams_stored_week(store, monkeypatch):
+    players, teams, rosters = _league()
+    monkeypatch.setattr(mock_data, "league_id", lambda: "espn-7-2025")
+    store.sync_league(7, 2025, 3, SETTINGS, teams, rosters, players)
+    store.sync_league(7, 2025, 5, SETTINGS, {"t0": teams["t0"]}, {"t0": rosters["t0"][:2]}, players)
+    store.s.commit()
+
+    by_week = store.rosters_by_week((1, 4, 6))
+    assert by_week[4] == rosters
+    assert by_week[6]["t0"] == rosters["t0"][:2]
+    assert by_week[1]["t0"] == rosters["t0"][:2]  # before any stored week: the latest, as roster_week
+    assert by_week[6]["t1"] == rosters["t1"]
+    assert store.rosters_by_week((4,))[4]["t0"] == [
+        {"player_id": r.player_id, "slot": r.slot} for r in store.roster_for_week("t0", store.roster_week("t0", 4))
+    ]
+
+
+def test_team_weeks_are_current_until_the_next_sync(store, monkeypatch):
+    players, teams, rosters = _league()
+    monkeypatch.setattr(mock_data, "league_id", lambda: "espn-7-2025")
+    season = compute_season_valuations(players, MockSource(), SETTINGS, weeks=(1, 2))
+
+    def materialize():
+        synced_at = store.league_synced_at()
+        built = build_team_weeks(players, store.rosters_by_week((1, 2)), season, (1, 2), "mock", 7, 2025)
+        store.refresh_team_weeks("mock", (1, 2), built, synced_at=synced_at)
+        store.s.commit()
+
+    assert store.league_synced_at() is None
+    store.sync_league(7, 2025, 1, SETTINGS, teams, rosters, players)
+    materialize()
+    assert store.team_weeks_current(2)
+    assert not store.team_weeks_current(3) and not store.team_weeks_current(2, "other")
+    with Session(store.s.get_bind()) as s:  # another session (or process) sees the same build
+        assert Store(s).team_weeks_current(1)
+    by_team = store.team_weeks(2)
+    assert list(by_team) == sorted(teams)
+    assert [r.player_id for r in by_team["t1"]] == [e["player_id"] for e in rosters["t1"]]
+
+    store.sync_league(7, 2025, 2, SETTINGS, teams, rosters, players)  # moves synced_at
+    store.s.commit()
+    assert not store.team_weeks_current(2)
+    materialize()
+    assert store.team_weeks_current(2)
+    assert store.drop_team_week_builds("mock") == 2
+    assert not store.team_weeks_current(1)
+
+
+def _ids(entries):
+    return [e["player"]["id"] for e in entries]
+
+
+def test_routes_read_the_store(routed_store, monkeypatch):
+    monkeypatch.setattr(routes_recommend, "trade_market", lambda *a, **k: None)  # search live
+    monkeypatch.setattr(routes_recommend, "request_trade_market", lambda *a, **k: None)
+    client = TestClient(app)
+    team = next(iter(mock_data.TEAMS))
+    in_memory = {"team_id": team, "week": 2}
+
+    lineup = client.get("/v1/recommend/lineup", params=in_memory).json()
+    assert lineup["team"]["name"] == mock_data.TEAMS[team]["name"]
+    assert {e["player_id"] for e in mock_data.roster(team)} == set(_ids(lineup["starters"] + lineup["bench"]))
+    batch = client.get("/v1/recommend/lineups", params={"week": 2}).json()
+    assert [t["team"]["id"] for t in batch["teams"]] == sorted(mock_data.TEAMS)
+    assert next(t for t in batch["teams"] if t["team"]["id"] == team)["total_vorp"] == lineup["total_vorp"]
+
+    # a week-2 roster stored only in the database: swap a bench RB for a free agent
+    rostered = copy.deepcopy(mock_data.ROSTERS[team])
+    dropped = next(e for e in rostered if e["slot"] == "BN" and mock_data.PLAYERS[e["player_id"]]["pos"] == "RB")
+    added = mock_data.free_agent_pool("RB")[0]
+    rostered[rostered.index(dropped)] = {"player_id": added, "slot": "BN"}
+    routed_store.replace_rosters(2, {team: rostered})
+    routed_store.s.commit()
+    store_cache.STORE_READS.invalidate()
+
+    lineup = client.get("/v1/recommend/lineup", params=in_memory).json()
+    assert added in _ids(lineup["starters"] + lineup["bench"])
+    assert dropped["player_id"] not in _ids(lineup["starters"] + lineup["bench"])
+    fas = client.get("/v1/recommend/free-agents", params={**in_memory, "limit": 50}).json()["items"]
+    assert added not in {s["player_id"] for s in fas}
+    offers = client.post("/v1/recommend/trades", json={**in_memory, "budget_ms": 30000}).json()
+    assert offers and all(set(o["give"]) <= {e["player_id"] for e in rostered} for o in offers)
+    assert client.get("/v1/recommend/lineup", params={"team_id": "nope"}).status_code == 404
+
+
+def _lineups(client, week):
+    body = client.get("/v1/recommend/lineups", params={"week": week}).json()
+    return {t["team"]["id"]: {k: v for k, v in t.items() if k != "elapsed_ms"} for t in body["teams"]}
+
+
+def test_lineup_routes_read_the_materialized_range(routed_store):
+    client = TestClient(app)
+    joined = _lineups(client, 2)
+    scope = mock_data.league_scope()
+    weeks = (2,)
+    synced_at = routed_store.league_synced_at()
+    built = build_team_weeks(
+        mock_data.PLAYERS, routed_store.rosters_by_week(weeks), tasks.season_valuations(), weeks, "mock", *scope,
+    )
+    routed_store.refresh_team_weeks("mock", weeks, built, synced_at=synced_at)
+    routed_store.s.commit()
+    store_cache.STORE_READS.invalidate()
+    assert _lineups(client, 2) == joined
+
+    # served from the rows: a change there shows up in both lineup routes
+    team = next(iter(mock_data.TEAMS))
+    routed_store.s.query(TeamWeekRow).filter_by(team_id=team, week=2).update({"vorp": 0.0})
+    routed_store.s.commit()
+    store_cache.STORE_READS.invalidate()
+    assert _lineups(client, 2)[team]["total_vorp"] == 0.0
+    assert client.get("/v1/recommend/lineup", params={"team_id": team, "week": 2}).json()["total_vorp"] == 0.0
+
+    # a later sync makes the build stale: back to the join
+    routed_store.upsert_league(*scope, mock_data.SETTINGS)
+    routed_store.s.commit()
+    store_cache.STORE_READS.invalidate()
+    assert _lineups(client, 2) == joined
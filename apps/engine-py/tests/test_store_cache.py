@@ -0,0 +1,61 @@
+"""Read-through Store cache: hits, data-version invalidation and explicit invalidation."""
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+
+from db.models import Base
+from services import mock_data, store_cache
+from services.store_cache import CachedStore
+
+PLAYERS = {f"P{i}": {"id": f"P{i}", "name": f"Player {i}", "pos": "WR", "team": "BUF"} for i in range(4)}
+TEAMS = {"t0": {"id": "t0", "name": "Team 0", "manager": "m0"}}
+ROSTERS = {"t0": [{"player_id": "P0", "slot": "WR"}, {"player_id": "P1", "slot": "BN"}]}
+
+
+@pytest.fixture
+def store():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+    store_cache.STORE_READS.invalidate()
+    with Session(engine) as s:
+        cached = CachedStore(s)
+        cached.sync_league(7, 2025, 1, {}, TEAMS, ROSTERS, PLAYERS)
+        s.commit()
+        cached.statements = statements
+        yield cached
+    engine.dispose()
+
+
+def _reads(store, fn):
+    before = len(store.statements)
+    out = fn()
+    return out, len(store.statements) - before
+
+
+def test_repeated_reads_are_served_in_process(store):
+    team, n = _reads(store, lambda: store.get_team("t0"))
+    assert team.name == "Team 0" and n == 1
+    again, n = _reads(store, lambda: store.get_team("t0"))
+    assert again is team and n == 0
+    spots, n = _reads(store, lambda: store.roster_for_week("t0", 1))
+    assert [r.player_id for r in spots] == ["P0", "P1"] and n == 1
+    assert _reads(store, lambda: store.roster_for_week("t0", 1))[1] == 0
+    assert store_cache.stats()["hits"] >= 2
+
+
+def test_data_version_bump_rereads(store):
+    store.get_team("t0")
+    store.upsert_teams([{"id": "t0", "league_id": 7, "year": 2025, "name": "Renamed", "owner_ids": None}])
+    store.s.commit()
+    assert store.get_team("t0").name == "Team 0"  # same data version: still cached
+    mock_data.bump_data_version()
+    team, n = _reads(store, lambda: store.get_team("t0"))
+    assert team.name == "Renamed" and n == 1
+
+
+def test_invalidate_drops_the_current_league(store):
+    store.valuations_for_week(1)
+    store_cache.invalidate()
+    assert _reads(store, lambda: store.valuations_for_week(1))[1] == 1
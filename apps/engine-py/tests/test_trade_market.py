@@ -0,0 +1,120 @@
+"""The precomputed trade market and its incremental refresh."""
+import copy
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from jobs import tasks
+from main import app
+from services import mock_data
+from services.recommend_trade import FAIRNESS, search_league_trades
+from services.trade_market import TradeMarket
+
+RULES = {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 1}
+POSITIONS = ["QB", "RB", "RB", "WR", "WR", "TE"]
+
+
+def _league(seed, n_teams=4, per_team=7):
+    rng = random.Random(seed)
+    players, valuations = {}, {}
+    for i in range(n_teams * per_team + 6):
+        pid = f"p{i}"
+        players[pid] = {"id": pid, "pos": rng.choice(POSITIONS)}
+        valuations[pid] = {"vorp": round(rng.uniform(-3, 15), 1)}
+    ids = list(players)
+    rng.shuffle(ids)
+    rosters = {
+        f"t{t}": [{"player_id": pid, "slot": "BN"} for pid in ids[t * per_team:(t + 1) * per_team]]
+        for t in range(n_teams)
+    }
+    return players, valuations, rosters, ids[n_teams * per_team:]
+
+
+def _live(players, valuations, rosters, team_id, level, max_offers):
+    opponents = {o: r for o, r in rosters.items() if o != team_id}
+    offers, _ = search_league_trades(players, rosters[team_id], opponents, valuations, RULES,
+                                     max_offers=max_offers, aggressiveness=level)
+    return offers
+
+
+def _gains(offers):
+    # packages with equal gains may tie-break differently at another search depth
+    return [(o["opponent_team_id"], o["delta_you"]) for o in offers]
+
+
+def _assert_matches_live(market, players, valuations, rosters):
+    for tid in rosters:
+        for level in FAIRNESS:
+            assert _gains(market.offers_for(tid, level, 2)) == _gains(_live(players, valuations, rosters, tid, level, 2))
+
+
+def test_market_matches_a_live_search():
+    players, valuations, rosters, _ = _league(1)
+    market = TradeMarket()
+    stats = market.refresh(players, rosters, valuations, RULES, data_version=7)
+    assert stats["pairs"] == stats["pairs_searched"] == 4 * 3
+    assert market.data_version == 7
+    _assert_matches_live(market, players, valuations, rosters)
+    with pytest.raises(ValueError):
+        market.offers_for("t0", "reckless")
+
+
+def test_refresh_searches_only_pairs_of_changed_teams():
+    players, valuations, rosters, free = _league(2)
+    market = TradeMarket()
+    market.refresh(players, rosters, valuations, RULES)
+
+    assert market.refresh(players, rosters, valuations, RULES)["pairs_searched"] == 0
+    rosters = copy.deepcopy(rosters)
+    rosters["t2"][0] = {"player_id": free[0], "slot": "BN"}  # a waiver pickup
+    rosters["t1"][0]["slot"] = "QB"  # a lineup move is not a roster change
+    stats = market.refresh(players, rosters, valuations, RULES)
+    assert stats["teams_changed"] == ["t2"]
+    assert stats["pairs_searched"] == 2 * 3  # t2's row and column
+    _assert_matches_live(market, players, valuations, rosters)
+
+
+def test_new_valuations_rebuild_everything_and_departed_teams_drop_out():
+    players, valuations, rosters, _ = _league(3)
+    market = TradeMarket()
+    market.refresh(players, rosters, valuations, RULES)
+    valuations = {pid: {"vorp": v["vorp"] + (1.0 if players[pid]["pos"] == "RB" else 0.0)} for pid, v in valuations.items()}
+    stats = market.refresh(players, rosters, valuations, RULES)
+    assert stats["pairs_searched"] == 12 and stats["teams_changed"] == sorted(rosters)
+    del rosters["t3"]
+    stats = market.refresh(players, rosters, valuations, RULES)
+    assert stats["pairs_searched"] == 0 and stats["pairs"] == 6
+    assert all("t3" not in pair for pair in market.pairs)
+    _assert_matches_live(market, players, valuations, rosters)
+
+
+def test_market_job_serves_the_route_until_the_data_version_moves():
+    assert tasks.compute_trade_market_task(3, "mock")["kind"] == "trade_market"
+    market = tasks.trade_market(3)
+    assert market is not None
+    team = next(iter(mock_data.TEAMS))
+    client = TestClient(app)
+    res = client.post("/v1/recommend/trades", json={"team_id": team, "week": 3})
+    assert res.headers["X-Trade-Search-Source"] == "market"
+    assert res.json() == market.offers_for(team, "neutral", 2)
+
+    mock_data.bump_data_version()
+    assert tasks.trade_market(3) is None
+    res = client.post("/v1/recommend/trades", json={"team_id": team, "week": 3})
+    assert res.headers["X-Trade-Search-Source"] == "live"
+    # the live search agrees with what the market served
+    assert _gains(res.json()) == _gains(market.offers_for(team, "neutral", 2))
+
+
+def test_refresh_requests_are_deduplicated_per_version(monkeypatch):
+    queued = []
+    monkeypatch.setattr(tasks, "enqueue", lambda func, kwargs: queued.append(kwargs) or f"job{len(queued)}")
+    mock_data.bump_data_version()
+    assert tasks.request_trade_market(5) == "job1"
+    assert tasks.request_trade_market(5) is None  # already pending
+    tasks._MARKETS_PENDING.clear()
+    assert tasks.request_trade_market(5) is None  # already requested at this version
+    assert tasks.request_trade_market(5, force=True) == "job2"
+    assert queued[-1] == {"week": 5, "source": "mock", "mode": "week"}
+    tasks._MARKETS_PENDING.clear()
@@ -0,0 +1,83 @@
+"""The NumPy valuation engine against the original dict implementation."""
+import math
+import random
+from typing import Any, Dict, Tuple
+
+import pytest
+
+from services.projections.mock import MockSource
+from services.valuation import compute_replacement_levels, compute_season_valuations, compute_vorp_for_week
+
+SETTINGS = {"roster_rules_json": {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 3}}
+
+
+def _starters(settings: Dict[str, Any], pos: str) -> int:
+    rules = settings.get("roster_rules_json", {})
+    flex = int(rules.get("FLEX", rules.get("FLX", 0)))
+    base = int(rules.get(pos, 0))
+    return base + max(0, math.floor(flex / 3)) if pos in ("RB", "WR", "TE") else base
+
+
+def baseline_vorp_for_week(players, projections, settings, week, teams_count=12):
+    """The pre-engine compute_vorp_for_week: sort per position, pick the Nth player."""
+    by_pos: Dict[str, list[Tuple[str, float]]] = {}
+    for pid, pts in projections.items():
+        by_pos.setdefault(players[pid]["pos"], []).append((pid, pts))
+    repl, rank_pos = {}, {}
+    for pos, arr in by_pos.items():
+        arr.sort(key=lambda kv: kv[1], reverse=True)
+        n = max(1, _starters(settings, pos) * teams_count)
+        repl[pos] = arr[min(len(arr) - 1, n - 1)][1]
+        for i, (pid, _) in enumerate(arr):
+            rank_pos[pid] = i + 1
+    ranked = sorted(projections.items(), key=lambda kv: kv[1], reverse=True)
+    rank_overall = {pid: i + 1 for i, (pid, _) in enumerate(ranked)}
+    return repl, {
+        pid: {
+            "player_id": pid,
+            "week": week,
+            "vorp": round(pts - repl[players[pid]["pos"]], 2),
+            "rank_pos": rank_pos[pid],
+            "rank_overall": rank_overall[pid],
+        }
+        for pid, pts in projections.items()
+    }
+
+
+def _league(n: int, seed: int):
+    rng = random.Random(seed)
+    players = {f"p{i}": {"id": f"p{i}", "pos": rng.choice(["QB", "RB", "WR", "TE", "K"])} for i in range(n)}
+    # coarse points so ties (and their ordering) are exercised
+    projections = {pid: round(rng.uniform(0, 25) * 2) / 2 for pid in players}
+    return players, projections
+
+
+@pytest.mark.parametrize("n,seed", [(1, 0), (7, 1), (60, 2), (400, 3)])
+@pytest.mark.parametrize("teams_count", [1, 12])
+def test_week_matches_baseline(n, seed, teams_count):
+    players, projections = _league(n, seed)
+    repl, expected = baseline_vorp_for_week(players, projections, SETTINGS, 5, teams_count)
+    assert compute_vorp_for_week(players, projections, SETTINGS, 5, teams_count) == expected
+    assert compute_replacement_levels(players, projections, SETTINGS, teams_count) == pytest.approx(repl)
+
+
+
+def test_raw_mode_is_the_arrays_behind_the_dicts():
+    players, projections = _league(90, 5)
+    raw = compute_vorp_for_week(players, projections, SETTINGS, 3, raw=True)
+    assert raw.player_ids == list(players)
+    assert raw.points.tolist() == list(projections.values())
+    assert raw.to_dicts(3) == compute_vorp_for_week(players, projections, SETTINGS, 3)
+    assert raw.replacement_levels() == compute_replacement_levels(players, projections, SETTINGS)
+
+
+def test_season_matrix_matches_each_week():
+    players, _ = _league(150, 4)
+    source = MockSource()
+    season = compute_season_valuations(players, source, SETTINGS, weeks=(1, 2, 9))
+    assert season.points.shape == season.vorp.shape == (3, 150)
+    for week in (1, 2, 9):
+        projections = season.projections(week)
+        assert projections == source.weekly_points(players, week=week)
+        _, expected = baseline_vorp_for_week(players, projections, SETTINGS, week)
+        assert season.week(week).to_dicts(week) == expected
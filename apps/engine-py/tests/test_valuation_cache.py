@@ -0,0 +1,71 @@
+"""The versioned LRU valuation cache and the read routes' use of it."""
+from services import mock_data
+from services.valuation_cache import ValuationCache
+from jobs import tasks
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ValuationCache(max_entries=2)
+    cache.put(("L", "mock", 1, 0), "w1")
+    cache.put(("L", "mock", 2, 0), "w2")
+    assert cache.get(("L", "mock", 1, 0)) == "w1"  # w1 is now the most recent
+    cache.put(("L", "mock", 3, 0), "w3")
+    assert cache.get(("L", "mock", 2, 0)) is None
+    assert cache.get(("L", "mock", 1, 0)) == "w1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_get_or_compute_computes_once_per_key():
+    cache = ValuationCache()
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+    assert cache.get_or_compute(("L", "mock", 1, 0), compute) == 1
+    assert cache.get_or_compute(("L", "mock", 1, 0), compute) == 1
+    assert cache.get_or_compute(("L", "mock", 1, 1), compute) == 2  # new data version
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalidate_is_per_league():
+    cache = ValuationCache()
+    cache.put(("A", "mock", 1, 0), "a")
+    cache.put(("B", "mock", 1, 0), "b")
+    cache.invalidate("A")
+    assert cache.get(("A", "mock", 1, 0)) is None
+    assert cache.get(("B", "mock", 1, 0)) == "b"
+
+
+def test_week_valuations_are_served_until_the_data_version_moves():
+    first = tasks.week_valuations(4)
+    assert tasks.week_valuations(4) is first
+    assert tasks.get_cached_valuations(4) is first
+    mock_data.bump_data_version()
+    assert tasks.get_cached_valuations(4) is None
+    again = tasks.week_valuations(4)
+    assert again is not first and again == first
+
+
+def test_newer_version_drops_only_that_groups_older_entries():
+    cache = ValuationCache()
+    cache.put(("L", "mock", 1, 0), "m0")
+    cache.put(("L", "file", 1, 0), "f0")
+    cache.put(("L", "mock", 2, 1), "m1")
+    assert cache.stats()["entries"] == 2
+    assert cache.get(("L", "file", 1, 0)) == "f0"
+    # a late put for a version the group has moved past is not kept
+    cache.put(("L", "mock", 3, 0), "late")
+    assert cache.get(("L", "mock", 3, 0)) is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("services.valuation_cache.time.monotonic", lambda: now[0])
+    cache = ValuationCache(ttl_s=5)
+    cache.put(("L", "team", "t1", 0), "row")
+    now[0] += 4
+    assert cache.get(("L", "team", "t1", 0)) == "row"
+    now[0] += 2
+    assert cache.get(("L", "team", "t1", 0)) is None
+    assert cache.stats()["expired"] == 1
+    cache.put(("L", "team", "t1", 0), "row")  # the version index forgot the expired key
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,101 @@
+"""Incremental VORP maintenance against a full recompute."""
+import random
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from jobs import tasks
+from main import app
+from services import mock_data
+from services.projections import registry
+from services.projections.file_source import FileSource, write_projection_dir
+from services.valuation import compute_vorp_for_week
+from services.valuation_engine import encode_positions, value_season
+from services.valuation_incremental import IncrementalValuations, OrderStatTree, apply_updates
+
+SETTINGS = {"roster_rules_json": {"QB": 1, "RB": 2, "WR": 2, "TE": 1, "FLEX": 3}}
+
+
+def _league(n: int, seed: int):
+    rng = random.Random(seed)
+    players = {f"p{i}": {"pos": rng.choice(["QB", "RB", "WR", "TE", "K"])} for i in range(n)}
+    projections = {pid: round(rng.uniform(0, 25) * 2) / 2 for pid in players}  # coarse: ties happen
+    return players, projections
+
+
+def test_order_stat_tree_rank_kth_between():
+    tree = OrderStatTree(random.Random(1))
+    keys = [(-float(p), i) for i, p in enumerate([5, 9, 9, 1, 7])]
+    for i, key in enumerate(keys):
+        tree.insert(key, f"p{i}")
+    assert list(tree) == ["p1", "p2", "p4", "p0", "p3"]
+    assert [tree.rank(k) for k in keys] == [4, 1, 2, 5, 3]
+    assert tree.kth(3) == keys[4]
+    assert list(tree.between(keys[1], keys[0])) == ["p2", "p4"]
+    tree.remove(keys[2])
+    assert len(tree) == 4 and tree.rank(keys[4]) == 2
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("teams_count", [1, 4, 12])
+def test_random_updates_match_full_recompute(seed, teams_count):
+    rng = random.Random(seed)
+    players, projections = _league(rng.choice([3, 40, 250]), seed)
+    inc = IncrementalValuations(players, projections, SETTINGS, 3, teams_count)
+    assert inc.valuations == compute_vorp_for_week(players, projections, SETTINGS, 3, teams_count)
+    for _ in range(60):
+        pid = rng.choice(list(projections))
+        before = compute_vorp_for_week(players, projections, SETTINGS, 3, teams_count)
+        projections[pid] = rng.choice([projections[pid], round(rng.uniform(0, 25) * 2) / 2])
+        changed = inc.update(pid, projections[pid])
+        after = compute_vorp_for_week(players, projections, SETTINGS, 3, teams_count)
+        assert inc.valuations == after
+        # exactly the players whose valuation moved are reported
+        assert changed == {p: v for p, v in after.items() if before[p] != v}
+
+
+def test_apply_updates_matches_value_season():
+    players, _ = _league(120, 9)
+    ids = list(players)
+    rng = np.random.default_rng(9)
+    points = rng.uniform(0, 25, size=(3, len(ids))).round(1)
+    codes, positions = encode_positions(players, ids)
+    season = value_season(ids, codes, positions, points, [1, 2, 3], SETTINGS)
+    live = {w: IncrementalValuations.from_week(season.week(w), SETTINGS, w) for w in (1, 3)}
+    updates = {1: {"p0": 30.0, "p7": 0.5}, 3: {"p11": 12.3}}
+
+    patched, changed = apply_updates(season, live, updates)
+    new_points = points.copy()
+    for w, cells in updates.items():
+        for pid, pts in cells.items():
+            new_points[w - 1, ids.index(pid)] = pts
+    expected = value_season(ids, codes, positions, new_points, [1, 2, 3], SETTINGS)
+    for field in ("points", "replacement", "vorp", "rank_pos", "rank_overall"):
+        assert np.allclose(getattr(patched, field), getattr(expected, field)), field
+    for w in (1, 3):
+        old, new = season.week(w).to_dicts(w), expected.week(w).to_dicts(w)
+        assert changed[w] == {p: v for p, v in new.items() if old[p] != v}
+    assert season.points[0, 0] == points[0, 0]  # the cached matrix is not touched
+
+
+def test_reload_patches_only_the_changed_players(tmp_path, monkeypatch):
+    ids = list(mock_data.PLAYERS)
+    points = np.tile(np.linspace(1.0, 20.0, len(ids)), (18, 1))
+    write_projection_dir(tmp_path, ids, range(1, 19), points)
+    monkeypatch.setitem(registry._SOURCES, "file", FileSource(tmp_path))
+    before = tasks.week_valuations(2, "file")
+
+    points[1, 0] = 40.0  # one player, one week
+    write_projection_dir(tmp_path, ids, range(1, 19), points)
+    body = TestClient(app).post("/v1/projections/sources/file/reload").json()
+    assert body["reloaded"] and "revalue" not in body
+
+    patched = tasks.get_cached_valuations(2, "file")
+    assert patched is not None  # carried over, not recomputed
+    fresh = compute_vorp_for_week(
+        mock_data.PLAYERS, tasks.season_valuations("file").projections(2), mock_data.SETTINGS, 2,
+    )
+    assert patched == fresh
+    assert body["changed"] == {"2": sorted(p for p in fresh if fresh[p] != before[p])}
+    assert ids[0] in body["changed"]["2"]